@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+回测绩效指标内核
+"""
+
+from utils.jit import njit
+
+
+@njit('float64(float64[:])', cache=True)
+def max_drawdown(values):
+    """
+    单次遍历计算最大回撤，不生成峰值和回撤中间数组
+
+    Args:
+        values: 组合价值序列(float64)
+
+    Returns:
+        最大回撤（非正数，如-0.2表示回撤20%）
+    """
+    peak = values[0]
+    mdd = 0.0
+    for i in range(values.shape[0]):
+        v = values[i]
+        if v > peak:
+            peak = v
+        dd = (v - peak) / peak
+        if dd < mdd:
+            mdd = dd
+    return mdd
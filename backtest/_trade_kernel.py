@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+回测成交撮合内核
+按时间顺序逐笔处理信号，成交结果依赖此前的资金和持仓，无法向量化，
+以标量循环实现并在安装numba时JIT编译
+"""
+
+import numpy as np
+
+from utils.jit import njit
+from strategies.base_strategy import SIDE_BUY, SIDE_SELL
+
+# 逐笔处理结果
+STATUS_SKIPPED = 0
+STATUS_BOUGHT = 1
+STATUS_SOLD = 2
+STATUS_NO_CASH = 3
+STATUS_NO_POSITION = 4
+STATUS_BAD_PRICE = 5
+
+
+# 显式签名使内核在导入时即编译（cache=True时直接加载磁盘缓存），首次回测不再付出编译延迟
+@njit('(int64[:], int64[:], int64[:], float64[:], float64, float64, int64, float64, int64)', cache=True)
+def run_trades(sym_idx, side, quantity, price, commission_rate, stamp_tax_rate,
+               min_trade_unit, initial_capital, n_symbols):
+    """
+    依次撮合信号
+
+    Args:
+        sym_idx: 信号对应的股票序号(int64)
+        side: 信号方向(int64)，即Signal.side
+        quantity: 信号数量(int64)，0表示未指定
+        price: 信号价格(float64)
+        commission_rate: 手续费率
+        stamp_tax_rate: 印花税率
+        min_trade_unit: 最小交易单位
+        initial_capital: 初始资金
+        n_symbols: 股票数量
+
+    Returns:
+        (状态, 成交数量, 成交金额, 手续费, 印花税, 盈亏, 成交后资金,
+         期末持仓数量, 期末持仓成本, 期末持仓均价, 期末资金)
+    """
+    n = sym_idx.shape[0]
+    status = np.zeros(n, dtype=np.int64)
+    out_quantity = np.zeros(n, dtype=np.int64)
+    out_amount = np.zeros(n)
+    out_commission = np.zeros(n)
+    out_stamp_tax = np.zeros(n)
+    out_profit_loss = np.zeros(n)
+    out_capital = np.zeros(n)
+
+    pos_quantity = np.zeros(n_symbols, dtype=np.int64)
+    pos_total_cost = np.zeros(n_symbols)
+    pos_avg_price = np.zeros(n_symbols)
+    capital = initial_capital
+
+    for i in range(n):
+        s = sym_idx[i]
+        p = price[i]
+
+        # 价格为0、负数、NaN或无穷大的信号无法计算仓位和金额，只跳过该信号
+        if (side[i] == SIDE_BUY or side[i] == SIDE_SELL) and not (p > 0.0 and p < np.inf):
+            status[i] = STATUS_BAD_PRICE
+            continue
+
+        if side[i] == SIDE_BUY:
+            q = quantity[i]
+            # 未指定数量时按初始资金的3%分配仓位
+            if q == 0:
+                q = int(initial_capital * 0.03 / p)
+                q = (q // min_trade_unit) * min_trade_unit
+            if q < min_trade_unit:
+                q = min_trade_unit
+
+            amount = p * q
+            commission = amount * commission_rate
+            total_cost = amount + commission
+
+            # 资金不足时用90%的可用资金调整买入数量
+            if total_cost > capital:
+                adjusted = int(capital * 0.90 / (p * (1 + commission_rate)))
+                adjusted = (adjusted // min_trade_unit) * min_trade_unit
+                if adjusted < min_trade_unit:
+                    status[i] = STATUS_NO_CASH
+                    continue
+                q = adjusted
+                amount = p * q
+                commission = amount * commission_rate
+                total_cost = amount + commission
+
+            new_quantity = pos_quantity[s] + q
+            new_total_cost = pos_total_cost[s] + amount
+            pos_quantity[s] = new_quantity
+            pos_total_cost[s] = new_total_cost
+            pos_avg_price[s] = new_total_cost / new_quantity
+
+            capital -= total_cost
+
+            status[i] = STATUS_BOUGHT
+            out_quantity[i] = q
+            out_amount[i] = amount
+            out_commission[i] = commission
+            out_capital[i] = capital
+
+        elif side[i] == SIDE_SELL:
+            q = min(quantity[i], pos_quantity[s])
+            if q == 0:
+                status[i] = STATUS_NO_POSITION
+                continue
+
+            amount = p * q
+            commission = amount * commission_rate
+            stamp_tax = amount * stamp_tax_rate
+            total_fees = commission + stamp_tax
+            net_amount = amount - total_fees
+
+            cost_basis = pos_avg_price[s] * q
+            profit_loss = amount - cost_basis - total_fees
+
+            pos_quantity[s] -= q
+            if pos_quantity[s] > 0:
+                pos_total_cost[s] -= cost_basis
+            else:
+                pos_total_cost[s] = 0.0
+                pos_avg_price[s] = 0.0
+
+            capital += net_amount
+
+            status[i] = STATUS_SOLD
+            out_quantity[i] = q
+            out_amount[i] = amount
+            out_commission[i] = commission
+            out_stamp_tax[i] = stamp_tax
+            out_profit_loss[i] = profit_loss
+            out_capital[i] = capital
+
+    return (status, out_quantity, out_amount, out_commission, out_stamp_tax,
+            out_profit_loss, out_capital, pos_quantity, pos_total_cost, pos_avg_price, capital)
@@ -3,16 +3,98 @@
 用于执行策略回测和性能分析
 """
 
+import os
+import copy
+import codecs
+import hashlib
+import threading
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
 from loguru import logger
 
 from strategies.base_strategy import BaseStrategy, Signal
-from utils.real_data_fetcher import RealDataFetcher
+from utils.technical_indicators import (
+    add_basic_indicators, BASIC_INDICATOR_COLUMNS, warm_up as warm_up_indicators
+)
+from backtest._trade_kernel import (
+    run_trades, STATUS_BOUGHT, STATUS_SOLD, STATUS_NO_CASH, STATUS_NO_POSITION, STATUS_BAD_PRICE
+)
+from backtest._metrics_kernel import max_drawdown as calc_max_drawdown
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+def write_csv(df: pd.DataFrame, filepath: str):
+    """
+    将DataFrame写出为带BOM的UTF-8 CSV（Excel可直接识别中文）
+    安装pyarrow时使用其多线程C++写入器，否则使用DataFrame.to_csv
+
+    Args:
+        df: 待导出数据（不含索引）
+        filepath: 文件路径
+    """
+    if not PYARROW_AVAILABLE:
+        df.to_csv(filepath, index=False, encoding='utf-8-sig')
+        return
+
+    with open(filepath, 'wb') as f:
+        f.write(codecs.BOM_UTF8)
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f)
+
+
+def write_parquet(df: pd.DataFrame, filepath: str) -> str:
+    """
+    将DataFrame写出为zstd压缩的Parquet文件；未安装pyarrow时改写为同名CSV文件
+
+    Args:
+        df: 待导出数据（不含索引）
+        filepath: 文件路径
+
+    Returns:
+        实际写入的文件路径
+    """
+    if not PYARROW_AVAILABLE:
+        filepath = os.path.splitext(filepath)[0] + '.csv'
+        logger.warning(f"pyarrow未安装，改为导出CSV: {filepath}")
+        write_csv(df, filepath)
+        return filepath
+
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), filepath, compression='zstd')
+    return filepath
+
+
+# 每日组合价值记录的结构化数组类型
+PORTFOLIO_DTYPE = np.dtype([
+    ('date', 'datetime64[ns]'),
+    ('portfolio_value', 'f8'),
+    ('cash', 'f8'),
+    ('positions_value', 'f8')
+])
+
+# 指标内核是否已在本进程预编译
+_kernels_warmed_up = False
+
+
+def _warmup():
+    """
+    预编译回测用到的指标内核，每个进程只执行一次
+    （撮合和回撤内核带显式签名，已在导入时编译）
+    """
+    global _kernels_warmed_up
+    if _kernels_warmed_up:
+        return
+    warm_up_indicators()
+    _kernels_warmed_up = True
 
 
 class BacktestEngine:
@@ -22,7 +104,9 @@ class BacktestEngine:
                  initial_capital: float = 100000,
                  commission_rate: float = 0.0003,
                  stamp_tax_rate: float = 0.001,
-                 min_trade_unit: int = 100):
+                 min_trade_unit: int = 100,
+                 max_workers: Optional[int] = None,
+                 signal_cache_size: int = 128):
         """
         初始化回测引擎
         
@@ -31,22 +115,39 @@ class BacktestEngine:
             commission_rate: 手续费率
             stamp_tax_rate: 印花税率
             min_trade_unit: 最小交易单位
+            max_workers: 并行处理股票的线程数，默认为CPU核数，1表示串行
+            signal_cache_size: 信号缓存的最大条目数，0表示不缓存
         """
         self.initial_capital = initial_capital
         self.commission_rate = commission_rate
         self.stamp_tax_rate = stamp_tax_rate
         self.min_trade_unit = min_trade_unit
+        self.max_workers = max_workers
+        
+        # 信号缓存：(股票代码, 数据摘要, 策略参数) -> (含指标的数据, 信号列表)
+        # 参数扫描中相同数据和策略参数的多次回测直接复用指标和信号，跨回测保留
+        self.signal_cache_size = signal_cache_size
+        self._signal_cache = OrderedDict()
+        self._signal_cache_lock = threading.Lock()
+        
+        # 收盘价面板缓存：(数据对象标识, 数据对象, 交易日, 收盘价矩阵)
+        # 同一引擎依次回测多个策略时，同一批股票数据和回测区间的面板只构建一次
+        self._panel_cache = None
         
         # 回测状态
         self.current_capital = initial_capital
         self.positions = {}  # 持仓信息
         self.trades = []     # 交易记录
-        self.daily_returns = []  # 每日收益
-        self.portfolio_values = []  # 组合价值历史
+        self.trade_columns = {}  # 交易记录的列式存储（列名 -> numpy数组），供内部计算使用
+        self.daily_returns = np.empty(0)  # 每日收益（float64数组）
+        self.portfolio_values = np.empty(0, dtype=PORTFOLIO_DTYPE)  # 组合价值历史（结构化数组）
         
         # 性能指标
         self.performance_metrics = {}
         
+        # 首次回测前完成内核编译
+        _warmup()
+        
         logger.info(f"回测引擎初始化完成，初始资金: {initial_capital:,.2f}")
     
     def run_backtest(self, strategy, symbols, start_date, end_date, historical_data=None):
@@ -68,47 +169,27 @@ class BacktestEngine:
         # 获取基准数据（暂时使用空基准）
         benchmark_data = pd.DataFrame()
         
-        # 为每个股票运行回测
+        # 各股票的指标计算和信号生成互不依赖，并行处理；成交撮合仍按时间顺序串行执行
         all_signals = []
         stock_data = {}
         
-        for symbol in symbols:
-            try:
-                # 获取股票数据
-                if historical_data and symbol in historical_data:
-                    # 使用提供的历史数据
-                    data = historical_data[symbol].copy()
-                else:
-                    logger.error(f"没有提供{symbol}的数据源")
-                    continue
-                
-                if data.empty:
-                    logger.warning(f"无法获取{symbol}的数据")
-                    continue
-                
-                # 计算技术指标
-                data = self._calculate_basic_indicators(data)
-                
-                stock_data[symbol] = data
-                
-                # 生成交易信号
-                signals = strategy.generate_signals(data, symbol)
-                all_signals.extend(signals)
-                
-                logger.info(f"{symbol}: 生成{len(signals)}个信号")
-                
-            except Exception as e:
-                logger.error(f"处理{symbol}时出错: {e}")
-                continue
-        
-        # 按时间排序信号
-        all_signals.sort(key=lambda x: x.timestamp)
+        for symbol, data, signals in self._process_symbols(strategy, symbols, historical_data):
+            stock_data[symbol] = data
+            all_signals.extend(signals)
+        
+        # 按时间排序信号（转换为int64时间戳后稳定排序，同一时刻保持生成顺序）
+        if all_signals:
+            timestamps = pd.to_datetime([signal.timestamp for signal in all_signals]).asi8
+            order = np.argsort(timestamps, kind='stable')
+            all_signals = [all_signals[i] for i in order]
         
         # 执行交易
         self._execute_trades(all_signals, stock_data)
         
-        # 计算每日组合价值
-        self._calculate_daily_portfolio_values(stock_data, start_date, end_date)
+        # 计算每日组合价值（收盘价取自传入的原始数据对象，多个策略回测同一批数据时可复用面板）
+        self._calculate_daily_portfolio_values(
+            {symbol: historical_data[symbol] for symbol in stock_data}, start_date, end_date
+        )
         
         # 计算性能指标
         self._calculate_performance_metrics(benchmark_data)
@@ -120,157 +201,251 @@ class BacktestEngine:
         
         return backtest_result
     
-    def _reset_backtest(self):
-        """重置回测状态"""
-        self.current_capital = self.initial_capital
-        self.positions = {}
-        self.trades = []
-        self.daily_returns = []
-        self.portfolio_values = []
-        self.performance_metrics = {}
-    
-    def _execute_trades(self, signals: List[Signal], stock_data: Dict[str, pd.DataFrame]):
+    def _process_symbols(self, strategy, symbols, historical_data):
         """
-        执行交易
+        并行处理各股票的数据准备和信号生成
         
         Args:
-            signals: 交易信号列表
-            stock_data: 股票数据字典
+            strategy: 交易策略
+            symbols: 股票代码列表
+            historical_data: 历史数据字典
+            
+        Returns:
+            按symbols顺序排列的(股票代码, 数据, 信号列表)，处理失败的股票不包含在内
         """
-        for signal in signals:
-            try:
-                self._execute_single_trade(signal, stock_data.get(signal.symbol))
-            except Exception as e:
-                logger.error(f"执行交易失败 {signal}: {e}")
+        workers = min(self.max_workers or os.cpu_count() or 1, len(symbols))
+        if workers <= 1:
+            results = [self._process_symbol(strategy, symbol, historical_data) for symbol in symbols]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda symbol: self._process_symbol(strategy, symbol, historical_data), symbols
+                ))
+        return [result for result in results if result is not None]
     
-    def _execute_single_trade(self, signal: Signal, stock_data: pd.DataFrame):
+    def _process_symbol(self, strategy, symbol, historical_data):
         """
-        执行单笔交易
+        计算单个股票的技术指标并生成交易信号
         
         Args:
-            signal: 交易信号
-            stock_data: 股票数据
-        """
-        symbol = signal.symbol
-        
-        # 初始化持仓
-        if symbol not in self.positions:
-            self.positions[symbol] = {
-                'quantity': 0,
-                'avg_price': 0,
-                'total_cost': 0
-            }
-        
-        position = self.positions[symbol]
-        
-        if signal.signal_type.lower() == 'buy':
-            # 买入 - 优化资金分配策略
-            
-            # 如果信号没有指定数量，使用智能分配
-            if signal.quantity == 0 or signal.quantity is None:
-                # 计算建议仓位：每只股票分配总资金的2-5%
-                target_position_value = self.initial_capital * 0.03  # 3%的仓位
-                signal.quantity = int(target_position_value / signal.price)
-                signal.quantity = (signal.quantity // self.min_trade_unit) * self.min_trade_unit
-            
-            # 确保最小交易单位
-            if signal.quantity < self.min_trade_unit:
-                signal.quantity = self.min_trade_unit
-            
-            trade_amount = signal.price * signal.quantity
-            commission = trade_amount * self.commission_rate
-            total_cost = trade_amount + commission
+            strategy: 交易策略
+            symbol: 股票代码
+            historical_data: 历史数据字典
             
-            # 检查资金是否充足
-            if total_cost > self.current_capital:
-                # 调整买入数量 - 使用更积极的资金利用率
-                available_amount = self.current_capital * 0.90  # 使用90%的可用资金
-                adjusted_quantity = int(available_amount / (signal.price * (1 + self.commission_rate)))
-                adjusted_quantity = (adjusted_quantity // self.min_trade_unit) * self.min_trade_unit
-                
-                if adjusted_quantity < self.min_trade_unit:
-                    logger.warning(f"资金不足，无法买入{symbol}")
-                    return
-                
-                signal.quantity = adjusted_quantity
-                trade_amount = signal.price * signal.quantity
-                commission = trade_amount * self.commission_rate
-                total_cost = trade_amount + commission
+        Returns:
+            (股票代码, 数据, 信号列表)，无数据或出错时返回None
+        """
+        try:
+            # 获取股票数据
+            if historical_data and symbol in historical_data:
+                # 使用提供的历史数据
+                raw_data = historical_data[symbol]
+            else:
+                logger.error(f"没有提供{symbol}的数据源")
+                return None
             
-            # 更新持仓
-            new_quantity = position['quantity'] + signal.quantity
-            new_total_cost = position['total_cost'] + trade_amount
-            position['quantity'] = new_quantity
-            position['total_cost'] = new_total_cost
-            position['avg_price'] = new_total_cost / new_quantity
+            if raw_data.empty:
+                logger.warning(f"无法获取{symbol}的数据")
+                return None
             
-            # 更新资金
-            self.current_capital -= total_cost
+            cache_key = None
+            if self.signal_cache_size > 0:
+                cache_key = self._signal_cache_key(strategy, symbol, raw_data)
+                cached = self._get_cached_signals(cache_key)
+                if cached is not None:
+                    data, signals = cached
+                    logger.info(f"{symbol}: 复用缓存的{len(signals)}个信号")
+                    return symbol, data, signals
             
-            # 记录交易
-            trade_record = {
-                'timestamp': signal.timestamp,
-                'symbol': symbol,
-                'action': 'buy',
-                'quantity': signal.quantity,
-                'price': signal.price,
-                'amount': trade_amount,
-                'commission': commission,
-                'total_cost': total_cost,
-                'reason': signal.reason,
-                'capital_after': self.current_capital
-            }
-            self.trades.append(trade_record)
+            # 浅拷贝：指标和策略只新增列，不修改原有数据，无需复制底层数组
+            data = raw_data.copy(deep=False)
             
-        elif signal.signal_type.lower() == 'sell':
-            # 卖出
-            sell_quantity = min(signal.quantity, position['quantity'])
-            if sell_quantity == 0:
-                logger.warning(f"无持仓，无法卖出{symbol}")
-                return
+            # 计算技术指标
+            data = self._calculate_basic_indicators(data)
             
-            # 如果信号没有指定卖出数量，卖出全部持仓
-            if signal.quantity == 0 or signal.quantity is None:
-                sell_quantity = position['quantity']
+            # 生成交易信号
+            signals = strategy.generate_signals(data, symbol)
             
-            trade_amount = signal.price * sell_quantity
-            commission = trade_amount * self.commission_rate
-            stamp_tax = trade_amount * self.stamp_tax_rate
-            total_fees = commission + stamp_tax
-            net_amount = trade_amount - total_fees
+            if cache_key is not None:
+                self._put_cached_signals(cache_key, data, signals)
             
-            # 计算盈亏
-            cost_basis = position['avg_price'] * sell_quantity
-            profit_loss = trade_amount - cost_basis - total_fees
+            logger.info(f"{symbol}: 生成{len(signals)}个信号")
+            return symbol, data, signals
             
-            # 更新持仓
-            position['quantity'] -= sell_quantity
-            if position['quantity'] > 0:
-                position['total_cost'] -= cost_basis
-            else:
-                position['total_cost'] = 0
-                position['avg_price'] = 0
+        except Exception as e:
+            logger.error(f"处理{symbol}时出错: {e}")
+            return None
+    
+    @staticmethod
+    def _signal_cache_key(strategy, symbol, data: pd.DataFrame) -> Tuple:
+        """
+        生成信号缓存键
+        
+        Args:
+            strategy: 交易策略
+            symbol: 股票代码
+            data: 原始股票数据
             
-            # 更新资金
-            self.current_capital += net_amount
+        Returns:
+            (股票代码, 数据摘要, 策略参数标识)
+        """
+        row_hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+        digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest()
+        return symbol, digest, strategy.params_key()
+    
+    def _get_cached_signals(self, key: Tuple):
+        """
+        读取信号缓存
+        
+        Args:
+            key: 缓存键
             
-            # 记录交易
-            trade_record = {
-                'timestamp': signal.timestamp,
-                'symbol': symbol,
-                'action': 'sell',
-                'quantity': sell_quantity,
-                'price': signal.price,
-                'amount': trade_amount,
-                'commission': commission,
-                'stamp_tax': stamp_tax,
-                'total_fees': total_fees,
-                'net_amount': net_amount,
-                'profit_loss': profit_loss,
-                'reason': signal.reason,
-                'capital_after': self.current_capital
+        Returns:
+            (数据, 信号副本列表)，未命中时返回None
+        """
+        with self._signal_cache_lock:
+            cached = self._signal_cache.get(key)
+            if cached is None:
+                return None
+            self._signal_cache.move_to_end(key)
+        data, signals = cached
+        # 撮合时会回写买入数量，返回副本以免污染缓存
+        return data, [copy.copy(signal) for signal in signals]
+    
+    def _put_cached_signals(self, key: Tuple, data: pd.DataFrame, signals: List[Signal]):
+        """
+        写入信号缓存，超过容量时淘汰最久未使用的条目
+        
+        Args:
+            key: 缓存键
+            data: 含指标的股票数据
+            signals: 信号列表
+        """
+        entry = (data, [copy.copy(signal) for signal in signals])
+        with self._signal_cache_lock:
+            self._signal_cache[key] = entry
+            self._signal_cache.move_to_end(key)
+            while len(self._signal_cache) > self.signal_cache_size:
+                self._signal_cache.popitem(last=False)
+    
+    def _reset_backtest(self):
+        """重置回测状态"""
+        self.current_capital = self.initial_capital
+        self.positions = {}
+        self.trades = []
+        self.trade_columns = {}
+        self.daily_returns = np.empty(0)
+        self.portfolio_values = np.empty(0, dtype=PORTFOLIO_DTYPE)
+        self.performance_metrics = {}
+    
+    def _execute_trades(self, signals: List[Signal], stock_data: Dict[str, pd.DataFrame]):
+        """
+        执行交易
+        
+        Args:
+            signals: 交易信号列表（已按时间排序）
+            stock_data: 股票数据字典
+        """
+        if not signals:
+            return
+        
+        # 信号转换为连续数组，交由撮合内核逐笔处理
+        symbols = list(dict.fromkeys(signal.symbol for signal in signals))
+        symbol_idx = {symbol: i for i, symbol in enumerate(symbols)}
+        count = len(signals)
+        
+        sym_idx = np.fromiter((symbol_idx[s.symbol] for s in signals), dtype=np.int64, count=count)
+        side = np.fromiter((s.side for s in signals), dtype=np.int64, count=count)
+        quantity = np.fromiter((s.quantity or 0 for s in signals), dtype=np.int64, count=count)
+        price = np.fromiter((s.price for s in signals), dtype=np.float64, count=count)
+        
+        (status, out_quantity, out_amount, out_commission, out_stamp_tax, out_profit_loss,
+         out_capital, pos_quantity, pos_total_cost, pos_avg_price, capital) = run_trades(
+            sym_idx, side, quantity, price, self.commission_rate, self.stamp_tax_rate,
+            self.min_trade_unit, float(self.initial_capital), len(symbols)
+        )
+        
+        self.current_capital = float(capital)
+        self.positions = {
+            symbol: {
+                'quantity': int(pos_quantity[i]),
+                'avg_price': float(pos_avg_price[i]),
+                'total_cost': float(pos_total_cost[i])
             }
-            self.trades.append(trade_record)
+            for i, symbol in enumerate(symbols)
+        }
+        
+        # 成交记录按列保存，导出和统计直接使用数组
+        executed = np.flatnonzero((status == STATUS_BOUGHT) | (status == STATUS_SOLD))
+        is_buy = status[executed] == STATUS_BOUGHT
+        amount = out_amount[executed]
+        commission = out_commission[executed]
+        stamp_tax = out_stamp_tax[executed]
+        total_fees = commission + stamp_tax
+        executed_signals = [signals[i] for i in executed]
+        
+        # 列顺序与交易记录字典的字段顺序一致（先买入字段，后卖出特有字段）
+        self.trade_columns = {
+            'timestamp': pd.to_datetime([s.timestamp for s in executed_signals]).values,
+            'symbol': np.array(symbols, dtype=object)[sym_idx[executed]],
+            'action': np.where(is_buy, 'buy', 'sell').astype(object),
+            'quantity': out_quantity[executed],
+            'price': price[executed],
+            'amount': amount,
+            'commission': commission,
+            'total_cost': np.where(is_buy, amount + commission, np.nan),
+            'reason': np.array([s.reason for s in executed_signals], dtype=object),
+            'capital_after': out_capital[executed],
+            'stamp_tax': np.where(is_buy, np.nan, stamp_tax),
+            'total_fees': np.where(is_buy, np.nan, total_fees),
+            'net_amount': np.where(is_buy, np.nan, amount - total_fees),
+            'profit_loss': np.where(is_buy, np.nan, out_profit_loss[executed])
+        }
+        
+        # 生成交易记录
+        for signal, buy, q, trade_amount, fee, tax, profit_loss, capital_after in zip(
+                executed_signals, is_buy.tolist(), out_quantity[executed].tolist(), amount.tolist(),
+                commission.tolist(), stamp_tax.tolist(), out_profit_loss[executed].tolist(),
+                out_capital[executed].tolist()):
+            if buy:
+                signal.quantity = q
+                self.trades.append({
+                    'timestamp': signal.timestamp,
+                    'symbol': signal.symbol,
+                    'action': 'buy',
+                    'quantity': q,
+                    'price': signal.price,
+                    'amount': trade_amount,
+                    'commission': fee,
+                    'total_cost': trade_amount + fee,
+                    'reason': signal.reason,
+                    'capital_after': capital_after
+                })
+            else:
+                fees = fee + tax
+                self.trades.append({
+                    'timestamp': signal.timestamp,
+                    'symbol': signal.symbol,
+                    'action': 'sell',
+                    'quantity': q,
+                    'price': signal.price,
+                    'amount': trade_amount,
+                    'commission': fee,
+                    'stamp_tax': tax,
+                    'total_fees': fees,
+                    'net_amount': trade_amount - fees,
+                    'profit_loss': profit_loss,
+                    'reason': signal.reason,
+                    'capital_after': capital_after
+                })
+        
+        for signal, st in zip(signals, status.tolist()):
+            if st == STATUS_NO_CASH:
+                logger.warning(f"资金不足，无法买入{signal.symbol}")
+            elif st == STATUS_NO_POSITION:
+                logger.warning(f"无持仓，无法卖出{signal.symbol}")
+            elif st == STATUS_BAD_PRICE:
+                logger.error(f"信号价格无效，跳过{signal.symbol}: {signal.price}")
     
     def _calculate_daily_portfolio_values(self, stock_data: Dict[str, pd.DataFrame], 
                                         start_date: str, end_date: str):
@@ -282,73 +457,101 @@ class BacktestEngine:
             start_date: 开始日期
             end_date: 结束日期
         """
-        # 获取所有交易日期
-        all_dates = set()
-        for data in stock_data.values():
-            all_dates.update(data.index)
-        
-        trading_days = sorted(list(all_dates))
-        trading_days = [d for d in trading_days if start_date <= d.strftime('%Y-%m-%d') <= end_date]
+        symbols = list(stock_data.keys())
+        trading_days, close = self._close_panel(stock_data, start_date, end_date)
+        num_days = len(trading_days)
         
-        portfolio_values = []
-        daily_returns = []
-        prev_value = self.initial_capital
-        
-        # 模拟每日持仓价值变化
-        current_positions = {}
-        current_cash = self.initial_capital
+        if num_days == 0:
+            self.portfolio_values = np.empty(0, dtype=PORTFOLIO_DTYPE)
+            self.daily_returns = np.empty(0)
+            return
         
-        for date in trading_days:
-            # 处理当日交易
-            daily_trades = [t for t in self.trades if t['timestamp'].date() == date.date()]
+        # 每日持仓变动与现金变动，交易按日期归入对应交易日（不在回测区间内的交易不计入）
+        quantity_delta = np.zeros((num_days, len(symbols)))
+        cash_delta = np.zeros(num_days)
+        
+        if self.trades:
+            columns = self.trade_columns
+            symbol_idx = {symbol: i for i, symbol in enumerate(symbols)}
+            day_keys = trading_days.values.astype('datetime64[D]')
+            trade_days = columns['timestamp'].astype('datetime64[D]')
+            is_buy = columns['action'] == 'buy'
+            quantities = columns['quantity'].astype(np.float64)
+            cash_flows = np.where(is_buy, -columns['total_cost'], columns['net_amount'])
+            sym_idx = np.array([symbol_idx.get(symbol, -1) for symbol in columns['symbol']], dtype=np.int64)
             
-            for trade in daily_trades:
-                symbol = trade['symbol']
-                if symbol not in current_positions:
-                    current_positions[symbol] = {'quantity': 0, 'avg_price': 0}
-                
-                if trade['action'] == 'buy':
-                    # 更新持仓
-                    old_quantity = current_positions[symbol]['quantity']
-                    new_quantity = old_quantity + trade['quantity']
-                    if new_quantity > 0:
-                        current_positions[symbol]['avg_price'] = (
-                            (old_quantity * current_positions[symbol]['avg_price'] + 
-                             trade['quantity'] * trade['price']) / new_quantity
-                        )
-                    current_positions[symbol]['quantity'] = new_quantity
-                    current_cash -= trade['total_cost']
-                    
-                elif trade['action'] == 'sell':
-                    current_positions[symbol]['quantity'] -= trade['quantity']
-                    current_cash += trade['net_amount']
-            
-            # 计算当日组合价值
-            portfolio_value = current_cash
-            
-            for symbol, position in current_positions.items():
-                if position['quantity'] > 0 and symbol in stock_data:
-                    # 获取当日收盘价
-                    symbol_data = stock_data[symbol]
-                    if date in symbol_data.index:
-                        current_price = symbol_data.loc[date, 'close']
-                        portfolio_value += position['quantity'] * current_price
-            
-            portfolio_values.append({
-                'date': date,
-                'portfolio_value': portfolio_value,
-                'cash': current_cash,
-                'positions_value': portfolio_value - current_cash
-            })
+            day_idx = np.searchsorted(day_keys, trade_days)
+            matched = day_idx < num_days
+            matched[matched] = day_keys[day_idx[matched]] == trade_days[matched]
             
-            # 计算日收益率
-            daily_return = (portfolio_value - prev_value) / prev_value
-            daily_returns.append(daily_return)
-            prev_value = portfolio_value
+            np.add.at(cash_delta, day_idx[matched], cash_flows[matched])
+            held = matched & (sym_idx >= 0)
+            signed_quantities = np.where(is_buy, quantities, -quantities)
+            np.add.at(quantity_delta, (day_idx[held], sym_idx[held]), signed_quantities[held])
         
-        self.portfolio_values = portfolio_values
+        holdings = quantity_delta.cumsum(axis=0)
+        cash = self.initial_capital + cash_delta.cumsum()
+        
+        # 计算每日组合价值
+        position_values = np.where((holdings > 0) & ~np.isnan(close), holdings * close, 0.0).sum(axis=1)
+        portfolio = cash + position_values
+        
+        # 计算日收益率
+        prev_values = np.concatenate(([self.initial_capital], portfolio[:-1]))
+        daily_returns = (portfolio - prev_values) / prev_values
+        
+        self.portfolio_values = np.empty(num_days, dtype=PORTFOLIO_DTYPE)
+        self.portfolio_values['date'] = trading_days.values.astype('datetime64[ns]')
+        self.portfolio_values['portfolio_value'] = portfolio
+        self.portfolio_values['cash'] = cash
+        self.portfolio_values['positions_value'] = portfolio - cash
         self.daily_returns = daily_returns
     
+    def _close_panel(self, stock_data: Dict[str, pd.DataFrame], start_date: str, end_date: str):
+        """
+        构建回测区间的交易日和收盘价矩阵
+        股票数据对象和回测区间与上次调用相同时直接返回上次的结果（数据对象在回测之间不应原地修改）
+        
+        Args:
+            stock_data: 股票数据字典
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            (交易日DatetimeIndex, 收盘价矩阵(交易日 × 股票)，当日无数据的股票为NaN)
+        """
+        key = (tuple((symbol, id(data)) for symbol, data in stock_data.items()), start_date, end_date)
+        cached = self._panel_cache
+        if cached is not None and cached[0] == key:
+            return cached[2], cached[3]
+        
+        symbols = list(stock_data.keys())
+        
+        # 获取所有交易日期
+        if symbols:
+            all_dates = pd.DatetimeIndex(np.unique(np.concatenate(
+                [stock_data[symbol].index.values for symbol in symbols]
+            )))
+        else:
+            all_dates = pd.DatetimeIndex([])
+        # 日期边界只转换一次，按时间戳整数比较（结束日期当天全部计入）
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+        trading_days = all_dates[(all_dates >= start) & (all_dates < end)]
+        
+        if len(trading_days) == 0:
+            close = np.empty((0, len(symbols)))
+        else:
+            close = np.column_stack([
+                stock_data[symbol]['close'].reindex(trading_days).to_numpy(dtype=np.float64)
+                for symbol in symbols
+            ])
+        close.flags.writeable = False
+        
+        # 同时持有数据对象的引用，缓存期间其id不会被复用
+        self._panel_cache = (key, list(stock_data.values()), trading_days, close)
+        return trading_days, close
+    
     def _calculate_performance_metrics(self, benchmark_data: pd.DataFrame):
         """
         计算性能指标
@@ -356,12 +559,12 @@ class BacktestEngine:
         Args:
             benchmark_data: 基准数据
         """
-        if not self.portfolio_values:
+        if len(self.portfolio_values) == 0:
             return
         
         # 基本收益指标
         initial_value = self.initial_capital
-        final_value = self.portfolio_values[-1]['portfolio_value']
+        final_value = float(self.portfolio_values['portfolio_value'][-1])
         total_return = (final_value - initial_value) / initial_value
         
         # 年化收益率
@@ -369,28 +572,29 @@ class BacktestEngine:
         annualized_return = (1 + total_return) ** (252 / days) - 1
         
         # 波动率
-        returns_series = pd.Series(self.daily_returns)
-        volatility = returns_series.std() * np.sqrt(252)
+        volatility = self.daily_returns.std(ddof=1) * np.sqrt(252) if len(self.daily_returns) > 1 else np.nan
         
         # 夏普比率 (假设无风险利率为3%)
         risk_free_rate = 0.03
         sharpe_ratio = (annualized_return - risk_free_rate) / volatility if volatility > 0 else 0
         
         # 最大回撤
-        portfolio_values = [pv['portfolio_value'] for pv in self.portfolio_values]
-        peak = np.maximum.accumulate(portfolio_values)
-        drawdown = (portfolio_values - peak) / peak
-        max_drawdown = np.min(drawdown)
-        
-        # 胜率
-        winning_trades = [t for t in self.trades if t.get('profit_loss', 0) > 0]
-        total_trades = len([t for t in self.trades if 'profit_loss' in t])
-        win_rate = len(winning_trades) / total_trades if total_trades > 0 else 0
+        max_drawdown = calc_max_drawdown(np.ascontiguousarray(self.portfolio_values['portfolio_value']))
+        
+        # 胜率（只统计有盈亏的卖出交易）
+        if self.trades:
+            pnl = self.trade_columns['profit_loss']
+            pnl = pnl[self.trade_columns['action'] == 'sell']
+        else:
+            pnl = np.empty(0)
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        total_trades = len(pnl)
+        win_rate = len(wins) / total_trades if total_trades > 0 else 0
         
         # 盈亏比
-        avg_win = np.mean([t['profit_loss'] for t in winning_trades]) if winning_trades else 0
-        losing_trades = [t for t in self.trades if t.get('profit_loss', 0) < 0]
-        avg_loss = np.mean([abs(t['profit_loss']) for t in losing_trades]) if losing_trades else 0
+        avg_win = wins.mean() if len(wins) else 0
+        avg_loss = -losses.mean() if len(losses) else 0
         profit_loss_ratio = avg_win / avg_loss if avg_loss > 0 else 0
         
         # 基准比较
@@ -451,17 +655,21 @@ class BacktestEngine:
         Args:
             save_path: 保存路径
         """
-        if not self.portfolio_values:
+        if len(self.portfolio_values) == 0:
             logger.warning("没有回测数据可绘制")
             return
         
+        # 绘图库较重，仅在需要绘图时导入
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         # 创建图表
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
         fig.suptitle('回测结果分析', fontsize=16)
         
         # 1. 组合价值曲线
-        dates = [pv['date'] for pv in self.portfolio_values]
-        values = [pv['portfolio_value'] for pv in self.portfolio_values]
+        dates = self.portfolio_values['date']
+        values = self.portfolio_values['portfolio_value']
         
         axes[0, 0].plot(dates, values, label='组合价值', linewidth=2)
         axes[0, 0].axhline(y=self.initial_capital, color='r', linestyle='--', label='初始资金')
@@ -472,7 +680,7 @@ class BacktestEngine:
         
         # 2. 回撤曲线
         peak = np.maximum.accumulate(values)
-        drawdown = (np.array(values) - peak) / peak * 100
+        drawdown = (values - peak) / peak * 100
         
         axes[0, 1].fill_between(dates, drawdown, 0, alpha=0.3, color='red')
         axes[0, 1].plot(dates, drawdown, color='red', linewidth=1)
@@ -513,6 +721,33 @@ class BacktestEngine:
         
         plt.show()
     
+    def export_trades(self, filepath: str, format: str = 'parquet'):
+        """
+        导出交易记录，默认写入zstd压缩的Parquet文件
+        
+        Args:
+            filepath: 文件路径
+            format: 文件格式，'parquet'或'csv'；未安装pyarrow时改写为同名CSV文件
+        """
+        if format == 'csv':
+            self.export_trades_to_csv(filepath)
+            return
+        
+        if not PYARROW_AVAILABLE:
+            csv_path = os.path.splitext(filepath)[0] + '.csv'
+            logger.warning(f"pyarrow未安装，交易记录改为导出CSV: {csv_path}")
+            self.export_trades_to_csv(csv_path)
+            return
+        
+        if not self.trades:
+            logger.warning("没有交易记录可导出")
+            return
+        
+        # 列式交易记录直接转换为Arrow表，无需经过DataFrame
+        table = pa.Table.from_pydict(self.trade_columns)
+        pq.write_table(table, filepath, compression='zstd')
+        logger.info(f"交易记录已导出到: {filepath}")
+    
     def export_trades_to_csv(self, filepath: str):
         """
         导出交易记录到CSV
@@ -524,8 +759,7 @@ class BacktestEngine:
             logger.warning("没有交易记录可导出")
             return
         
-        trades_df = pd.DataFrame(self.trades)
-        trades_df.to_csv(filepath, index=False, encoding='utf-8-sig')
+        write_csv(pd.DataFrame(self.trade_columns), filepath)
         logger.info(f"交易记录已导出到: {filepath}")
     
     def get_performance_summary(self) -> str:
@@ -559,29 +793,22 @@ class BacktestEngine:
         return summary
     
     def _calculate_basic_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        """计算基本技术指标"""
-        try:
-            # 移动平均线
-            data['ma5'] = data['close'].rolling(window=5).mean()
-            data['ma10'] = data['close'].rolling(window=10).mean()
-            data['ma20'] = data['close'].rolling(window=20).mean()
-            data['ma60'] = data['close'].rolling(window=60).mean()
-            
-            # RSI
-            delta = data['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            data['rsi'] = 100 - (100 / (1 + rs))
-            
-            # MACD
-            exp1 = data['close'].ewm(span=12).mean()
-            exp2 = data['close'].ewm(span=26).mean()
-            data['macd'] = exp1 - exp2
-            data['macd_signal'] = data['macd'].ewm(span=9).mean()
-            data['macd_hist'] = data['macd'] - data['macd_signal']
-            
+        """
+        计算基本技术指标
+        数据已含全部基础指标列时（如RealDataFetcher.get_multiple_indicator_data的结果）直接复用，
+        多个策略回测同一批数据时不再逐策略重复计算
+
+        Args:
+            data: 股票数据
+
+        Returns:
+            含基础指标列的DataFrame
+        """
+        if set(BASIC_INDICATOR_COLUMNS).issubset(data.columns):
             return data
+        
+        try:
+            return add_basic_indicators(data)
         except Exception as e:
             logger.error(f"计算技术指标失败: {e}")
             return data 
\ No newline at end of file
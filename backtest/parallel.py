@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+多策略并行回测
+各策略的回测相互独立，按策略分进程执行，绕开GIL对数值计算的限制
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any
+import pandas as pd
+from loguru import logger
+
+from backtest.backtest_engine import BacktestEngine
+
+# 分进程并行回测时的进程数上限
+STRATEGY_PROCESSES = os.cpu_count() or 1
+
+# 回测工作进程持有的股票数据（由进程池初始化函数设置）
+_worker_stock_data = None
+
+
+def _init_backtest_worker(stock_data: Dict[str, pd.DataFrame]):
+    """
+    回测进程池初始化：股票数据在每个工作进程中只传入一次，不随每个任务重复序列化
+
+    Args:
+        stock_data: 股票数据字典
+    """
+    global _worker_stock_data
+    _worker_stock_data = stock_data
+
+
+def _run_strategy_in_worker(strategy, symbols: List[str], start_date: str, end_date: str,
+                            engine_kwargs: Dict[str, Any], engine_threads: int) -> Dict[str, Any]:
+    """
+    在工作进程中回测单个策略
+
+    Args:
+        strategy: 交易策略
+        symbols: 股票代码列表
+        start_date: 开始日期
+        end_date: 结束日期
+        engine_kwargs: 回测引擎参数
+        engine_threads: 回测引擎处理股票的线程数
+
+    Returns:
+        回测报告
+    """
+    engine = BacktestEngine(**engine_kwargs, max_workers=engine_threads)
+    return engine.run_backtest(
+        strategy=strategy,
+        symbols=symbols,
+        start_date=start_date,
+        end_date=end_date,
+        historical_data=_worker_stock_data
+    )
+
+
+def run_strategies(strategies: Dict[str, Any], stock_data: Dict[str, pd.DataFrame],
+                   symbols: List[str], start_date: str, end_date: str,
+                   engine_kwargs: Dict[str, Any], processes: int = None) -> Dict[str, Any]:
+    """
+    回测多个策略，多核时各策略分进程并行执行
+
+    Args:
+        strategies: {策略名称: 策略对象}
+        stock_data: 股票数据字典
+        symbols: 股票代码列表
+        start_date: 开始日期
+        end_date: 结束日期
+        engine_kwargs: 回测引擎参数
+        processes: 进程数上限，默认为STRATEGY_PROCESSES
+
+    Returns:
+        {策略名称: 回测报告}，按strategies的顺序排列，回测失败的策略不包含在内
+    """
+    finished = {}
+    workers = min(processes or STRATEGY_PROCESSES, len(strategies))
+
+    if workers <= 1:
+        # 单进程时各策略共用一个回测引擎：run_backtest开始时重置账户状态，信号缓存可在参数相同的策略间复用
+        engine = BacktestEngine(**engine_kwargs)
+        for strategy_name, strategy in strategies.items():
+            logger.info(f"正在回测策略: {strategy_name}")
+            try:
+                finished[strategy_name] = engine.run_backtest(
+                    strategy=strategy,
+                    symbols=symbols,
+                    start_date=start_date,
+                    end_date=end_date,
+                    historical_data=stock_data
+                )
+            except Exception as e:
+                logger.error(f"策略 {strategy_name} 回测失败: {e}")
+    else:
+        # CPU核数在进程间平分给引擎的股票处理线程
+        engine_threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_backtest_worker,
+                                 initargs=(stock_data,)) as executor:
+            futures = {}
+            for strategy_name, strategy in strategies.items():
+                logger.info(f"正在回测策略: {strategy_name}")
+                future = executor.submit(_run_strategy_in_worker, strategy, symbols,
+                                         start_date, end_date, engine_kwargs, engine_threads)
+                futures[future] = strategy_name
+
+            for future in as_completed(futures):
+                strategy_name = futures[future]
+                try:
+                    finished[strategy_name] = future.result()
+                except Exception as e:
+                    logger.error(f"策略 {strategy_name} 回测失败: {e}")
+
+    return {name: finished[name] for name in strategies if name in finished}
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+回测结果汇总
+多个策略的绩效指标整理为对比表，表中保留数值，仅在输出时格式化
+"""
+
+from typing import Dict, Any, Sequence
+import pandas as pd
+
+# 对比表的列：(绩效指标键, 列名)
+COMPARISON_COLUMNS = (
+    ('total_return', '总收益率'),
+    ('annualized_return', '年化收益率'),
+    ('volatility', '波动率'),
+    ('sharpe_ratio', '夏普比率'),
+    ('max_drawdown', '最大回撤'),
+    ('win_rate', '胜率'),
+    ('profit_loss_ratio', '盈亏比'),
+    ('total_trades', '交易次数'),
+    ('final_value', '最终资产'),
+)
+
+# 对比表中数值列的显示格式，用于DataFrame.to_string(formatters=...)
+COMPARISON_FORMATTERS = {
+    '总收益率': '{:.2%}'.format,
+    '年化收益率': '{:.2%}'.format,
+    '波动率': '{:.2%}'.format,
+    '夏普比率': '{:.2f}'.format,
+    '最大回撤': '{:.2%}'.format,
+    '胜率': '{:.2%}'.format,
+    '盈亏比': '{:.2f}'.format,
+    '最终资产': '{:,.0f}元'.format,
+}
+
+
+def metrics_frame(results: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """
+    汇总各策略的绩效指标
+
+    Args:
+        results: {策略名称: 回测报告}
+
+    Returns:
+        以策略名称为索引、绩效指标为列的DataFrame
+    """
+    return pd.DataFrame.from_dict(
+        {name: result['performance_metrics'] for name, result in results.items()},
+        orient='index'
+    )
+
+
+def comparison_frame(results: Dict[str, Dict[str, Any]], name_column: str = '策略名称',
+                     columns: Sequence[str] = None) -> pd.DataFrame:
+    """
+    构造策略对比表
+
+    Args:
+        results: {策略名称: 回测报告}
+        name_column: 策略名称列的列名
+        columns: 要包含的列名（见COMPARISON_COLUMNS），默认为全部
+
+    Returns:
+        每行一个策略的对比表，数值列保留原始数值
+    """
+    metrics = metrics_frame(results)
+    table = {name_column: metrics.index}
+    for key, label in COMPARISON_COLUMNS:
+        if columns is None or label in columns:
+            table[label] = metrics[key]
+    return pd.DataFrame(table).reset_index(drop=True)
@@ -5,37 +5,304 @@
 """
 
 import sqlite3
+import atexit
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from loguru import logger
 import os
+import threading
+import weakref
+from itertools import repeat
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# SQLite单条语句的参数个数上限（3.32之前的默认值，取最小值以兼容各版本）
+SQLITE_MAX_VARIABLES = 999
+
+# 每个连接创建时设置的PRAGMA：WAL模式下NORMAL同步已能保证一致性，
+# 临时表放内存，64MB页缓存，256MB内存映射读
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+# 信号、交易、组合快照先写入内存缓冲，累计到一定行数或超过时间间隔后批量落库
+WRITE_BUFFER_SIZE = 256
+WRITE_FLUSH_INTERVAL = 1.0
+
+# 日线行情的列类型：价格保持float64，避免float32的表示误差（如10.23读回为10.2299995）
+# 进入信号价格、成交金额和盈亏；成交量为整数
+STOCK_DATA_DTYPES = {
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'close': 'float64',
+    'volume': 'int64',
+    'amount': 'float64',
+}
+
+
+def normalize_stock_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将行情数据的OHLCV列统一为STOCK_DATA_DTYPES中的类型
+
+    Args:
+        df: 股票数据DataFrame
+
+    Returns:
+        转换列类型后的DataFrame，不存在的列保持不变
+    """
+    dtypes = {col: dtype for col, dtype in STOCK_DATA_DTYPES.items() if col in df.columns}
+    # 成交量含缺失值时无法转为整数，保持原类型
+    if 'volume' in dtypes and df['volume'].isna().any():
+        del dtypes['volume']
+    return df.astype(dtypes)
+
+
+CREATE_STOCK_DAILY_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        symbol TEXT NOT NULL,
+        date TEXT NOT NULL,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        volume INTEGER,
+        amount REAL,
+        PRIMARY KEY (symbol, date)
+    ) WITHOUT ROWID
+"""
+
+# get_stock_data返回的列（date为索引）及游标批量读取的行数
+STOCK_DATA_COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume', 'amount')
+FETCH_ARRAY_SIZE = 4096
+
+UPSERT_STOCK_DAILY_SQL = """
+    INSERT INTO stock_daily (symbol, date, open, high, low, close, volume, amount)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(symbol, date) DO UPDATE SET
+        open = excluded.open,
+        high = excluded.high,
+        low = excluded.low,
+        close = excluded.close,
+        volume = excluded.volume,
+        amount = excluded.amount
+"""
+
+INSERT_SIGNAL_SQL = """
+    INSERT INTO trading_signals 
+    (symbol, signal_type, signal_strength, price, strategy, reason, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_TRADE_SQL = """
+    INSERT INTO trades 
+    (symbol, action, shares, price, amount, commission, strategy, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_PORTFOLIO_SQL = """
+    INSERT INTO portfolio_history 
+    (total_value, cash, positions_value, total_pnl, total_pnl_pct, position_count, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+REPLACE_POSITION_SQL = """
+    REPLACE INTO positions 
+    (symbol, shares, avg_price, current_price, market_value, unrealized_pnl, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+DELETE_POSITION_SQL = "DELETE FROM positions WHERE symbol = ?"
+
+
+def _normalize_dates(data: pd.DataFrame) -> Optional[np.ndarray]:
+    """
+    取行情数据的日期并统一为'%Y-%m-%d'字符串数组
+    优先使用DatetimeIndex，其次为date列，最后尝试解析索引
+
+    Args:
+        data: 股票数据DataFrame
+
+    Returns:
+        日期字符串数组，无法解析时返回None
+    """
+    if isinstance(data.index, pd.DatetimeIndex):
+        dates = data.index
+    elif 'date' in data.columns:
+        dates = pd.DatetimeIndex(pd.to_datetime(data['date']))
+    else:
+        try:
+            dates = pd.DatetimeIndex(pd.to_datetime(data.index))
+        except (ValueError, TypeError):
+            return None
+    return dates.strftime('%Y-%m-%d').to_numpy()
 
 
 class DatabaseManager:
     """数据库管理器"""
 
-    def __init__(self, db_path: str = "data/trading.db"):
+    # 按线程缓存的数据库连接，所有实例共享，避免每次查询重新建立连接
+    _local = threading.local()
+
+    # 存活的实例，进程退出前统一写入剩余缓冲
+    _instances = weakref.WeakSet()
+
+    # 行情Parquet文件的读-合并-写过程需要串行
+    _bars_lock = threading.Lock()
+
+    def __init__(self, db_path: str = "data/trading.db", bars_dir: str = None):
         """
         初始化数据库管理器
 
         Args:
             db_path: 数据库文件路径
+            bars_dir: 日线行情Parquet文件目录，默认为数据库同目录下的bars；未安装pyarrow时行情存入SQLite
         """
         self.db_path = db_path
+        self.bars_dir = bars_dir or os.path.join(os.path.dirname(db_path), 'bars')
+        self.use_parquet = PYARROW_AVAILABLE
+
+        # 写入缓冲
+        self._signal_buffer = []
+        self._trade_buffer = []
+        self._portfolio_buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flush_timer = None
 
         # 确保数据目录存在
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        if self.use_parquet:
+            os.makedirs(self.bars_dir, exist_ok=True)
 
         # 初始化数据库
         self._init_database()
 
+        DatabaseManager._instances.add(self)
+
         logger.info(f"数据库管理器初始化完成: {db_path}")
 
+    def _connect(self) -> sqlite3.Connection:
+        """
+        获取当前线程的数据库连接，首次使用时创建并缓存
+        sqlite3连接不能跨线程/进程共享，因此按线程和进程号区分
+
+        Returns:
+            sqlite3连接（自动提交模式，批量写入显式BEGIN IMMEDIATE后以with上下文提交/回滚）
+        """
+        connections = getattr(self._local, 'connections', None)
+        if connections is None or self._local.pid != os.getpid():
+            connections = self._local.connections = {}
+            self._local.pid = os.getpid()
+
+        conn = connections.get(self.db_path)
+        if conn is None:
+            # 关闭sqlite3模块的隐式事务：单条语句立即提交，批量写入由调用方显式开启写事务，
+            # 一开始就持有写锁，避免延迟事务中途升级写锁时遇到SQLITE_BUSY
+            conn = connections[self.db_path] = sqlite3.connect(self.db_path, isolation_level=None)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+        return conn
+
+    def close(self):
+        """写入缓冲数据并关闭当前线程缓存的数据库连接，程序退出前调用"""
+        self.flush()
+        self._close_thread_connection()
+
+    def _close_thread_connection(self):
+        """关闭当前线程缓存的数据库连接"""
+        connections = getattr(self._local, 'connections', None)
+        if not connections or self._local.pid != os.getpid():
+            return
+
+        conn = connections.pop(self.db_path, None)
+        if conn is not None:
+            conn.close()
+
+    def _buffer_row(self, buffer: list, row: tuple):
+        """
+        将一行待写入数据加入缓冲，达到行数或时间阈值时立即落库，否则定时落库
+
+        Args:
+            buffer: 目标缓冲列表
+            row: 行数据
+        """
+        with self._buffer_lock:
+            buffer.append(row)
+            pending = len(self._signal_buffer) + len(self._trade_buffer) + len(self._portfolio_buffer)
+            due = (pending >= WRITE_BUFFER_SIZE or
+                   time.monotonic() - self._last_flush >= WRITE_FLUSH_INTERVAL)
+            if not due and self._flush_timer is None:
+                self._flush_timer = threading.Timer(WRITE_FLUSH_INTERVAL, self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+        if due:
+            self.flush()
+
+    def _timed_flush(self):
+        """定时器线程中落库，每个定时器都是新线程，写入后关闭该线程的连接"""
+        try:
+            self.flush()
+        finally:
+            self._close_thread_connection()
+
+    def flush(self):
+        """
+        将缓冲中的信号、交易和组合快照在一个事务内批量写入数据库
+        写入失败时事务回滚，数据放回缓冲等待下次落库
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                signals = self._signal_buffer[:]
+                trades = self._trade_buffer[:]
+                snapshots = self._portfolio_buffer[:]
+                self._signal_buffer.clear()
+                self._trade_buffer.clear()
+                self._portfolio_buffer.clear()
+                self._last_flush = time.monotonic()
+                timer, self._flush_timer = self._flush_timer, None
+
+            if timer is not None:
+                timer.cancel()
+
+            if not (signals or trades or snapshots):
+                return
+
+            try:
+                with self._connect() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    if signals:
+                        conn.executemany(INSERT_SIGNAL_SQL, signals)
+                    if trades:
+                        conn.executemany(INSERT_TRADE_SQL, trades)
+                    if snapshots:
+                        conn.executemany(INSERT_PORTFOLIO_SQL, snapshots)
+
+            except Exception as e:
+                logger.error(f"批量写入缓冲数据失败，{len(signals) + len(trades) + len(snapshots)}条数据保留在缓冲中: {e}")
+                with self._buffer_lock:
+                    # 放回缓冲头部，保持写入顺序
+                    self._signal_buffer[:0] = signals
+                    self._trade_buffer[:0] = trades
+                    self._portfolio_buffer[:0] = snapshots
+
     def _init_database(self):
         """初始化数据库表结构"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            # WAL日志模式持久保存在数据库文件中，读写互不阻塞，只需设置一次
+            conn.execute("PRAGMA journal_mode=WAL")
+
             # 股票基本信息表
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS stock_info (
@@ -48,22 +315,10 @@ class DatabaseManager:
                 )
             """)
 
-            # 股票日线数据表
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS stock_daily (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    symbol TEXT,
-                    date DATE,
-                    open REAL,
-                    high REAL,
-                    low REAL,
-                    close REAL,
-                    volume INTEGER,
-                    amount REAL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(symbol, date)
-                )
-            """)
+            # 股票日线数据表：以(symbol, date)为主键并按主键聚簇存储，
+            # 主键是唯一的B树，按股票取日期区间为一次顺序扫描
+            self._migrate_stock_daily(conn)
+            conn.execute(CREATE_STOCK_DAILY_SQL.format(table='stock_daily'))
 
             # 交易信号表
             conn.execute("""
@@ -126,13 +381,37 @@ class DatabaseManager:
             """)
 
             # 创建索引
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_stock_daily_symbol_date ON stock_daily(symbol, date)")
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_signals_symbol_timestamp ON trading_signals(symbol, timestamp)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol_timestamp ON trades(symbol, timestamp)")
 
             conn.commit()
 
+    def _migrate_stock_daily(self, conn: sqlite3.Connection):
+        """
+        将旧版stock_daily表（自增id + UNIQUE(symbol, date) + 额外索引）迁移为以(symbol, date)为主键的WITHOUT ROWID表
+
+        Args:
+            conn: 数据库连接
+        """
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(stock_daily)")]
+        if 'id' not in columns:
+            return
+
+        logger.info("迁移stock_daily表结构为(symbol, date)主键")
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DROP TABLE IF EXISTS stock_daily_new")
+            conn.execute(CREATE_STOCK_DAILY_SQL.format(table='stock_daily_new'))
+            conn.execute("""
+                INSERT INTO stock_daily_new (symbol, date, open, high, low, close, volume, amount)
+                SELECT symbol, date, open, high, low, close, volume, amount FROM stock_daily
+                WHERE symbol IS NOT NULL AND date IS NOT NULL
+            """)
+            conn.execute("DROP INDEX IF EXISTS idx_stock_daily_symbol_date")
+            conn.execute("DROP TABLE stock_daily")
+            conn.execute("ALTER TABLE stock_daily_new RENAME TO stock_daily")
+
     def save_stock_data(self, symbol: str, data: pd.DataFrame):
         """
         保存股票数据
@@ -142,49 +421,100 @@ class DatabaseManager:
             data: 股票数据DataFrame
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # 准备数据
-                data_to_save = data.copy()
-                data_to_save['symbol'] = symbol
-                
-                # 确保索引是日期格式
-                if hasattr(data_to_save.index, 'strftime'):
-                    # 如果索引是DatetimeIndex，直接使用strftime
-                    data_to_save['date'] = data_to_save.index.strftime('%Y-%m-%d')
-                elif 'date' in data_to_save.columns:
-                    # 如果有date列，使用该列
-                    data_to_save['date'] = pd.to_datetime(data_to_save['date']).dt.strftime('%Y-%m-%d')
-                else:
-                    # 如果索引不是日期格式，尝试转换
-                    try:
-                        data_to_save['date'] = pd.to_datetime(data_to_save.index).strftime('%Y-%m-%d')
-                    except:
-                        # 如果转换失败，使用当前日期
-                        logger.warning(f"无法解析 {symbol} 的日期索引，使用当前日期")
-                        data_to_save['date'] = datetime.now().strftime('%Y-%m-%d')
-
-                # 选择需要的列
-                columns = ['symbol', 'date', 'open', 'high', 'low', 'close', 'volume']
-                if 'amount' in data_to_save.columns:
-                    columns.append('amount')
-                else:
-                    data_to_save['amount'] = data_to_save['volume'] * data_to_save['close']
-                    columns.append('amount')
-
-                # 保存数据（使用REPLACE避免重复）
-                for _, row in data_to_save[columns].iterrows():
-                    conn.execute("""
-                        REPLACE INTO stock_daily 
-                        (symbol, date, open, high, low, close, volume, amount)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, tuple(row))
-
-                conn.commit()
-                logger.info(f"保存 {symbol} 数据 {len(data_to_save)} 条")
+            dates = _normalize_dates(data)
+            if dates is None:
+                logger.warning(f"无法解析 {symbol} 的日期索引，使用当前日期")
+                dates = np.full(len(data), datetime.now().strftime('%Y-%m-%d'), dtype=object)
+            n = len(dates)
+
+            # 只取需要的列数组，不复制整个DataFrame
+            volume = data['volume'].to_numpy()
+            close = data['close'].to_numpy()
+            columns = {
+                'date': dates,
+                'open': data['open'].to_numpy(),
+                'high': data['high'].to_numpy(),
+                'low': data['low'].to_numpy(),
+                'close': close,
+                'volume': volume,
+                'amount': data['amount'].to_numpy() if 'amount' in data.columns else volume * close
+            }
+
+            if self.use_parquet:
+                # 同一日期有多行时保留最后一行
+                rows = pd.DataFrame(columns).drop_duplicates(subset='date', keep='last')
+                self._save_bars_parquet(symbol, rows)
+            else:
+                self._save_bars_sqlite(symbol, columns)
+
+            logger.info(f"保存 {symbol} 数据 {n} 条")
 
         except Exception as e:
             logger.error(f"保存股票数据失败 {symbol}: {e}")
 
+    def _save_bars_sqlite(self, symbol: str, columns: Dict[str, np.ndarray]):
+        """
+        将日线数据写入SQLite的stock_daily表
+
+        Args:
+            symbol: 股票代码
+            columns: 列名到等长数组的映射（date, open, high, low, close, volume, amount）
+        """
+        # 列数组直接拼成参数行，数组转为Python标量以便sqlite3绑定
+        params = zip(repeat(symbol), *(columns[col].tolist() for col in STOCK_DATA_COLUMNS))
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # 已存在的(symbol, date)原地更新价格列，不删除重建行；同一日期出现多次时后面的行生效
+            conn.executemany(UPSERT_STOCK_DAILY_SQL, params)
+
+    def _bars_path(self, symbol: str) -> str:
+        """获取股票日线Parquet文件路径"""
+        return os.path.join(self.bars_dir, f"{symbol}.parquet")
+
+    def _save_bars_parquet(self, symbol: str, rows: pd.DataFrame):
+        """
+        将日线数据合并写入该股票的Parquet文件（按日期排序，同一日期的旧数据被覆盖）
+
+        Args:
+            symbol: 股票代码
+            rows: 待保存数据（日期唯一）
+        """
+        path = self._bars_path(symbol)
+        with self._bars_lock:
+            if os.path.exists(path):
+                existing = pq.read_table(path).to_pandas()
+            else:
+                # 首次写入Parquet时并入该股票已存于SQLite的历史数据（一次性迁移），
+                # 此后读取只走Parquet文件，不能遗漏早期数据
+                existing = self._read_bars_sqlite(symbol)
+
+            if not existing.empty:
+                # 与SQLite路径一致：同一日期以新数据为准，其余日期保留
+                kept = existing[~existing['date'].isin(rows['date'])]
+                rows = pd.concat([kept, rows], ignore_index=True)
+
+            rows = normalize_stock_data(rows.sort_values('date', kind='stable', ignore_index=True))
+
+            # 先写临时文件再替换，避免读取到写了一半的文件
+            tmp_path = f"{path}.tmp"
+            pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), tmp_path, compression='zstd')
+            os.replace(tmp_path, path)
+
+    def _read_bars_sqlite(self, symbol: str) -> pd.DataFrame:
+        """
+        读取该股票在SQLite的stock_daily表中的全部日线数据
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            STOCK_DATA_COLUMNS列（date为'%Y-%m-%d'字符串）按日期升序的DataFrame
+        """
+        query = f"SELECT {', '.join(STOCK_DATA_COLUMNS)} FROM stock_daily WHERE symbol = ? ORDER BY date"
+        cursor = self._connect().execute(query, (symbol,))
+        cursor.arraysize = FETCH_ARRAY_SIZE
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=list(STOCK_DATA_COLUMNS))
+
     def get_stock_data(self, symbol: str, start_date: str = None, end_date: str = None,
                        limit: int = None) -> pd.DataFrame:
         """
@@ -200,8 +530,12 @@ class DatabaseManager:
             股票数据DataFrame
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                query = "SELECT date, open, high, low, close, volume, amount FROM stock_daily WHERE symbol = ?"
+            if self.use_parquet and os.path.exists(self._bars_path(symbol)):
+                return self._get_bars_parquet(symbol, start_date, end_date, limit)
+
+            # 未安装pyarrow或该股票仅有早期写入SQLite的数据
+            with self._connect() as conn:
+                query = f"SELECT {', '.join(STOCK_DATA_COLUMNS)} FROM stock_daily WHERE symbol = ?"
                 params = [symbol]
 
                 if start_date:
@@ -212,41 +546,73 @@ class DatabaseManager:
                     query += " AND date <= ?"
                     params.append(end_date)
 
-                query += " ORDER BY date DESC"
-
                 if limit:
-                    query += f" LIMIT {limit}"
+                    # 按主键倒序取最近limit条，外层再恢复升序
+                    query = f"SELECT * FROM ({query} ORDER BY date DESC LIMIT ?) ORDER BY date"
+                    params.append(int(limit))
+                else:
+                    query += " ORDER BY date"
 
-                df = pd.read_sql_query(query, conn, params=params)
+                # 直接取全部结果构造DataFrame，省去read_sql_query逐行处理的开销
+                cursor = conn.execute(query, params)
+                cursor.arraysize = FETCH_ARRAY_SIZE
+                df = pd.DataFrame.from_records(cursor.fetchall(), columns=list(STOCK_DATA_COLUMNS))
 
                 if not df.empty:
-                    df['date'] = pd.to_datetime(df['date'])
+                    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d', cache=True)
                     df.set_index('date', inplace=True)
-                    df.sort_index(inplace=True)
 
-                return df
+                return normalize_stock_data(df)
 
         except Exception as e:
             logger.error(f"获取股票数据失败 {symbol}: {e}")
             return pd.DataFrame()
 
+    def _get_bars_parquet(self, symbol: str, start_date: str = None, end_date: str = None,
+                          limit: int = None) -> pd.DataFrame:
+        """
+        从Parquet文件读取日线数据，日期条件下推到文件扫描
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            limit: 只取最近的条数
+
+        Returns:
+            按日期升序、以日期为索引的股票数据DataFrame
+        """
+        condition = None
+        if start_date:
+            condition = ds.field('date') >= start_date
+        if end_date:
+            upper = ds.field('date') <= end_date
+            condition = upper if condition is None else condition & upper
+
+        table = ds.dataset(self._bars_path(symbol), format='parquet').to_table(
+            columns=list(STOCK_DATA_COLUMNS), filter=condition
+        )
+        df = table.to_pandas()
+
+        # 文件内已按日期排序
+        if limit:
+            df = df.tail(limit)
+
+        if not df.empty:
+            df['date'] = pd.to_datetime(df['date'])
+            df.set_index('date', inplace=True)
+
+        # 统一成交量等列的类型
+        return normalize_stock_data(df)
+
     def save_signal(self, symbol: str, signal_type: str, strength: float, price: float,
                     strategy: str, reason: str, timestamp: datetime = None):
         """保存交易信号"""
         if timestamp is None:
             timestamp = datetime.now()
 
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT INTO trading_signals 
-                    (symbol, signal_type, signal_strength, price, strategy, reason, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (symbol, signal_type, strength, price, strategy, reason, timestamp))
-                conn.commit()
-
-        except Exception as e:
-            logger.error(f"保存交易信号失败: {e}")
+        self._buffer_row(self._signal_buffer,
+                         (symbol, signal_type, strength, price, strategy, reason, timestamp))
 
     def save_trade(self, symbol: str, action: str, shares: int, price: float,
                    amount: float, commission: float, strategy: str, timestamp: datetime = None):
@@ -254,17 +620,8 @@ class DatabaseManager:
         if timestamp is None:
             timestamp = datetime.now()
 
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT INTO trades 
-                    (symbol, action, shares, price, amount, commission, strategy, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (symbol, action, shares, price, amount, commission, strategy, timestamp))
-                conn.commit()
-
-        except Exception as e:
-            logger.error(f"保存交易记录失败: {e}")
+        self._buffer_row(self._trade_buffer,
+                         (symbol, action, shares, price, amount, commission, strategy, timestamp))
 
     def update_position(self, symbol: str, shares: int, avg_price: float, current_price: float):
         """更新持仓记录"""
@@ -272,12 +629,10 @@ class DatabaseManager:
             market_value = shares * current_price
             unrealized_pnl = (current_price - avg_price) * shares
 
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    REPLACE INTO positions 
-                    (symbol, shares, avg_price, current_price, market_value, unrealized_pnl, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (symbol, shares, avg_price, current_price, market_value, unrealized_pnl, datetime.now()))
+            with self._connect() as conn:
+                conn.execute(REPLACE_POSITION_SQL,
+                             (symbol, shares, avg_price, current_price, market_value, unrealized_pnl,
+                              datetime.now()))
                 conn.commit()
 
         except Exception as e:
@@ -286,8 +641,8 @@ class DatabaseManager:
     def delete_position(self, symbol: str):
         """删除持仓记录"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("DELETE FROM positions WHERE symbol = ?", (symbol,))
+            with self._connect() as conn:
+                conn.execute(DELETE_POSITION_SQL, (symbol,))
                 conn.commit()
 
         except Exception as e:
@@ -296,7 +651,7 @@ class DatabaseManager:
     def get_positions(self) -> pd.DataFrame:
         """获取当前持仓"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 df = pd.read_sql_query("""
                     SELECT symbol, shares, avg_price, current_price, market_value, unrealized_pnl, updated_at
                     FROM positions WHERE shares > 0
@@ -310,24 +665,17 @@ class DatabaseManager:
     def save_portfolio_snapshot(self, total_value: float, cash: float, positions_value: float,
                                 total_pnl: float, total_pnl_pct: float, position_count: int):
         """保存投资组合快照"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT INTO portfolio_history 
-                    (total_value, cash, positions_value, total_pnl, total_pnl_pct, position_count, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (total_value, cash, positions_value, total_pnl, total_pnl_pct, position_count, datetime.now()))
-                conn.commit()
-
-        except Exception as e:
-            logger.error(f"保存投资组合快照失败: {e}")
+        self._buffer_row(self._portfolio_buffer,
+                         (total_value, cash, positions_value, total_pnl, total_pnl_pct, position_count,
+                          datetime.now()))
 
     def get_portfolio_history(self, days: int = 30) -> pd.DataFrame:
         """获取投资组合历史"""
         try:
             start_date = datetime.now() - timedelta(days=days)
+            self.flush()
 
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 df = pd.read_sql_query("""
                     SELECT * FROM portfolio_history 
                     WHERE timestamp >= ? 
@@ -346,7 +694,8 @@ class DatabaseManager:
     def get_recent_signals(self, limit: int = 50) -> pd.DataFrame:
         """获取最近的交易信号"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            self.flush()
+            with self._connect() as conn:
                 df = pd.read_sql_query("""
                     SELECT * FROM trading_signals 
                     ORDER BY timestamp DESC 
@@ -365,7 +714,8 @@ class DatabaseManager:
     def get_recent_trades(self, limit: int = 50) -> pd.DataFrame:
         """获取最近的交易记录"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            self.flush()
+            with self._connect() as conn:
                 df = pd.read_sql_query("""
                     SELECT * FROM trades 
                     ORDER BY timestamp DESC 
@@ -379,4 +729,54 @@ class DatabaseManager:
 
         except Exception as e:
             logger.error(f"获取交易记录失败: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            return pd.DataFrame()
+
+    def _fetch_records(self, query: str, params: list) -> List[Dict]:
+        """
+        执行查询并以字典列表返回结果，适合少量行的展示场景，避免构造DataFrame的开销
+
+        Args:
+            query: SQL语句
+            params: 查询参数
+
+        Returns:
+            每行一个字典的列表
+        """
+        self.flush()
+        with self._connect() as conn:
+            cursor = conn.execute(query, params)
+            cursor.row_factory = sqlite3.Row
+            return [dict(row) for row in cursor]
+
+    def get_recent_signals_records(self, limit: int = 10) -> List[Dict]:
+        """获取最近的交易信号（字典列表）"""
+        try:
+            return self._fetch_records("""
+                SELECT * FROM trading_signals 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            """, [limit])
+
+        except Exception as e:
+            logger.error(f"获取交易信号失败: {e}")
+            return []
+
+    def get_recent_trades_records(self, limit: int = 10) -> List[Dict]:
+        """获取最近的交易记录（字典列表）"""
+        try:
+            return self._fetch_records("""
+                SELECT * FROM trades 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            """, [limit])
+
+        except Exception as e:
+            logger.error(f"获取交易记录失败: {e}")
+            return []
+
+
+@atexit.register
+def _flush_all_buffers():
+    """进程退出前写入所有数据库管理器的剩余缓冲"""
+    for manager in list(DatabaseManager._instances):
+        manager.flush()
@@ -6,32 +6,22 @@
 
 import os
 import sys
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import time
-from loguru import logger
+from datetime import datetime
 
 # 添加项目根目录到Python路径
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-# 导入项目模块
-from data.database import DatabaseManager
-from utils.real_data_fetcher import RealDataFetcher
-from backtest.backtest_engine import BacktestEngine
-
-# 导入策略
-from strategies.double_ma_strategy import DoubleMaStrategy
-from strategies.rsi_strategy import RSIStrategy
-from strategies.macd_strategy import MACDStrategy
+# 回测模块（及其依赖的数据源、策略）在选择对应演示后才导入，菜单启动时不加载
 
-from datetime import datetime
 
+def demo_quick_test(interactive: bool = True):
+    """
+    演示快速测试功能
 
-def demo_quick_test():
-    """演示快速测试功能"""
+    Args:
+        interactive: 是否询问后再运行，False时直接运行（命令行调用）
+    """
     print("=" * 60)
     print("🚀 高换手率股票回测系统演示")
     print("=" * 60)
@@ -69,7 +59,7 @@ def demo_quick_test():
     print("\n" + "=" * 60)
     
     # 询问是否运行
-    choice = input("是否运行快速测试? (y/n): ").lower().strip()
+    choice = input("是否运行快速测试? (y/n): ").lower().strip() if interactive else 'y'
     
     if choice == 'y':
         print("\n🔄 正在运行快速测试...")
@@ -83,8 +73,16 @@ def demo_quick_test():
     else:
         print("✅ 演示结束")
 
-def demo_full_backtest():
-    """演示完整回测功能"""
+def demo_full_backtest(interactive: bool = True, days: int = 30, top_n: int = 50, data_days: int = 60):
+    """
+    演示完整回测功能
+
+    Args:
+        interactive: 是否询问后再运行并交互输入参数，False时按传入参数直接运行（命令行调用）
+        days: 统计换手率天数
+        top_n: 选择股票数量
+        data_days: 历史数据天数
+    """
     print("\n" + "=" * 60)
     print("🔍 完整高换手率回测演示")
     print("=" * 60)
@@ -108,14 +106,15 @@ def demo_full_backtest():
     print("   - 策略选择: 单策略或全部策略")
     print("   - 数据周期: 60-120天")
     
-    choice = input("\n是否运行完整回测? (y/n): ").lower().strip()
+    choice = input("\n是否运行完整回测? (y/n): ").lower().strip() if interactive else 'y'
     
     if choice == 'y':
         # 获取参数
         try:
-            days = int(input("统计换手率天数 (默认30): ") or "30")
-            top_n = int(input("选择股票数量 (默认50): ") or "50")
-            data_days = int(input("历史数据天数 (默认60): ") or "60")
+            if interactive:
+                days = int(input(f"统计换手率天数 (默认{days}): ") or days)
+                top_n = int(input(f"选择股票数量 (默认{top_n}): ") or top_n)
+                data_days = int(input(f"历史数据天数 (默认{data_days}): ") or data_days)
             
             print(f"\n🔄 正在运行完整回测...")
             print(f"   统计天数: {days}天")
@@ -210,12 +209,43 @@ def show_results_explanation():
     print("   🌟     一般: 年化收益>5%,  夏普比率>0.5, 回撤<20%")
 
 def main():
-    """主函数"""
+    """
+    主函数
+    指定子命令时直接执行对应功能（可用于脚本和CI），否则进入交互菜单
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="高换手率股票策略演示")
+    parser.add_argument("command", nargs="?", choices=["quick", "full", "examples", "results"],
+                        help="quick: 快速测试, full: 完整回测, examples: 使用示例, results: 结果说明")
+    parser.add_argument("--days", type=int, default=30, help="完整回测：统计换手率天数")
+    parser.add_argument("--top-n", type=int, default=50, help="完整回测：选择股票数量")
+    parser.add_argument("--data-days", type=int, default=60, help="完整回测：历史数据天数")
+    args = parser.parse_args()
+    
+    if args.command:
+        commands = {
+            'quick': lambda: demo_quick_test(interactive=False),
+            'full': lambda: demo_full_backtest(interactive=False, days=args.days,
+                                               top_n=args.top_n, data_days=args.data_days),
+            'examples': show_usage_examples,
+            'results': show_results_explanation
+        }
+        commands[args.command]()
+        return
+    
     print("🎯 高换手率股票回测系统")
     print("=" * 60)
     print("本系统用于筛选高换手率股票并进行量化策略回测")
     print(f"当前时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
+    menu = {
+        '1': demo_quick_test,
+        '2': demo_full_backtest,
+        '3': show_usage_examples,
+        '4': show_results_explanation
+    }
+    
     while True:
         print("\n📋 请选择功能:")
         print("1. 🚀 快速测试演示")
@@ -226,17 +256,13 @@ def main():
         
         choice = input("\n请输入选择 (1-5): ").strip()
         
-        if choice == '1':
-            demo_quick_test()
-        elif choice == '2':
-            demo_full_backtest()
-        elif choice == '3':
-            show_usage_examples()
-        elif choice == '4':
-            show_results_explanation()
-        elif choice == '5':
+        if choice == '5':
             print("\n✅ 感谢使用！")
             break
+        
+        action = menu.get(choice)
+        if action:
+            action()
         else:
             print("❌ 无效选择，请重新输入")
 
@@ -10,11 +10,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # 添加项目根目录到Python路径
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -22,23 +20,98 @@ sys.path.insert(0, project_root)
 
 # 导入项目模块
 from data.database import DatabaseManager
-from utils.real_data_fetcher import RealDataFetcher
-from backtest.backtest_engine import BacktestEngine
+from utils.real_data_fetcher import RealDataFetcher, RateLimiter
+from backtest.backtest_engine import BacktestEngine, write_csv, write_parquet
+from backtest.parallel import run_strategies
+from backtest.report import comparison_frame, metrics_frame, COMPARISON_FORMATTERS
 
 # 导入所有策略
 from strategies.double_ma_strategy import DoubleMaStrategy
 from strategies.rsi_strategy import RSIStrategy
 from strategies.macd_strategy import MACDStrategy
 
-try:
-    import akshare as ak
-    AKSHARE_AVAILABLE = True
-except ImportError:
-    AKSHARE_AVAILABLE = False
-    logger.warning("AKShare未安装，将使用模拟数据")
+# AKShare依赖较多、导入耗时，仅在在线筛选换手率时由_load_akshare()加载
+ak = None
 
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+# 并发查询换手率的线程数，以及演示时扫描的股票数量
+TURNOVER_WORKERS = 16
+TURNOVER_SCAN_LIMIT = 500
+
+# 按板块分类的优质股票池：(板块, 权重, 股票代码)，按顺序从各板块取前max(1, int(top_n * 权重))只
+OPTIMIZED_STOCK_POOL = (
+    # 大盘蓝筹股（稳定性好，适合长期持有）
+    ('金融银行', 0.20, ('000001', '600036', '600000', '601318', '000002', '600016')),
+    ('央企国企', 0.15, ('600519', '000858', '601857', '600887', '601398', '600031')),
+    # 科技成长股（成长性好，适度活跃）
+    ('科技龙头', 0.20, ('002415', '300059', '300124', '002230', '300142', '300015')),
+    ('新能源', 0.15, ('002594', '300750', '002475', '300274', '300316', '002304')),
+    # 消费医药股（防御性好）：消费品 + 医药生物
+    ('消费医药', 0.10, ('000063', '000568', '002352', '000725', '600276', '000876',
+                    '300015', '300142', '002241', '000538', '300347', '002558')),
+    # 制造业（周期性适中）：先进制造 + 新材料
+    ('制造业', 0.10, ('002371', '002405', '300296', '300408', '002493', '000425',
+                   '002555', '300251', '002714', '300454', '000100', '000157')),
+    # 新兴产业（适度投机）：人工智能 + 新基建
+    ('新兴产业', 0.10, ('300496', '300433', '002252', '300144', '000069', '000338',
+                    '600166', '002508', '300122', '601857', '000503', '000166')),
+)
+
+# 优化回测引擎参数
+OPTIMIZED_ENGINE_KWARGS = {
+    'initial_capital': 1000000,    # 100万初始资金
+    'commission_rate': 0.0003,     # 万3手续费
+    'stamp_tax_rate': 0.001,       # 千1印花税
+    'min_trade_unit': 100          # 最小交易单位
+}
+
+
+def _load_akshare():
+    """
+    按需导入AKShare，使用离线股票池时不加载
+
+    Returns:
+        akshare模块，未安装时返回None
+    """
+    global ak
+    if ak is None:
+        try:
+            import akshare
+        except ImportError:
+            return None
+        ak = akshare
+    return ak
+
+
+def _fetch_turnover(code_name: tuple, limiter: RateLimiter) -> Optional[tuple]:
+    """
+    查询单只股票的换手率原始值
+
+    Args:
+        code_name: (股票代码, 股票名称)
+        limiter: 共享的请求限速器
+
+    Returns:
+        (股票代码, 股票名称, 换手率原始值如'3.21%')，查询失败时返回None
+    """
+    stock_code, stock_name = code_name
+    try:
+        limiter.wait()
+
+        # 获取股票基本信息
+        stock_individual_info = ak.stock_individual_info_em(symbol=stock_code)
+        if stock_individual_info.empty:
+            return None
+
+        # 查找换手率信息
+        turnover_row = stock_individual_info[stock_individual_info['item'] == '换手率']
+        if turnover_row.empty:
+            return None
+
+        return stock_code, stock_name, turnover_row.iloc[0]['value']
+
+    except Exception as e:
+        logger.debug(f"获取{stock_code}换手率失败: {e}")
+        return None
 
 
 class HighTurnoverBacktest:
@@ -56,6 +129,7 @@ class HighTurnoverBacktest:
         
         self.high_turnover_stocks = []
         self.backtest_results = {}
+        self._figure = None  # 结果图表，多次绘图时复用
         
         logger.info("高换手率股票回测系统初始化完成")
     
@@ -72,7 +146,7 @@ class HighTurnoverBacktest:
         """
         logger.info(f"开始获取过去{days}天换手率最高的{top_n}只股票...")
         
-        if not AKSHARE_AVAILABLE:
+        if _load_akshare() is None:
             logger.warning("AKShare不可用，使用优化的模拟股票池")
             return self._get_optimized_stock_pool(top_n)
         
@@ -81,65 +155,41 @@ class HighTurnoverBacktest:
             stock_info = ak.stock_info_a_code_name()
             logger.info(f"获取到{len(stock_info)}只A股信息")
             
-            # 计算换手率
-            turnover_data = []
-            
-            for idx, row in stock_info.iterrows():
-                stock_code = row['code']
-                stock_name = row['name']
-                
-                try:
-                    # 获取个股资金流向数据（包含换手率）
-                    end_date = datetime.now()
-                    start_date = end_date - timedelta(days=days)
-                    
-                    # 获取股票基本信息
-                    stock_individual_info = ak.stock_individual_info_em(symbol=stock_code)
-                    
-                    if not stock_individual_info.empty:
-                        # 查找换手率信息
-                        turnover_row = stock_individual_info[stock_individual_info['item'] == '换手率']
-                        if not turnover_row.empty:
-                            turnover_rate = turnover_row.iloc[0]['value']
-                            try:
-                                turnover_rate = float(turnover_rate.replace('%', ''))
-                                # 筛选合理换手率范围：2%-15%（避免过度投机）
-                                if 2.0 <= turnover_rate <= 15.0:
-                                    turnover_data.append({
-                                        'code': stock_code,
-                                        'name': stock_name,
-                                        'turnover_rate': turnover_rate
-                                    })
-                            except:
-                                continue
-                    
-                    # 限制请求频率
-                    time.sleep(0.1)
-                    
+            # 并发查询个股换手率（网络请求为主，线程池重叠等待时间，限速器控制请求频率）
+            # 为了演示，只处理前TURNOVER_SCAN_LIMIT只股票
+            head = stock_info.head(TURNOVER_SCAN_LIMIT)
+            candidates = list(zip(head['code'].to_numpy(), head['name'].to_numpy()))
+            limiter = RateLimiter()
+            turnover_rows = []
+
+            with ThreadPoolExecutor(max_workers=TURNOVER_WORKERS) as executor:
+                results = executor.map(lambda item: _fetch_turnover(item, limiter), candidates)
+                for i, result in enumerate(results):
+                    if result is not None:
+                        turnover_rows.append(result)
+
                     # 每处理100只股票显示进度
-                    if (idx + 1) % 100 == 0:
-                        logger.info(f"已处理 {idx + 1}/{len(stock_info)} 只股票")
-                    
-                    # 为了演示，只处理前500只股票
-                    if idx >= 500:
-                        break
-                        
-                except Exception as e:
-                    logger.debug(f"获取{stock_code}换手率失败: {e}")
-                    continue
+                    if (i + 1) % 100 == 0:
+                        logger.info("已处理 {}/{} 只股票", i + 1, len(candidates))
             
-            # 按换手率排序
-            turnover_df = pd.DataFrame(turnover_data)
+            # 换手率字符串整列解析，无法解析的丢弃
+            turnover_df = pd.DataFrame(turnover_rows, columns=['code', 'name', 'raw_turnover'])
+            turnover_df['turnover_rate'] = pd.to_numeric(
+                turnover_df['raw_turnover'].astype(str).str.rstrip('%'), errors='coerce'
+            )
+            # 筛选合理换手率范围：2%-15%（避免过度投机）
+            turnover_df = turnover_df[turnover_df['turnover_rate'].between(2.0, 15.0)]
             if turnover_df.empty:
                 logger.warning("未获取到换手率数据，使用优化的模拟数据")
                 return self._get_optimized_stock_pool(top_n)
             
-            turnover_df = turnover_df.sort_values('turnover_rate', ascending=False)
-            top_stocks = turnover_df.head(top_n)
+            # 按换手率取前N只
+            top_stocks = turnover_df.nlargest(top_n, 'turnover_rate')
             
             logger.info(f"筛选出的优质活跃股票{top_n}只:")
-            for _, row in top_stocks.head(10).iterrows():
-                logger.info(f"  {row['code']} {row['name']}: {row['turnover_rate']:.2f}%")
+            for code, name, turnover_rate in top_stocks.head(10)[['code', 'name', 'turnover_rate']].itertuples(
+                    index=False, name=None):
+                logger.info(f"  {code} {name}: {turnover_rate:.2f}%")
             
             self.high_turnover_stocks = top_stocks['code'].tolist()
             return self.high_turnover_stocks
@@ -150,55 +200,17 @@ class HighTurnoverBacktest:
     
     def _get_optimized_stock_pool(self, top_n: int) -> List[str]:
         """获取优化的股票池 - 平衡活跃度和质量"""
-        # 按板块分类的优质股票池
-        stock_pool = {
-            # 大盘蓝筹股（稳定性好，适合长期持有）
-            '金融银行': ['000001', '600036', '600000', '601318', '000002', '600016'],
-            '央企国企': ['600519', '000858', '601857', '600887', '601398', '600031'],
-            
-            # 科技成长股（成长性好，适度活跃）
-            '科技龙头': ['002415', '300059', '300124', '002230', '300142', '300015'],
-            '新能源': ['002594', '300750', '002475', '300274', '300316', '002304'],
-            
-            # 消费医药股（防御性好）
-            '消费品': ['000063', '000568', '002352', '000725', '600276', '000876'],
-            '医药生物': ['300015', '300142', '002241', '000538', '300347', '002558'],
-            
-            # 制造业（周期性适中）
-            '先进制造': ['002371', '002405', '300296', '300408', '002493', '000425'],
-            '新材料': ['002555', '300251', '002714', '300454', '000100', '000157'],
-            
-            # 新兴产业（适度投机）
-            '人工智能': ['300496', '300433', '002252', '300144', '000069', '000338'],
-            '新基建': ['600166', '002508', '300122', '601857', '000503', '000166']
-        }
-        
-        # 按权重选择股票
         selected_stocks = []
-        weights = {
-            '金融银行': 0.20,    # 20% - 稳定基础
-            '央企国企': 0.15,    # 15% - 价值支撑
-            '科技龙头': 0.20,    # 20% - 成长动力
-            '新能源': 0.15,      # 15% - 热点题材
-            '消费医药': 0.10,    # 10% - 防御配置
-            '制造业': 0.10,      # 10% - 周期平衡
-            '新兴产业': 0.10     # 10% - 适度投机
-        }
-        
-        for sector, weight in weights.items():
-            sector_count = max(1, int(top_n * weight))
-            if sector in stock_pool:
-                sector_stocks = stock_pool[sector][:sector_count]
-                selected_stocks.extend(sector_stocks)
-        
-        # 确保数量符合要求
-        selected_stocks = selected_stocks[:top_n]
+        for sector, weight, codes in OPTIMIZED_STOCK_POOL:
+            selected_stocks.extend(codes[:max(1, int(top_n * weight))])
+        
+        # 去重（保持板块顺序，多个板块共有的股票只下载一次）并确保数量符合要求
+        selected_stocks = list(dict.fromkeys(selected_stocks))[:top_n]
         
         logger.info(f"使用优化的股票池: {len(selected_stocks)}只股票")
         logger.info("股票池构成:")
-        for sector, weight in weights.items():
-            sector_count = max(1, int(top_n * weight))
-            logger.info(f"  {sector}: {weight*100:.0f}% ({sector_count}只)")
+        for sector, weight, _ in OPTIMIZED_STOCK_POOL:
+            logger.info(f"  {sector}: {weight*100:.0f}% ({max(1, int(top_n * weight))}只)")
         
         self.high_turnover_stocks = selected_stocks
         return selected_stocks
@@ -221,33 +233,21 @@ class HighTurnoverBacktest:
         stock_data = {}
         success_count = 0
         
-        for i, symbol in enumerate(self.high_turnover_stocks):
-            try:
-                data = self.data_fetcher.get_stock_data(
-                    symbol, 
-                    start_date.strftime('%Y-%m-%d'),
-                    end_date.strftime('%Y-%m-%d')
-                )
-                
-                if not data.empty and len(data) >= 60:  # 至少60个交易日（约3个月）
-                    # 计算技术指标
-                    data = self.data_fetcher.calculate_technical_indicators(data)
-                    stock_data[symbol] = data
-                    success_count += 1
-                    logger.debug(f"成功下载 {symbol}: {len(data)} 条数据")
-                else:
-                    logger.warning(f"股票 {symbol} 数据不足，跳过")
-                
-                # 显示进度
-                if (i + 1) % 10 == 0:
-                    logger.info(f"数据下载进度: {i + 1}/{len(self.high_turnover_stocks)}")
-                
-                # 限制请求频率
-                time.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"下载 {symbol} 数据失败: {e}")
-                continue
+        # 线程池并发下载（请求频率由数据获取器统一限制）并计算技术指标，有效期内的缓存直接读取
+        downloaded = self.data_fetcher.get_multiple_indicator_data(
+            self.high_turnover_stocks,
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d'),
+            min_bars=60  # 至少60个交易日（约3个月）
+        )
+        
+        for symbol, data in downloaded.items():
+            if not data.empty:
+                stock_data[symbol] = data
+                success_count += 1
+                logger.debug("成功下载 {}: {} 条数据", symbol, len(data))
+            else:
+                logger.warning(f"股票 {symbol} 数据不足，跳过")
         
         logger.info(f"数据下载完成，成功下载{success_count}只股票数据")
         return stock_data
@@ -294,66 +294,40 @@ class HighTurnoverBacktest:
             strategies['趋势跟踪策略'] = self._create_trend_following_strategy()
         
         # 计算回测期间
-        all_dates = []
-        for data in stock_data.values():
-            all_dates.extend(data.index.tolist())
+        frames = [data for data in stock_data.values() if not data.empty]
         
-        if not all_dates:
+        if not frames:
             logger.error("没有可用的股票数据")
             return {}
         
-        start_date = min(all_dates).strftime('%Y-%m-%d')
-        end_date = max(all_dates).strftime('%Y-%m-%d')
+        # 逐只股票取日期索引的首尾，不展开全部日期
+        start_date = min(data.index.min() for data in frames).strftime('%Y-%m-%d')
+        end_date = max(data.index.max() for data in frames).strftime('%Y-%m-%d')
         symbols = list(stock_data.keys())
         
         logger.info(f"回测期间: {start_date} 至 {end_date}")
         logger.info(f"回测股票: {len(symbols)} 只")
         
         # 运行回测
-        results = {}
-        
-        for strategy_name, strategy in strategies.items():
-            logger.info(f"正在回测策略: {strategy_name}")
-            
-            try:
-                # 使用优化的回测引擎
-                optimized_engine = self._create_optimized_backtest_engine()
-                
-                result = optimized_engine.run_backtest(
-                    strategy=strategy,
-                    symbols=symbols,
-                    start_date=start_date,
-                    end_date=end_date,
-                    historical_data=stock_data
-                )
-                
-                results[strategy_name] = result
-                
-                # 显示策略结果
-                metrics = result['performance_metrics']
-                logger.info(f"{strategy_name} 回测完成:")
-                logger.info(f"  总收益率: {metrics['total_return']:.2%}")
-                logger.info(f"  年化收益率: {metrics['annualized_return']:.2%}")
-                logger.info(f"  夏普比率: {metrics['sharpe_ratio']:.2f}")
-                logger.info(f"  最大回撤: {metrics['max_drawdown']:.2%}")
-                logger.info(f"  胜率: {metrics['win_rate']:.2%}")
-                logger.info(f"  交易次数: {metrics['total_trades']}")
-                
-            except Exception as e:
-                logger.error(f"策略 {strategy_name} 回测失败: {e}")
-                continue
+        # 多核时各策略分进程并行回测，结果按策略定义顺序返回
+        results = run_strategies(strategies, stock_data, symbols, start_date, end_date,
+                                 OPTIMIZED_ENGINE_KWARGS)
+        for strategy_name, result in results.items():
+            metrics = result['performance_metrics']
+            logger.info(f"{strategy_name} 回测完成:")
+            logger.info(f"  总收益率: {metrics['total_return']:.2%}")
+            logger.info(f"  年化收益率: {metrics['annualized_return']:.2%}")
+            logger.info(f"  夏普比率: {metrics['sharpe_ratio']:.2f}")
+            logger.info(f"  最大回撤: {metrics['max_drawdown']:.2%}")
+            logger.info(f"  胜率: {metrics['win_rate']:.2%}")
+            logger.info(f"  交易次数: {metrics['total_trades']}")
         
         self.backtest_results = results
         return results
     
     def _create_optimized_backtest_engine(self):
         """创建优化的回测引擎"""
-        return BacktestEngine(
-            initial_capital=1000000,    # 100万初始资金
-            commission_rate=0.0003,     # 万3手续费
-            stamp_tax_rate=0.001,       # 千1印花税
-            min_trade_unit=100          # 最小交易单位
-        )
+        return BacktestEngine(**OPTIMIZED_ENGINE_KWARGS)
     
     def _create_trend_following_strategy(self):
         """创建趋势跟踪策略"""
@@ -371,28 +345,11 @@ class HighTurnoverBacktest:
             logger.warning("没有回测结果可分析")
             return pd.DataFrame()
         
-        # 创建结果对比表
-        comparison_data = []
-        
-        for strategy_name, result in self.backtest_results.items():
-            metrics = result['performance_metrics']
-            comparison_data.append({
-                '策略名称': strategy_name,
-                '总收益率': f"{metrics['total_return']:.2%}",
-                '年化收益率': f"{metrics['annualized_return']:.2%}",
-                '波动率': f"{metrics['volatility']:.2%}",
-                '夏普比率': f"{metrics['sharpe_ratio']:.2f}",
-                '最大回撤': f"{metrics['max_drawdown']:.2%}",
-                '胜率': f"{metrics['win_rate']:.2%}",
-                '盈亏比': f"{metrics['profit_loss_ratio']:.2f}",
-                '交易次数': metrics['total_trades'],
-                '最终资产': f"{metrics['final_value']:,.0f}元"
-            })
-        
-        comparison_df = pd.DataFrame(comparison_data)
+        # 各策略绩效指标整理为一张表（行为策略），保留数值，输出时再格式化
+        comparison_df = comparison_frame(self.backtest_results)
         
         logger.info("\n策略回测结果对比:")
-        logger.info("\n" + comparison_df.to_string(index=False))
+        logger.info("\n" + comparison_df.to_string(index=False, formatters=COMPARISON_FORMATTERS))
         
         return comparison_df
     
@@ -402,26 +359,20 @@ class HighTurnoverBacktest:
             logger.warning("没有回测结果可绘制")
             return
         
-        # 创建图表
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.suptitle('高换手率股票策略回测结果', fontsize=16)
+        # 绘图库较重，仅在需要绘图时导入
+        import matplotlib.pyplot as plt
         
-        # 1. 策略收益对比
-        strategy_names = []
-        total_returns = []
-        annualized_returns = []
-        sharpe_ratios = []
-        max_drawdowns = []
+        fig, axes = self._get_figure(plt)
         
-        for strategy_name, result in self.backtest_results.items():
-            metrics = result['performance_metrics']
-            strategy_names.append(strategy_name)
-            total_returns.append(metrics['total_return'] * 100)
-            annualized_returns.append(metrics['annualized_return'] * 100)
-            sharpe_ratios.append(metrics['sharpe_ratio'])
-            max_drawdowns.append(abs(metrics['max_drawdown']) * 100)
-        
-        # 收益率对比
+        # 1. 策略收益对比
+        metrics = metrics_frame(self.backtest_results)
+        strategy_names = metrics.index.tolist()
+        total_returns = metrics['total_return'].to_numpy() * 100
+        annualized_returns = metrics['annualized_return'].to_numpy() * 100
+        sharpe_ratios = metrics['sharpe_ratio'].to_numpy()
+        max_drawdowns = np.abs(metrics['max_drawdown'].to_numpy()) * 100
+        
+        # 柱状图统一按数值位置绘制，避免matplotlib对字符串类别逐个转换
         x = np.arange(len(strategy_names))
         width = 0.35
         
@@ -435,26 +386,27 @@ class HighTurnoverBacktest:
         axes[0, 0].grid(True, alpha=0.3)
         
         # 风险指标对比
-        axes[0, 1].bar(strategy_names, sharpe_ratios, alpha=0.8, color='green')
+        axes[0, 1].bar(x, sharpe_ratios, alpha=0.8, color='green')
         axes[0, 1].set_title('夏普比率对比')
         axes[0, 1].set_ylabel('夏普比率')
-        axes[0, 1].tick_params(axis='x', rotation=45)
+        axes[0, 1].set_xticks(x)
+        axes[0, 1].set_xticklabels(strategy_names, rotation=45)
         axes[0, 1].grid(True, alpha=0.3)
         
         # 最大回撤对比
-        axes[1, 0].bar(strategy_names, max_drawdowns, alpha=0.8, color='red')
+        axes[1, 0].bar(x, max_drawdowns, alpha=0.8, color='red')
         axes[1, 0].set_title('最大回撤对比')
         axes[1, 0].set_ylabel('最大回撤 (%)')
-        axes[1, 0].tick_params(axis='x', rotation=45)
+        axes[1, 0].set_xticks(x)
+        axes[1, 0].set_xticklabels(strategy_names, rotation=45)
         axes[1, 0].grid(True, alpha=0.3)
         
-        # 资产价值曲线对比
-        for strategy_name, result in self.backtest_results.items():
-            portfolio_values = result['portfolio_values']
-            if portfolio_values:
-                dates = [pv['date'] for pv in portfolio_values]
-                values = [pv['portfolio_value'] for pv in portfolio_values]
-                axes[1, 1].plot(dates, values, label=strategy_name, linewidth=2)
+        # 资产价值曲线对比（portfolio_values为结构化数组，字段直接以ndarray传入）
+        for strategy_name in strategy_names:
+            portfolio_values = self.backtest_results[strategy_name]['portfolio_values']
+            if len(portfolio_values) > 0:
+                axes[1, 1].plot(portfolio_values['date'], portfolio_values['portfolio_value'],
+                                label=strategy_name, linewidth=2)
         
         axes[1, 1].axhline(y=1000000, color='black', linestyle='--', alpha=0.5, label='初始资金')
         axes[1, 1].set_title('资产价值曲线')
@@ -470,8 +422,39 @@ class HighTurnoverBacktest:
         
         plt.show()
     
-    def export_results(self, output_dir: str = "backtest_results"):
-        """导出回测结果"""
+    def _get_figure(self, plt):
+        """
+        获取结果图表：首次调用时创建，之后清空坐标轴复用同一图表
+        （图表窗口被关闭后重新创建）
+
+        Args:
+            plt: matplotlib.pyplot模块
+
+        Returns:
+            (figure, axes)
+        """
+        if self._figure is not None and plt.fignum_exists(self._figure.number):
+            axes = np.asarray(self._figure.axes).reshape(2, 2)
+            for ax in axes.flat:
+                ax.clear()
+            return self._figure, axes
+        
+        plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
+        plt.rcParams['axes.unicode_minus'] = False
+        
+        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig.suptitle('高换手率股票策略回测结果', fontsize=16)
+        self._figure = fig
+        return fig, axes
+    
+    def export_results(self, output_dir: str = "backtest_results", export_csv: bool = False):
+        """
+        导出回测结果
+        
+        Args:
+            output_dir: 输出目录
+            export_csv: 交易记录是否导出为CSV（默认导出Parquet）
+        """
         import os
         
         if not os.path.exists(output_dir):
@@ -483,22 +466,25 @@ class HighTurnoverBacktest:
         comparison_df = self.analyze_results()
         if not comparison_df.empty:
             comparison_file = f"{output_dir}/strategy_comparison_{timestamp}.csv"
-            comparison_df.to_csv(comparison_file, index=False, encoding='utf-8-sig')
+            write_csv(comparison_df, comparison_file)
             logger.info(f"策略对比结果已导出到: {comparison_file}")
         
         # 导出详细交易记录
         for strategy_name, result in self.backtest_results.items():
             if result['trades']:
                 trades_df = pd.DataFrame(result['trades'])
-                trades_file = f"{output_dir}/{strategy_name}_trades_{timestamp}.csv"
-                trades_df.to_csv(trades_file, index=False, encoding='utf-8-sig')
+                if export_csv:
+                    trades_file = f"{output_dir}/{strategy_name}_trades_{timestamp}.csv"
+                    write_csv(trades_df, trades_file)
+                else:
+                    trades_file = write_parquet(trades_df, f"{output_dir}/{strategy_name}_trades_{timestamp}.parquet")
                 logger.info(f"{strategy_name} 交易记录已导出到: {trades_file}")
         
         # 导出高换手率股票列表
         if self.high_turnover_stocks:
             stocks_df = pd.DataFrame({'股票代码': self.high_turnover_stocks})
             stocks_file = f"{output_dir}/high_turnover_stocks_{timestamp}.csv"
-            stocks_df.to_csv(stocks_file, index=False, encoding='utf-8-sig')
+            write_csv(stocks_df, stocks_file)
             logger.info(f"高换手率股票列表已导出到: {stocks_file}")
     
     def run_complete_backtest(self, days: int = 30, top_n: int = 50, 
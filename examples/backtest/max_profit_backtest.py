@@ -10,11 +10,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-import time
 import json
 from loguru import logger
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # 添加项目根目录到Python路径
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -24,6 +21,8 @@ sys.path.insert(0, project_root)
 from data.database import DatabaseManager
 from utils.real_data_fetcher import RealDataFetcher
 from backtest.backtest_engine import BacktestEngine
+from backtest.parallel import run_strategies
+from backtest.report import comparison_frame, COMPARISON_FORMATTERS
 
 # 导入所有策略
 from strategies.double_ma_strategy import DoubleMaStrategy
@@ -40,8 +39,13 @@ except ImportError:
     AKSHARE_AVAILABLE = False
     logger.warning("AKShare未安装，将使用模拟数据")
 
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+# 策略回测引擎参数
+STRATEGY_ENGINE_KWARGS = {
+    'initial_capital': 1000000,
+    'commission_rate': 0.0003,
+    'stamp_tax_rate': 0.001,
+    'min_trade_unit': 100
+}
 
 
 class MaxProfitBacktest:
@@ -60,6 +64,7 @@ class MaxProfitBacktest:
         self.selected_stocks = []
         self.backtest_results = {}
         self.sector_config = self._load_default_sectors()
+        self._strategies = None  # 策略组合只创建一次，多次回测复用
         
         logger.info("最大收益回测系统初始化完成")
     
@@ -169,8 +174,8 @@ class MaxProfitBacktest:
             for stock in sector_stocks:
                 logger.debug(f"    {stock}")
         
-        # 去重
-        selected_stocks = list(set(selected_stocks))
+        # 去重（保持板块顺序，多个板块共有的股票只下载一次）
+        selected_stocks = list(dict.fromkeys(selected_stocks))
         
         logger.info(f"总计选择{len(selected_stocks)}只股票")
         self.selected_stocks = selected_stocks
@@ -197,38 +202,38 @@ class MaxProfitBacktest:
         stock_data = {}
         success_count = 0
         
-        for i, symbol in enumerate(self.selected_stocks):
-            try:
-                data = self.data_fetcher.get_stock_data(
-                    symbol, 
-                    start_date.strftime('%Y-%m-%d'),
-                    end_date.strftime('%Y-%m-%d')
-                )
-                
-                if not data.empty and len(data) >= 60:  # 至少60个交易日
-                    # 计算技术指标
-                    data = self.data_fetcher.calculate_technical_indicators(data)
-                    stock_data[symbol] = data
-                    success_count += 1
-                    logger.debug(f"成功下载 {symbol}: {len(data)} 条数据")
-                else:
-                    logger.warning(f"股票 {symbol} 数据不足，跳过")
-                
-                # 显示进度
-                if (i + 1) % 10 == 0:
-                    logger.info(f"数据下载进度: {i + 1}/{len(self.selected_stocks)}")
-                
-                # 限制请求频率
-                time.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"下载 {symbol} 数据失败: {e}")
-                continue
+        # 线程池并发下载（请求频率由数据获取器统一限制）并计算技术指标，有效期内的缓存直接读取
+        downloaded = self.data_fetcher.get_multiple_indicator_data(
+            self.selected_stocks,
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d'),
+            min_bars=60  # 至少60个交易日
+        )
+        
+        for symbol, data in downloaded.items():
+            if not data.empty:
+                stock_data[symbol] = data
+                success_count += 1
+                logger.debug("成功下载 {}: {} 条数据", symbol, len(data))
+            else:
+                logger.warning(f"股票 {symbol} 数据不足，跳过")
         
         logger.info(f"数据下载完成，成功下载{success_count}只股票数据")
         return stock_data
     
     def create_optimized_strategies(self) -> Dict[str, Any]:
+        """
+        获取优化的策略组合
+        策略参数固定且回测不修改策略状态，首次调用时创建，之后返回同一批策略对象
+
+        Returns:
+            {策略名称: 策略对象}
+        """
+        if self._strategies is None:
+            self._strategies = self._build_optimized_strategies()
+        return dict(self._strategies)
+    
+    def _build_optimized_strategies(self) -> Dict[str, Any]:
         """创建优化的策略组合"""
         strategies = {
             # 单一策略
@@ -347,59 +352,33 @@ class MaxProfitBacktest:
             strategies = all_strategies
         
         # 计算回测期间
-        all_dates = []
-        for data in stock_data.values():
-            all_dates.extend(data.index.tolist())
+        frames = [data for data in stock_data.values() if not data.empty]
         
-        if not all_dates:
+        if not frames:
             logger.error("没有可用的股票数据")
             return {}
         
-        start_date = min(all_dates).strftime('%Y-%m-%d')
-        end_date = max(all_dates).strftime('%Y-%m-%d')
+        # 逐只股票取日期索引的首尾，不展开全部日期
+        start_date = min(data.index.min() for data in frames).strftime('%Y-%m-%d')
+        end_date = max(data.index.max() for data in frames).strftime('%Y-%m-%d')
         symbols = list(stock_data.keys())
         
         logger.info(f"回测期间: {start_date} 至 {end_date}")
         logger.info(f"回测股票: {len(symbols)} 只")
         
         # 运行回测
-        results = {}
-        
-        for strategy_name, strategy in strategies.items():
-            logger.info(f"🔄 正在回测策略: {strategy_name}")
-            
-            try:
-                # 创建独立的回测引擎
-                engine = BacktestEngine(
-                    initial_capital=1000000,
-                    commission_rate=0.0003,
-                    stamp_tax_rate=0.001,
-                    min_trade_unit=100
-                )
-                
-                result = engine.run_backtest(
-                    strategy=strategy,
-                    symbols=symbols,
-                    start_date=start_date,
-                    end_date=end_date,
-                    historical_data=stock_data
-                )
-                
-                results[strategy_name] = result
-                
-                # 显示策略结果
-                metrics = result['performance_metrics']
-                logger.info(f"✅ {strategy_name} 回测完成:")
-                logger.info(f"  总收益率: {metrics['total_return']:.2%}")
-                logger.info(f"  年化收益率: {metrics['annualized_return']:.2%}")
-                logger.info(f"  夏普比率: {metrics['sharpe_ratio']:.2f}")
-                logger.info(f"  最大回撤: {metrics['max_drawdown']:.2%}")
-                logger.info(f"  胜率: {metrics['win_rate']:.2%}")
-                logger.info(f"  交易次数: {metrics['total_trades']}")
-                
-            except Exception as e:
-                logger.error(f"❌ 策略 {strategy_name} 回测失败: {e}")
-                continue
+        # 多核时各策略分进程并行回测，结果按策略定义顺序返回
+        results = run_strategies(strategies, stock_data, symbols, start_date, end_date,
+                                 STRATEGY_ENGINE_KWARGS)
+        for strategy_name, result in results.items():
+            metrics = result['performance_metrics']
+            logger.info(f"✅ {strategy_name} 回测完成:")
+            logger.info(f"  总收益率: {metrics['total_return']:.2%}")
+            logger.info(f"  年化收益率: {metrics['annualized_return']:.2%}")
+            logger.info(f"  夏普比率: {metrics['sharpe_ratio']:.2f}")
+            logger.info(f"  最大回撤: {metrics['max_drawdown']:.2%}")
+            logger.info(f"  胜率: {metrics['win_rate']:.2%}")
+            logger.info(f"  交易次数: {metrics['total_trades']}")
         
         self.backtest_results = results
         return results
@@ -410,47 +389,26 @@ class MaxProfitBacktest:
             logger.warning("没有回测结果可分析")
             return pd.DataFrame()
         
-        # 创建结果对比表
-        comparison_data = []
-        
-        for strategy_name, result in self.backtest_results.items():
-            metrics = result['performance_metrics']
-            comparison_data.append({
-                '策略名称': strategy_name,
-                '总收益率': f"{metrics['total_return']:.2%}",
-                '年化收益率': f"{metrics['annualized_return']:.2%}",
-                '波动率': f"{metrics['volatility']:.2%}",
-                '夏普比率': f"{metrics['sharpe_ratio']:.2f}",
-                '最大回撤': f"{metrics['max_drawdown']:.2%}",
-                '胜率': f"{metrics['win_rate']:.2%}",
-                '盈亏比': f"{metrics['profit_loss_ratio']:.2f}",
-                '交易次数': metrics['total_trades'],
-                '最终资产': f"{metrics['final_value']:,.0f}元",
-                '收益排名': 0  # 稍后计算
-            })
-        
-        comparison_df = pd.DataFrame(comparison_data)
-        
-        # 计算收益排名
-        comparison_df['收益率_数值'] = comparison_df['总收益率'].str.rstrip('%').astype(float)
-        comparison_df['收益排名'] = comparison_df['收益率_数值'].rank(ascending=False, method='min').astype(int)
-        comparison_df = comparison_df.drop('收益率_数值', axis=1)
+        # 各策略绩效指标整理为一张表（行为策略），保留数值，输出时再格式化
+        comparison_df = comparison_frame(self.backtest_results)
+        # 按总收益率计算排名
+        comparison_df['收益排名'] = comparison_df['总收益率'].rank(ascending=False, method='min').astype(int)
         
         # 按收益率排序
         comparison_df = comparison_df.sort_values('收益排名')
         
         logger.info("\n🏆 最大收益策略回测结果排行榜:")
         logger.info("=" * 120)
-        print(comparison_df.to_string(index=False))
+        print(comparison_df.to_string(index=False, formatters=COMPARISON_FORMATTERS))
         
         # 显示最佳策略
         if not comparison_df.empty:
             best_strategy = comparison_df.iloc[0]
             logger.info(f"\n🥇 最佳策略: {best_strategy['策略名称']}")
-            logger.info(f"   总收益率: {best_strategy['总收益率']}")
-            logger.info(f"   年化收益率: {best_strategy['年化收益率']}")
-            logger.info(f"   夏普比率: {best_strategy['夏普比率']}")
-            logger.info(f"   最大回撤: {best_strategy['最大回撤']}")
+            logger.info(f"   总收益率: {best_strategy['总收益率']:.2%}")
+            logger.info(f"   年化收益率: {best_strategy['年化收益率']:.2%}")
+            logger.info(f"   夏普比率: {best_strategy['夏普比率']:.2f}")
+            logger.info(f"   最大回撤: {best_strategy['最大回撤']:.2%}")
         
         return comparison_df
     
@@ -11,7 +11,6 @@ import numpy as np
 from datetime import datetime, timedelta
 from loguru import logger
 from typing import Dict, List, Any
-import time
 
 # 添加项目根目录到Python路径
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -20,7 +19,8 @@ sys.path.insert(0, project_root)
 # 导入项目模块
 from data.database import DatabaseManager
 from utils.real_data_fetcher import RealDataFetcher
-from backtest.backtest_engine import BacktestEngine
+from backtest.backtest_engine import BacktestEngine, write_csv, write_parquet
+from backtest.report import comparison_frame, COMPARISON_FORMATTERS
 from strategies.double_ma_strategy import DoubleMaStrategy
 from strategies.rsi_strategy import RSIStrategy
 from strategies.macd_strategy import MACDStrategy
@@ -39,6 +39,7 @@ class QuickTurnoverTest:
             min_trade_unit=100          # 最小交易单位
         )
         self.test_results = {}
+        self._strategies = None  # 测试策略只创建一次，多次测试复用
     
     def get_optimized_test_stocks(self) -> List[str]:
         """
@@ -82,6 +83,9 @@ class QuickTurnoverTest:
                 sector_stocks = stock_pool[sector][:count]
                 selected_stocks.extend(sector_stocks)
         
+        # 去重（保持板块顺序，多个板块共有的股票只下载一次）
+        selected_stocks = list(dict.fromkeys(selected_stocks))
+        
         logger.info(f"优化测试股票池构成（共{len(selected_stocks)}只）:")
         for sector, count in weights.items():
             logger.info(f"  {sector}: {count}只")
@@ -107,31 +111,38 @@ class QuickTurnoverTest:
         stock_data = {}
         success_count = 0
         
-        for symbol in test_stocks:
-            try:
-                data = self.data_fetcher.get_stock_data(
-                    symbol, 
-                    start_date.strftime('%Y-%m-%d'),
-                    end_date.strftime('%Y-%m-%d')
-                )
-                
-                if not data.empty and len(data) >= 60:  # 至少60个交易日
-                    # 计算技术指标
-                    data = self.data_fetcher.calculate_technical_indicators(data)
-                    stock_data[symbol] = data
-                    success_count += 1
-                    logger.debug(f"成功下载 {symbol}: {len(data)} 条数据")
-                else:
-                    logger.warning(f"股票 {symbol} 数据不足，跳过")
-                
-            except Exception as e:
-                logger.error(f"下载 {symbol} 数据失败: {e}")
-                continue
+        # 线程池并发下载（请求频率由数据获取器统一限制）并计算技术指标，有效期内的缓存直接读取
+        downloaded = self.data_fetcher.get_multiple_indicator_data(
+            test_stocks,
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d'),
+            min_bars=60  # 至少60个交易日
+        )
+        
+        for symbol, data in downloaded.items():
+            if not data.empty:
+                stock_data[symbol] = data
+                success_count += 1
+                logger.debug("成功下载 {}: {} 条数据", symbol, len(data))
+            else:
+                logger.warning(f"股票 {symbol} 数据不足，跳过")
         
         logger.info(f"数据下载完成，成功下载{success_count}只股票数据")
         return stock_data
     
     def create_optimized_strategies(self) -> Dict[str, Any]:
+        """
+        获取优化的测试策略
+        策略参数固定且回测不修改策略状态，首次调用时创建，之后返回同一批策略对象
+
+        Returns:
+            {策略名称: 策略对象}
+        """
+        if self._strategies is None:
+            self._strategies = self._build_optimized_strategies()
+        return dict(self._strategies)
+    
+    def _build_optimized_strategies(self) -> Dict[str, Any]:
         """创建优化的策略"""
         strategies = {
             '稳健双均线策略': DoubleMaStrategy({
@@ -164,13 +175,15 @@ class QuickTurnoverTest:
         
         strategies = self.create_optimized_strategies()
         
-        # 计算回测期间
-        all_dates = []
-        for data in stock_data.values():
-            all_dates.extend(data.index.tolist())
+        frames = [data for data in stock_data.values() if not data.empty]
+        
+        if not frames:
+            logger.error("没有可用的股票数据")
+            return {}
         
-        start_date = min(all_dates).strftime('%Y-%m-%d')
-        end_date = max(all_dates).strftime('%Y-%m-%d')
+        # 计算回测期间：逐只股票取日期索引的首尾，不展开全部日期
+        start_date = min(data.index.min() for data in frames).strftime('%Y-%m-%d')
+        end_date = max(data.index.max() for data in frames).strftime('%Y-%m-%d')
         symbols = list(stock_data.keys())
         
         logger.info(f"回测期间: {start_date} 至 {end_date}")
@@ -217,46 +230,30 @@ class QuickTurnoverTest:
         
         logger.info("📊 分析测试结果...")
         
-        # 创建结果对比表
-        comparison_data = []
-        
-        for strategy_name, result in self.test_results.items():
-            metrics = result['performance_metrics']
-            comparison_data.append({
-                '策略': strategy_name,
-                '总收益率': f"{metrics['total_return']:.2%}",
-                '年化收益率': f"{metrics['annualized_return']:.2%}",
-                '夏普比率': f"{metrics['sharpe_ratio']:.2f}",
-                '最大回撤': f"{metrics['max_drawdown']:.2%}",
-                '胜率': f"{metrics['win_rate']:.2%}",
-                '交易次数': metrics['total_trades'],
-                '最终资产': f"{metrics['final_value']:,.0f}元"
-            })
-        
-        comparison_df = pd.DataFrame(comparison_data)
+        # 创建结果对比表：保留数值，输出时再格式化
+        comparison_df = comparison_frame(
+            self.test_results, name_column='策略',
+            columns=('总收益率', '年化收益率', '夏普比率', '最大回撤', '胜率', '交易次数', '最终资产')
+        )
         
         # 显示结果
         logger.info("优化策略回测结果对比")
         logger.info("=" * 100)
-        print(comparison_df.to_string(index=False))
+        print(comparison_df.to_string(index=False, formatters=COMPARISON_FORMATTERS))
         
         # 找出最佳策略
-        best_strategy = None
-        best_return = -float('inf')
-        
-        for strategy_name, result in self.test_results.items():
-            total_return = result['performance_metrics']['total_return']
-            if total_return > best_return:
-                best_return = total_return
-                best_strategy = strategy_name
-        
-        if best_strategy:
-            logger.info(f"🏆 最佳策略: {best_strategy} (收益率: {best_return:.2%})")
+        best = comparison_df['总收益率'].idxmax()
+        logger.info(f"🏆 最佳策略: {comparison_df.at[best, '策略']} (收益率: {comparison_df.at[best, '总收益率']:.2%})")
         
         return comparison_df
     
-    def export_test_results(self):
-        """导出测试结果"""
+    def export_test_results(self, export_csv: bool = False):
+        """
+        导出测试结果
+        
+        Args:
+            export_csv: 交易记录是否导出为CSV（默认导出Parquet）
+        """
         if not self.test_results:
             logger.warning("没有可导出的结果")
             return
@@ -264,15 +261,21 @@ class QuickTurnoverTest:
         try:
             # 导出结果对比表
             comparison_df = self.analyze_test_results()
-            results_file = f"quick_test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            comparison_df.to_csv(results_file, index=False, encoding='utf-8-sig')
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            results_file = f"quick_test_results_{timestamp}.csv"
+            write_csv(comparison_df, results_file)
             logger.info(f"测试结果已导出到: {results_file}")
             
             # 导出详细数据
             for strategy_name, result in self.test_results.items():
-                if 'trades' in result and not result['trades'].empty:
-                    trades_file = f"trades_{strategy_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                    result['trades'].to_csv(trades_file, index=False, encoding='utf-8-sig')
+                # 回测结果中的交易记录为字典列表
+                if result.get('trades'):
+                    trades_df = pd.DataFrame(result['trades'])
+                    if export_csv:
+                        trades_file = f"trades_{strategy_name}_{timestamp}.csv"
+                        write_csv(trades_df, trades_file)
+                    else:
+                        trades_file = write_parquet(trades_df, f"trades_{strategy_name}_{timestamp}.parquet")
                     logger.info(f"{strategy_name} 交易记录已导出到: {trades_file}")
             
         except Exception as e:
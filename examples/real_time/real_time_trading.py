@@ -7,9 +7,8 @@
 import os
 import sys
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any
 import time
 import json
 from loguru import logger
@@ -205,14 +204,15 @@ class RealTimeTradingSystem:
         stock_data = {}
         success_count = 0
         
-        for i, symbol in enumerate(stock_pool):
+        # 并发下载全部股票数据（下载器内部限制请求频率）
+        downloaded = self.data_fetcher.get_multiple_stock_data(
+            stock_pool,
+            start_date.strftime('%Y-%m-%d'),
+            end_date.strftime('%Y-%m-%d')
+        )
+        
+        for symbol, data in downloaded.items():
             try:
-                data = self.data_fetcher.get_stock_data(
-                    symbol,
-                    start_date.strftime('%Y-%m-%d'),
-                    end_date.strftime('%Y-%m-%d')
-                )
-                
                 if not data.empty and len(data) >= 30:
                     # 计算技术指标
                     data = self.data_fetcher.calculate_technical_indicators(data)
@@ -222,9 +222,6 @@ class RealTimeTradingSystem:
                 else:
                     logger.warning(f"股票 {symbol} 数据不足")
                 
-                # 限制请求频率
-                time.sleep(0.1)
-                
             except Exception as e:
                 logger.error(f"更新 {symbol} 数据失败: {e}")
                 continue
@@ -237,7 +234,9 @@ class RealTimeTradingSystem:
         logger.info("开始执行策略分析...")
         
         strategy_results = {}
-        today = datetime.now().strftime('%Y-%m-%d')
+        now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
+        today_date = now.date()
         
         for strategy_name, strategy in self.strategies.items():
             if not self.config['strategies'].get(strategy_name, {}).get('enabled', True):
@@ -264,7 +263,7 @@ class RealTimeTradingSystem:
                     signals = strategy.generate_signals(data, symbol)
                     if signals:
                         # 只关注最新的信号
-                        latest_signals = [s for s in signals if s.timestamp.date() == datetime.now().date()]
+                        latest_signals = [s for s in signals if s.timestamp.date() == today_date]
                         if latest_signals:
                             signals_summary[symbol] = {
                                 'signals': len(latest_signals),
@@ -476,6 +475,21 @@ class RealTimeTradingSystem:
         self.run_daily_task()
 
 
+def run_once_standalone(config_file: str = "config/trading_config.json"):
+    """
+    在独立进程中构建交易系统并执行一次任务（供进程池调用）
+
+    Args:
+        config_file: 配置文件路径
+    """
+    system = RealTimeTradingSystem(config_file)
+    try:
+        system.run_once()
+    finally:
+        # 进程池的工作进程不执行atexit，返回前写入缓冲数据并关闭连接
+        system.db_manager.close()
+
+
 def main():
     """主函数"""
     import argparse
@@ -491,12 +505,15 @@ def main():
     # 创建系统实例
     trading_system = RealTimeTradingSystem(args.config)
     
-    if args.mode == "once":
-        # 立即执行一次
-        trading_system.run_once()
-    else:
-        # 启动定时任务
-        trading_system.start_scheduler()
+    try:
+        if args.mode == "once":
+            # 立即执行一次
+            trading_system.run_once()
+        else:
+            # 启动定时任务
+            trading_system.start_scheduler()
+    finally:
+        trading_system.db_manager.close()
 
 
 if __name__ == "__main__":
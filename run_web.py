@@ -24,11 +24,12 @@ def main():
     try:
         import flask
         import flask_socketio
+        import flask_caching
         import plotly
         print("✅ 依赖检查通过")
     except ImportError as e:
         print(f"❌ 缺少依赖: {e}")
-        print("请运行: pip install flask flask-socketio plotly")
+        print("请运行: pip install flask flask-socketio flask-caching plotly")
         return
     
     # 检查必要文件
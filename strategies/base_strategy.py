@@ -10,6 +10,13 @@ from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 from loguru import logger
 
+# 信号方向（整数编码，便于回测内核直接按整数分支）
+SIDE_BUY = 0
+SIDE_SELL = 1
+SIDE_OTHER = 2
+
+_SIDES = {'buy': SIDE_BUY, 'sell': SIDE_SELL}
+
 
 class Signal:
     """交易信号类"""
@@ -36,7 +43,8 @@ class Signal:
         """
         self.symbol = symbol
         self.signal_type = signal_type
-        self.price = price
+        self.side = _SIDES.get(signal_type.lower(), SIDE_OTHER)  # 构造时解析一次方向
+        self.price = float(price)  # numpy标量统一为Python float，便于序列化
         self.quantity = quantity
         self.timestamp = timestamp
         self.confidence = confidence
@@ -49,6 +57,9 @@ class Signal:
 class BaseStrategy(ABC):
     """策略基类"""
     
+    # 决定信号的参数属性名，子类按自身参数声明；参数优化会修改这些属性，需计入信号缓存的键
+    PARAM_NAMES: Tuple[str, ...] = ()
+    
     def __init__(self, name: str, config: Dict[str, Any]):
         """
         初始化策略
@@ -236,6 +247,16 @@ class BaseStrategy(ABC):
             'performance_metrics': self.performance_metrics
         }
     
+    def params_key(self) -> Tuple:
+        """
+        策略参数标识，参数相同的策略实例对同一数据生成相同的信号，用于回测信号缓存
+        
+        Returns:
+            (策略类名, PARAM_NAMES声明的参数及取值, 策略配置的repr)，不含持仓、信号历史等运行状态
+        """
+        params = tuple((name, getattr(self, name)) for name in self.PARAM_NAMES)
+        return type(self).__name__, params, repr(sorted(self.config.items()))
+    
     def reset(self):
         """重置策略状态"""
         self.positions = {}
@@ -278,20 +299,30 @@ class BaseStrategy(ABC):
             filepath: 文件路径
         """
         try:
-            df = pd.read_csv(filepath)
-            self.signals = []
+            # 股票代码按字符串读取，保留前导0
+            df = pd.read_csv(filepath, dtype={'symbol': str})
+            n = len(df)
             
-            for _, row in df.iterrows():
-                signal = Signal(
-                    symbol=row['symbol'],
-                    signal_type=row['signal_type'],
-                    price=row['price'],
-                    quantity=row['quantity'],
-                    timestamp=pd.to_datetime(row['timestamp']),
-                    confidence=row.get('confidence', 1.0),
-                    reason=row.get('reason', '')
+            # 整列转换后按列组装信号，不逐行构造Series
+            timestamps = pd.to_datetime(df['timestamp'], format='ISO8601').tolist()
+            confidences = df['confidence'].tolist() if 'confidence' in df.columns else [1.0] * n
+            reasons = df['reason'].fillna('').tolist() if 'reason' in df.columns else [''] * n
+            
+            self.signals = [
+                Signal(
+                    symbol=symbol,
+                    signal_type=signal_type,
+                    price=price,
+                    quantity=quantity,
+                    timestamp=timestamp,
+                    confidence=confidence,
+                    reason=reason
+                )
+                for symbol, signal_type, price, quantity, timestamp, confidence, reason in zip(
+                    df['symbol'].tolist(), df['signal_type'].tolist(), df['price'].tolist(),
+                    df['quantity'].tolist(), timestamps, confidences, reasons
                 )
-                self.signals.append(signal)
+            ]
             
             logger.info(f"策略{self.name}从 {filepath} 加载了 {len(self.signals)} 个信号")
             
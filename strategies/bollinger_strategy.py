@@ -10,6 +10,7 @@ from typing import List
 from loguru import logger
 
 from .base_strategy import BaseStrategy, Signal
+from utils.technical_indicators import bollinger
 
 
 class BollingerStrategy(BaseStrategy):
@@ -62,38 +63,40 @@ class BollingerStrategy(BaseStrategy):
             # 计算布林带位置 (0-1之间)
             data['bb_position'] = (data['close'] - data['bb_lower']) / (data['bb_upper'] - data['bb_lower'])
             
+            # 指标列一次取出为数组，循环内按位置索引
+            close = data['close'].to_numpy()
+            bb_position = data['bb_position'].to_numpy()
+            
             # 生成信号
             for i in range(1, len(data)):
-                current_row = data.iloc[i]
-                prev_row = data.iloc[i-1]
                 
                 # 买入信号：价格从下轨反弹
-                if (prev_row['bb_position'] <= self.config['oversold_threshold'] and 
-                    current_row['bb_position'] > self.config['oversold_threshold'] and
-                    current_row['close'] > prev_row['close']):
+                if (bb_position[i-1] <= self.config['oversold_threshold'] and 
+                    bb_position[i] > self.config['oversold_threshold'] and
+                    close[i] > close[i-1]):
                     
                     signal = Signal(
                         symbol=symbol,
-                        timestamp=current_row.name,
+                        timestamp=data.index[i],
                         signal_type='BUY',
-                        price=current_row['close'],
+                        price=close[i],
                         quantity=0,  # 由回测引擎决定
-                        reason=f"布林带超卖反弹，位置: {current_row['bb_position']:.2f}"
+                        reason=f"布林带超卖反弹，位置: {bb_position[i]:.2f}"
                     )
                     signals.append(signal)
                 
                 # 卖出信号：价格从上轨回落
-                elif (prev_row['bb_position'] >= self.config['overbought_threshold'] and 
-                      current_row['bb_position'] < self.config['overbought_threshold'] and
-                      current_row['close'] < prev_row['close']):
+                elif (bb_position[i-1] >= self.config['overbought_threshold'] and 
+                      bb_position[i] < self.config['overbought_threshold'] and
+                      close[i] < close[i-1]):
                     
                     signal = Signal(
                         symbol=symbol,
-                        timestamp=current_row.name,
+                        timestamp=data.index[i],
                         signal_type='SELL',
-                        price=current_row['close'],
+                        price=close[i],
                         quantity=0,  # 卖出全部持仓
-                        reason=f"布林带超买回落，位置: {current_row['bb_position']:.2f}"
+                        reason=f"布林带超买回落，位置: {bb_position[i]:.2f}"
                     )
                     signals.append(signal)
             
@@ -113,14 +116,10 @@ class BollingerStrategy(BaseStrategy):
         period = self.config['period']
         std_dev = self.config['std_dev']
         
-        # 中轨（移动平均线）
-        data['bb_middle'] = data['close'].rolling(window=period).mean()
-        
-        # 标准差
-        data['bb_std'] = data['close'].rolling(window=period).std()
-        
-        # 上轨和下轨
-        data['bb_upper'] = data['bb_middle'] + (data['bb_std'] * std_dev)
-        data['bb_lower'] = data['bb_middle'] - (data['bb_std'] * std_dev)
+        # 中轨为移动平均线，上轨和下轨为中轨加减std_dev倍样本标准差
+        middle, upper, lower = bollinger(data['close'].to_numpy(dtype=np.float64), period, float(std_dev))
+        data['bb_middle'] = middle
+        data['bb_upper'] = upper
+        data['bb_lower'] = lower
         
         return data 
\ No newline at end of file
@@ -8,12 +8,15 @@ import numpy as np
 from typing import List, Dict, Any
 from datetime import datetime
 from .base_strategy import BaseStrategy, Signal
+from utils.technical_indicators import double_ma_signal, rolling_mean
 from loguru import logger
 
 
 class DoubleMaStrategy(BaseStrategy):
     """双均线策略"""
     
+    PARAM_NAMES = ('short_window', 'long_window')
+    
     def __init__(self, config: Dict[str, Any]):
         """
         初始化双均线策略
@@ -49,38 +52,22 @@ class DoubleMaStrategy(BaseStrategy):
         if len(data) < self.long_window:
             return signals
             
-        # 计算移动平均线
-        data['ma_short'] = data['close'].rolling(window=self.short_window).mean()
-        data['ma_long'] = data['close'].rolling(window=self.long_window).mean()
-        
-        # 生成交易信号
-        for i in range(self.long_window, len(data)):
-            current_short = data['ma_short'].iloc[i]
-            current_long = data['ma_long'].iloc[i]
-            prev_short = data['ma_short'].iloc[i-1]
-            prev_long = data['ma_long'].iloc[i-1]
-            
-            # 金叉：短期均线上穿长期均线
-            if prev_short <= prev_long and current_short > current_long:
-                signal = Signal(
-                    symbol=symbol,
-                    signal_type='BUY',
-                    price=data['close'].iloc[i],
-                    quantity=1000,  # 固定数量
-                    timestamp=data.index[i]
-                )
-                signals.append(signal)
-                
-            # 死叉：短期均线下穿长期均线  
-            elif prev_short >= prev_long and current_short < current_long:
-                signal = Signal(
-                    symbol=symbol,
-                    signal_type='SELL',
-                    price=data['close'].iloc[i],
-                    quantity=1000,
-                    timestamp=data.index[i]
-                )
-                signals.append(signal)
+        # 计算移动平均线及交叉点
+        close = data['close'].to_numpy(dtype=np.float64)
+        ma_short, ma_long, crosses = double_ma_signal(close, self.short_window, self.long_window)
+        data['ma_short'] = ma_short
+        data['ma_long'] = ma_long
+        
+        # 生成交易信号：1为金叉（短期均线上穿长期均线），-1为死叉
+        for i in np.flatnonzero(crosses):
+            signal = Signal(
+                symbol=symbol,
+                signal_type='BUY' if crosses[i] > 0 else 'SELL',
+                price=close[i],
+                quantity=1000,  # 固定数量
+                timestamp=data.index[i]
+            )
+            signals.append(signal)
                 
         return signals
     
@@ -150,19 +137,17 @@ class DoubleMaStrategy(BaseStrategy):
         if len(data) < self.long_window:
             return {}
         
-        # 计算移动平均线
-        data = data.copy()
-        data[f'ma_{self.short_window}'] = data['close'].rolling(window=self.short_window).mean()
-        data[f'ma_{self.long_window}'] = data['close'].rolling(window=self.long_window).mean()
-        
-        latest = data.iloc[-1]
+        # 计算移动平均线（与生成信号时使用同一内核），只取最新值
+        close = data['close'].to_numpy(dtype=np.float64)
+        ma_short = rolling_mean(close, self.short_window)[-1]
+        ma_long = rolling_mean(close, self.long_window)[-1]
         
         return {
-            'current_price': latest['close'],
-            f'ma_{self.short_window}': latest[f'ma_{self.short_window}'],
-            f'ma_{self.long_window}': latest[f'ma_{self.long_window}'],
-            'ma_diff': latest[f'ma_{self.short_window}'] - latest[f'ma_{self.long_window}'],
-            'trend': 'bullish' if latest[f'ma_{self.short_window}'] > latest[f'ma_{self.long_window}'] else 'bearish'
+            'current_price': close[-1],
+            f'ma_{self.short_window}': ma_short,
+            f'ma_{self.long_window}': ma_long,
+            'ma_diff': ma_short - ma_long,
+            'trend': 'bullish' if ma_short > ma_long else 'bearish'
         }
     
     def optimize_parameters(self, data: pd.DataFrame, symbol: str) -> Dict[str, Any]:
@@ -10,6 +10,7 @@ from typing import List
 from loguru import logger
 
 from .base_strategy import BaseStrategy, Signal
+from utils.technical_indicators import kdj
 
 
 class KDJStrategy(BaseStrategy):
@@ -61,72 +62,75 @@ class KDJStrategy(BaseStrategy):
             # 计算KDJ指标
             data = self._calculate_kdj(data)
             
+            # 指标列一次取出为数组，循环内按位置索引
+            close = data['close'].to_numpy()
+            k = data['K'].to_numpy()
+            d = data['D'].to_numpy()
+            j = data['J'].to_numpy()
+            
             # 生成信号
             for i in range(1, len(data)):
-                current_row = data.iloc[i]
-                prev_row = data.iloc[i-1]
-                
                 # 检查数据有效性
-                if pd.isna(current_row['K']) or pd.isna(current_row['D']) or pd.isna(current_row['J']):
+                if np.isnan(k[i]) or np.isnan(d[i]) or np.isnan(j[i]):
                     continue
                 
                 # 买入信号：KDJ金叉且在超卖区域
-                if (prev_row['K'] <= prev_row['D'] and 
-                    current_row['K'] > current_row['D'] and
-                    current_row['K'] < self.config['oversold'] + 10):  # 超卖区域附近
+                if (k[i-1] <= d[i-1] and 
+                    k[i] > d[i] and
+                    k[i] < self.config['oversold'] + 10):  # 超卖区域附近
                     
                     signal = Signal(
                         symbol=symbol,
-                        timestamp=current_row.name,
+                        timestamp=data.index[i],
                         signal_type='BUY',
-                        price=current_row['close'],
+                        price=close[i],
                         quantity=0,  # 由回测引擎决定
-                        reason=f"KDJ金叉买入，K:{current_row['K']:.1f}, D:{current_row['D']:.1f}, J:{current_row['J']:.1f}"
+                        reason=f"KDJ金叉买入，K:{k[i]:.1f}, D:{d[i]:.1f}, J:{j[i]:.1f}"
                     )
                     signals.append(signal)
                 
                 # 卖出信号：KDJ死叉且在超买区域
-                elif (prev_row['K'] >= prev_row['D'] and 
-                      current_row['K'] < current_row['D'] and
-                      current_row['K'] > self.config['overbought'] - 10):  # 超买区域附近
+                elif (k[i-1] >= d[i-1] and 
+                      k[i] < d[i] and
+                      k[i] > self.config['overbought'] - 10):  # 超买区域附近
                     
                     signal = Signal(
                         symbol=symbol,
-                        timestamp=current_row.name,
+                        timestamp=data.index[i],
                         signal_type='SELL',
-                        price=current_row['close'],
+                        price=close[i],
                         quantity=0,  # 卖出全部持仓
-                        reason=f"KDJ死叉卖出，K:{current_row['K']:.1f}, D:{current_row['D']:.1f}, J:{current_row['J']:.1f}"
+                        reason=f"KDJ死叉卖出，K:{k[i]:.1f}, D:{d[i]:.1f}, J:{j[i]:.1f}"
                     )
                     signals.append(signal)
                 
                 # 强势买入信号：J值从超卖区域快速上升
-                elif (prev_row['J'] < self.config['oversold'] and 
-                      current_row['J'] > self.config['oversold'] and
-                      current_row['J'] - prev_row['J'] > 5):  # J值快速上升
+                elif (j[i-1] < self.config['oversold'] and 
+                      j[i] > self.config['oversold'] and
+                      j[i] - j[i-1] > 5):  # J值快速上升
                     
                     signal = Signal(
                         symbol=symbol,
-                        timestamp=current_row.name,
+                        timestamp=data.index[i],
                         signal_type='BUY',
-                        price=current_row['close'],
+                        price=close[i],
                         quantity=0,
-                        reason=f"J值超卖反弹，J:{current_row['J']:.1f}"
+                        reason=f"J值超卖反弹，J:{j[i]:.1f}"
                     )
                     signals.append(signal)
                 
                 # 强势卖出信号：J值从超买区域快速下降
-                elif (prev_row['J'] > self.config['overbought'] and 
-                      current_row['J'] < self.config['overbought'] and
-                      prev_row['J'] - current_row['J'] > 5):  # J值快速下降
+                elif (j[i-1] > self.config['overbought'] and 
+                      j[i] < self.config['overbought'] and
+                      j[i-1] - j[i] > 5):  # J值快速下降
                     
                     signal = Signal(
                         symbol=symbol,
-                        timestamp=current_row.name,
+                        timestamp=data.index[i],
                         signal_type='SELL',
-                        price=current_row['close'],
+                        price=close[i],
                         quantity=0,
-                        reason=f"J值超买回落，J:{current_row['J']:.1f}"
+                        reason=f"J值超买回落，J:{j[i]:.1f}"
                     )
                     signals.append(signal)
             
@@ -146,21 +150,15 @@ class KDJStrategy(BaseStrategy):
         k_period = self.config['k_period']
         d_period = self.config['d_period']
         
-        # 计算最高价和最低价的滚动窗口
-        data['lowest_low'] = data['low'].rolling(window=k_period).min()
-        data['highest_high'] = data['high'].rolling(window=k_period).max()
-        
-        # 计算RSV (Raw Stochastic Value)
-        data['rsv'] = ((data['close'] - data['lowest_low']) / 
-                       (data['highest_high'] - data['lowest_low']) * 100)
-        
-        # 计算K值 (使用指数移动平均)
-        data['K'] = data['rsv'].ewm(alpha=1/d_period).mean()
-        
-        # 计算D值 (K值的指数移动平均)
-        data['D'] = data['K'].ewm(alpha=1/d_period).mean()
-        
-        # 计算J值
-        data['J'] = 3 * data['K'] - 2 * data['D']
+        # RSV取k_period日最高/最低价，K、D为alpha=1/d_period的指数平滑（即com=d_period-1）
+        k, d, j = kdj(
+            data['high'].to_numpy(dtype=np.float64),
+            data['low'].to_numpy(dtype=np.float64),
+            data['close'].to_numpy(dtype=np.float64),
+            k_period, float(d_period - 1)
+        )
+        data['K'] = k
+        data['D'] = d
+        data['J'] = j
         
         return data 
\ No newline at end of file
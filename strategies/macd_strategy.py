@@ -9,11 +9,28 @@ from typing import List
 from loguru import logger
 
 from .base_strategy import BaseStrategy, Signal
+from utils.technical_indicators import (
+    macd, macd_signal,
+    MACD_GOLDEN_CROSS, MACD_DEAD_CROSS, MACD_TOP_DIVERGENCE, MACD_BOTTOM_DIVERGENCE,
+    MACD_ZERO_CROSS_UP, MACD_ZERO_CROSS_DOWN
+)
+
+# 各信号类型对应的(信号方向, 信号原因)
+SIGNAL_KINDS = {
+    MACD_GOLDEN_CROSS: ('BUY', "MACD金叉买入信号"),
+    MACD_DEAD_CROSS: ('SELL', "MACD死叉卖出信号"),
+    MACD_TOP_DIVERGENCE: ('SELL', "MACD顶背离卖出信号"),
+    MACD_BOTTOM_DIVERGENCE: ('BUY', "MACD底背离买入信号"),
+    MACD_ZERO_CROSS_UP: ('BUY', "MACD上穿零轴买入信号"),
+    MACD_ZERO_CROSS_DOWN: ('SELL', "MACD下穿零轴卖出信号")
+}
 
 
 class MACDStrategy(BaseStrategy):
     """MACD策略"""
 
+    PARAM_NAMES = ('fast_period', 'slow_period', 'signal_period')
+
     def __init__(self, config: dict):
         """
         初始化MACD策略
@@ -41,20 +58,16 @@ class MACDStrategy(BaseStrategy):
             包含MACD指标的数据
         """
         try:
-            df = data.copy()
-
-            # 计算EMA
-            ema_fast = df['close'].ewm(span=self.fast_period).mean()
-            ema_slow = df['close'].ewm(span=self.slow_period).mean()
-
-            # 计算MACD线
-            df['macd'] = ema_fast - ema_slow
-
-            # 计算信号线
-            df['signal'] = df['macd'].ewm(span=self.signal_period).mean()
+            df = data.copy(deep=False)
 
-            # 计算柱状图
-            df['histogram'] = df['macd'] - df['signal']
+            # 计算MACD线、信号线和柱状图
+            macd_line, signal_line, histogram = macd(
+                df['close'].to_numpy(dtype=np.float64),
+                self.fast_period, self.slow_period, self.signal_period
+            )
+            df['macd'] = macd_line
+            df['signal'] = signal_line
+            df['histogram'] = histogram
 
             return df
 
@@ -82,80 +95,27 @@ class MACDStrategy(BaseStrategy):
             # 计算MACD指标
             df = self.calculate_indicators(data)
 
-            # 生成信号
-            for i in range(1, len(df)):
-                current_macd = df.iloc[i]['macd']
-                current_signal = df.iloc[i]['signal']
-                current_hist = df.iloc[i]['histogram']
-
-                prev_macd = df.iloc[i - 1]['macd']
-                prev_signal = df.iloc[i - 1]['signal']
-                prev_hist = df.iloc[i - 1]['histogram']
-
-                signal_type = 'HOLD'
-                strength = 0.0
-                reason = ""
-
-                # MACD金叉 - 买入信号
-                if (prev_macd <= prev_signal and current_macd > current_signal and
-                        current_macd < 0):  # 在零轴下方的金叉更可靠
-                    signal_type = 'BUY'
-                    strength = min(abs(current_macd - current_signal) / abs(current_macd) * 2, 1.0)
-                    reason = "MACD金叉买入信号"
-
-                # MACD死叉 - 卖出信号
-                elif (prev_macd >= prev_signal and current_macd < current_signal and
-                      current_macd > 0):  # 在零轴上方的死叉更可靠
-                    signal_type = 'SELL'
-                    strength = min(abs(current_macd - current_signal) / abs(current_macd) * 2, 1.0)
-                    reason = "MACD死叉卖出信号"
-
-                # 柱状图背离信号
-                elif i >= 5:  # 需要足够的历史数据判断背离
-                    # 价格创新高但MACD柱状图未创新高 - 顶背离
-                    recent_prices = df.iloc[i - 4:i + 1]['close']
-                    recent_hist = df.iloc[i - 4:i + 1]['histogram']
-
-                    if (recent_prices.iloc[-1] == recent_prices.max() and
-                            recent_hist.iloc[-1] < recent_hist.max() and
-                            current_hist < 0):
-                        signal_type = 'SELL'
-                        strength = 0.6
-                        reason = "MACD顶背离卖出信号"
-
-                    # 价格创新低但MACD柱状图未创新低 - 底背离
-                    elif (recent_prices.iloc[-1] == recent_prices.min() and
-                          recent_hist.iloc[-1] > recent_hist.min() and
-                          current_hist > 0):
-                        signal_type = 'BUY'
-                        strength = 0.6
-                        reason = "MACD底背离买入信号"
-
-                # 零轴穿越信号
-                if signal_type == 'HOLD':
-                    # MACD上穿零轴
-                    if prev_macd <= 0 and current_macd > 0:
-                        signal_type = 'BUY'
-                        strength = 0.5
-                        reason = "MACD上穿零轴买入信号"
-
-                    # MACD下穿零轴
-                    elif prev_macd >= 0 and current_macd < 0:
-                        signal_type = 'SELL'
-                        strength = 0.5
-                        reason = "MACD下穿零轴卖出信号"
-
-                if signal_type != 'HOLD' and strength > 0:
-                    signal = Signal(
-                        symbol=symbol,
-                        signal_type=signal_type,
-                        price=df.iloc[i]['close'],
-                        quantity=100,  # 默认数量
-                        timestamp=df.index[i] if hasattr(df.index[i], 'to_pydatetime') else pd.Timestamp.now(),
-                        confidence=strength,
-                        reason=reason
-                    )
-                    signals.append(signal)
+            # 逐日判断由内核完成，只为有信号的交易日构造Signal
+            close = df['close'].to_numpy()
+            kinds, strength = macd_signal(
+                close.astype(np.float64),
+                df['macd'].to_numpy(dtype=np.float64),
+                df['signal'].to_numpy(dtype=np.float64),
+                df['histogram'].to_numpy(dtype=np.float64)
+            )
+
+            for i in np.flatnonzero(kinds):
+                signal_type, reason = SIGNAL_KINDS[kinds[i]]
+                signal = Signal(
+                    symbol=symbol,
+                    signal_type=signal_type,
+                    price=close[i],
+                    quantity=100,  # 默认数量
+                    timestamp=df.index[i] if hasattr(df.index[i], 'to_pydatetime') else pd.Timestamp.now(),
+                    confidence=strength[i],
+                    reason=reason
+                )
+                signals.append(signal)
 
             if signals:
                 logger.info(f"MACD策略生成 {len(signals)} 个信号")
@@ -9,7 +9,7 @@ import numpy as np
 from typing import List, Dict, Any
 from loguru import logger
 
-from .base_strategy import BaseStrategy, Signal
+from .base_strategy import BaseStrategy, Signal, SIDE_BUY, SIDE_SELL
 
 
 class MultiStrategy(BaseStrategy):
@@ -67,12 +67,14 @@ class MultiStrategy(BaseStrategy):
             
             for strategy, weight in self.strategies.items():
                 try:
-                    signals = strategy.generate_signals(data.copy(), symbol)
+                    # 浅拷贝：子策略只新增指标列，不修改原有数据，无需复制底层数组
+                    signals = strategy.generate_signals(data.copy(deep=False), symbol)
                     all_strategy_signals[strategy.name] = {
                         'signals': signals,
                         'weight': weight
                     }
-                    logger.debug(f"{symbol}: {strategy.name}生成{len(signals)}个信号")
+                    # 逐股票逐策略调用，参数延迟格式化，日志级别过滤时不构造消息
+                    logger.debug("{}: {}生成{}个信号", symbol, strategy.name, len(signals))
                 except Exception as e:
                     logger.error(f"{symbol}: {strategy.name}信号生成失败: {e}")
                     continue
@@ -122,10 +124,10 @@ class MultiStrategy(BaseStrategy):
                     }
                 
                 # 累加信号强度
-                if signal.signal_type.upper() == 'BUY':
+                if signal.side == SIDE_BUY:
                     signal_strength[timestamp]['buy_strength'] += weight
                     signal_strength[timestamp]['reasons'].append(f"{strategy_name}买入({weight:.1%})")
-                elif signal.signal_type.upper() == 'SELL':
+                elif signal.side == SIDE_SELL:
                     signal_strength[timestamp]['sell_strength'] += weight
                     signal_strength[timestamp]['reasons'].append(f"{strategy_name}卖出({weight:.1%})")
         
@@ -186,6 +188,18 @@ class MultiStrategy(BaseStrategy):
         last_signal_type = None
         last_signal_time = None
         
+        # 日期到行号的映射只构建一次，同一日期有多行时取第一行
+        try:
+            date_positions = {date: i for i, date in reversed(list(enumerate(data.index.date)))}
+        except AttributeError:
+            date_positions = {}
+        
+        # 技术确认用到的列一次取出为数组，逐信号按位置切片
+        columns = {
+            column: data[column].to_numpy()
+            for column in ('close', 'high', 'low', 'volume') if column in data.columns
+        }
+        
         for signal in signals:
             # 避免连续相同类型信号
             if (last_signal_type == signal.signal_type and 
@@ -194,56 +208,56 @@ class MultiStrategy(BaseStrategy):
                 continue
             
             # 添加技术确认
-            if self._technical_confirmation(signal, data):
+            if self._technical_confirmation(signal, columns, date_positions):
                 filtered_signals.append(signal)
                 last_signal_type = signal.signal_type
                 last_signal_time = signal.timestamp
         
         return filtered_signals
     
-    def _technical_confirmation(self, signal: Signal, data: pd.DataFrame) -> bool:
+    def _technical_confirmation(self, signal: Signal, columns: Dict[str, np.ndarray],
+                                date_positions: Dict) -> bool:
         """
         技术确认信号有效性
         
         Args:
             signal: 交易信号
-            data: 股票数据
+            columns: 股票数据的列数组（close、high、low及可选的volume）
+            date_positions: 日期到数据行号的映射
             
         Returns:
             是否确认信号
         """
         try:
             # 找到信号对应的数据行
-            signal_date = signal.timestamp.date()
-            data_dates = [d.date() for d in data.index]
+            signal_idx = date_positions.get(signal.timestamp.date())
             
-            if signal_date not in data_dates:
+            if signal_idx is None:
                 return True  # 如果找不到对应日期，默认确认
             
-            signal_idx = data_dates.index(signal_date)
-            
             if signal_idx < 5:  # 数据不足
                 return True
             
-            current_data = data.iloc[signal_idx]
+            current_close = columns['close'][signal_idx]
             
             # 基本技术确认
-            if signal.signal_type.upper() == 'BUY':
+            if signal.side == SIDE_BUY:
                 # 买入确认：价格不在近期高点，有上涨空间
-                recent_high = data.iloc[signal_idx-5:signal_idx+1]['high'].max()
-                if current_data['close'] > recent_high * 0.95:  # 接近近期高点
+                recent_high = np.nanmax(columns['high'][signal_idx-5:signal_idx+1])
+                if current_close > recent_high * 0.95:  # 接近近期高点
                     return False
                 
                 # 成交量确认（如果有成交量数据）
-                if 'volume' in data.columns:
-                    avg_volume = data.iloc[signal_idx-5:signal_idx]['volume'].mean()
-                    if current_data['volume'] < avg_volume * 0.8:  # 成交量不足
+                volume = columns.get('volume')
+                if volume is not None:
+                    avg_volume = np.nanmean(volume[signal_idx-5:signal_idx])
+                    if volume[signal_idx] < avg_volume * 0.8:  # 成交量不足
                         return False
             
-            elif signal.signal_type.upper() == 'SELL':
+            elif signal.side == SIDE_SELL:
                 # 卖出确认：价格不在近期低点
-                recent_low = data.iloc[signal_idx-5:signal_idx+1]['low'].min()
-                if current_data['close'] < recent_low * 1.05:  # 接近近期低点
+                recent_low = np.nanmin(columns['low'][signal_idx-5:signal_idx+1])
+                if current_close < recent_low * 1.05:  # 接近近期低点
                     return False
             
             return True
@@ -252,6 +266,14 @@ class MultiStrategy(BaseStrategy):
             logger.debug(f"技术确认失败: {e}")
             return True  # 默认确认
     
+    def params_key(self) -> tuple:
+        """策略参数标识，由组合配置和各子策略的参数标识及权重组成"""
+        return (
+            type(self).__name__,
+            repr(sorted(self.config.items())),
+            tuple((strategy.params_key(), weight) for strategy, weight in self.strategies.items())
+        )
+    
     def get_strategy_description(self) -> str:
         """获取策略描述"""
         strategy_names = [strategy.name for strategy in self.strategies.keys()]
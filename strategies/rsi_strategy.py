@@ -9,12 +9,15 @@ import numpy as np
 from typing import List, Dict, Any
 from datetime import datetime
 from .base_strategy import BaseStrategy, Signal
+from utils.technical_indicators import rsi as rsi_kernel
 from loguru import logger
 
 
 class RSIStrategy(BaseStrategy):
     """RSI策略"""
     
+    PARAM_NAMES = ('rsi_period', 'oversold', 'overbought')
+    
     def __init__(self, config: Dict[str, Any]):
         """
         初始化RSI策略
@@ -43,12 +46,8 @@ class RSIStrategy(BaseStrategy):
     
     def calculate_rsi(self, prices, period):
         """计算RSI指标"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        values = rsi_kernel(prices.to_numpy(dtype=np.float64), period)
+        return pd.Series(values, index=prices.index)
     
     def generate_signals(self, data: pd.DataFrame, symbol: str) -> List[Signal]:
         """
@@ -75,31 +74,23 @@ class RSIStrategy(BaseStrategy):
         # 计算RSI
         data['rsi'] = self.calculate_rsi(data['close'], self.rsi_period)
         
-        # 生成交易信号
-        for i in range(self.rsi_period, len(data)):
-            current_rsi = data['rsi'].iloc[i]
-            
-            # RSI超卖，买入信号
-            if current_rsi < self.oversold:
-                signal = Signal(
-                    symbol=symbol,
-                    signal_type='BUY',
-                    price=data['close'].iloc[i],
-                    quantity=1000,
-                    timestamp=data.index[i]
-                )
-                signals.append(signal)
-                
-            # RSI超买，卖出信号
-            elif current_rsi > self.overbought:
-                signal = Signal(
-                    symbol=symbol,
-                    signal_type='SELL',
-                    price=data['close'].iloc[i],
-                    quantity=1000,
-                    timestamp=data.index[i]
-                )
-                signals.append(signal)
+        # 生成交易信号：整列比较得到超卖（买入）和超买（卖出）的交易日，只为这些交易日构造Signal
+        rsi_values = data['rsi'].to_numpy()
+        close = data['close'].to_numpy()
+        buy = rsi_values < self.oversold
+        sell = ~buy & (rsi_values > self.overbought)
+        buy[:self.rsi_period] = False
+        sell[:self.rsi_period] = False
+        
+        for i in np.flatnonzero(buy | sell):
+            signal = Signal(
+                symbol=symbol,
+                signal_type='BUY' if buy[i] else 'SELL',
+                price=close[i],
+                quantity=1000,
+                timestamp=data.index[i]
+            )
+            signals.append(signal)
         
         logger.info(f"RSI策略为{symbol}生成了{len(signals)}个信号")
         return signals
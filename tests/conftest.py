@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+测试公共配置
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
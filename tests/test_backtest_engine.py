@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+回测引擎测试：撮合内核与逐笔撮合的原实现结果一致
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.backtest_engine import BacktestEngine
+from strategies.base_strategy import Signal
+
+
+def reference_execute(signals, initial_capital, commission_rate, stamp_tax_rate, min_trade_unit):
+    """
+    逐笔撮合的原实现（撮合内核之前的_execute_single_trade），单笔出错时只跳过该信号
+
+    Returns:
+        (交易记录列表, 持仓字典, 期末资金)
+    """
+    capital = initial_capital
+    positions = {}
+    trades = []
+
+    for signal in signals:
+        try:
+            position = positions.setdefault(signal.symbol, {'quantity': 0, 'avg_price': 0, 'total_cost': 0})
+            quantity = signal.quantity
+
+            if signal.signal_type.lower() == 'buy':
+                if quantity == 0 or quantity is None:
+                    quantity = int(initial_capital * 0.03 / signal.price)
+                    quantity = (quantity // min_trade_unit) * min_trade_unit
+                if quantity < min_trade_unit:
+                    quantity = min_trade_unit
+
+                amount = signal.price * quantity
+                commission = amount * commission_rate
+                total_cost = amount + commission
+                if total_cost > capital:
+                    adjusted = int(capital * 0.90 / (signal.price * (1 + commission_rate)))
+                    adjusted = (adjusted // min_trade_unit) * min_trade_unit
+                    if adjusted < min_trade_unit:
+                        continue
+                    quantity = adjusted
+                    amount = signal.price * quantity
+                    commission = amount * commission_rate
+                    total_cost = amount + commission
+
+                position['quantity'] += quantity
+                position['total_cost'] += amount
+                position['avg_price'] = position['total_cost'] / position['quantity']
+                capital -= total_cost
+                trades.append({
+                    'timestamp': signal.timestamp, 'symbol': signal.symbol, 'action': 'buy',
+                    'quantity': quantity, 'price': signal.price, 'amount': amount,
+                    'commission': commission, 'total_cost': total_cost,
+                    'reason': signal.reason, 'capital_after': capital
+                })
+
+            elif signal.signal_type.lower() == 'sell':
+                quantity = min(quantity, position['quantity'])
+                if quantity == 0:
+                    continue
+
+                amount = signal.price * quantity
+                commission = amount * commission_rate
+                stamp_tax = amount * stamp_tax_rate
+                total_fees = commission + stamp_tax
+                net_amount = amount - total_fees
+                cost_basis = position['avg_price'] * quantity
+                profit_loss = amount - cost_basis - total_fees
+
+                position['quantity'] -= quantity
+                if position['quantity'] > 0:
+                    position['total_cost'] -= cost_basis
+                else:
+                    position['total_cost'] = 0
+                    position['avg_price'] = 0
+                capital += net_amount
+                trades.append({
+                    'timestamp': signal.timestamp, 'symbol': signal.symbol, 'action': 'sell',
+                    'quantity': quantity, 'price': signal.price, 'amount': amount,
+                    'commission': commission, 'stamp_tax': stamp_tax, 'total_fees': total_fees,
+                    'net_amount': net_amount, 'profit_loss': profit_loss,
+                    'reason': signal.reason, 'capital_after': capital
+                })
+        except Exception:
+            continue
+
+    return trades, positions, capital
+
+
+def random_signals(count: int, seed: int):
+    """构造多只股票的随机买卖信号"""
+    rng = np.random.default_rng(seed)
+    symbols = ['000001', '000002', '600036']
+    timestamps = pd.date_range('2024-01-02', periods=count, freq='h')
+    signals = []
+    for i in range(count):
+        signals.append(Signal(
+            symbol=symbols[rng.integers(len(symbols))],
+            signal_type='buy' if rng.random() < 0.55 else 'sell',
+            price=round(float(rng.uniform(5, 50)), 2),
+            quantity=int(rng.choice([0, 100, 300, 1000, 5000])),
+            timestamp=timestamps[i],
+            reason=f"signal {i}"
+        ))
+    return signals
+
+
+def assert_same_result(engine, expected_trades, expected_positions, expected_capital):
+    assert len(engine.trades) == len(expected_trades)
+    for actual, expected in zip(engine.trades, expected_trades):
+        assert actual.keys() == expected.keys()
+        for key, value in expected.items():
+            if isinstance(value, float):
+                assert actual[key] == pytest.approx(value, rel=1e-12, abs=1e-9), key
+            else:
+                assert actual[key] == value, key
+
+    assert engine.current_capital == pytest.approx(expected_capital, rel=1e-12)
+    for symbol, position in expected_positions.items():
+        assert engine.positions[symbol]['quantity'] == position['quantity']
+        assert engine.positions[symbol]['avg_price'] == pytest.approx(position['avg_price'], rel=1e-12)
+        assert engine.positions[symbol]['total_cost'] == pytest.approx(position['total_cost'],
+                                                                       rel=1e-12, abs=1e-6)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('initial_capital', [100000, 1000000])
+def test_trade_kernel_matches_reference(seed, initial_capital):
+    signals = random_signals(300, seed)
+    expected = reference_execute(signals, initial_capital, 0.0003, 0.001, 100)
+
+    engine = BacktestEngine(initial_capital=initial_capital)
+    engine._reset_backtest()
+    engine._execute_trades(random_signals(300, seed), {})
+
+    assert_same_result(engine, *expected)
+
+
+@pytest.mark.parametrize('bad_price', [0.0, -1.0, math.nan, math.inf])
+def test_invalid_price_signal_is_skipped(bad_price):
+    """价格无效的信号只跳过该信号，其余信号照常撮合"""
+    signals = random_signals(50, 7)
+    bad = [Signal('000001', 'buy', bad_price, 0, signals[10].timestamp, reason='bad buy'),
+           Signal('000001', 'buy', bad_price, 200, signals[20].timestamp, reason='bad buy'),
+           Signal('000001', 'sell', bad_price, 100, signals[30].timestamp, reason='bad sell')]
+    mixed = signals[:10] + bad[:1] + signals[10:20] + bad[1:2] + signals[20:30] + bad[2:] + signals[30:]
+
+    engine = BacktestEngine(initial_capital=100000)
+    engine._reset_backtest()
+    engine._execute_trades(mixed, {})
+
+    assert all(trade['reason'] != 'bad buy' and trade['reason'] != 'bad sell' for trade in engine.trades)
+    assert_same_result(engine, *reference_execute(random_signals(50, 7), 100000, 0.0003, 0.001, 100))
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+数据库管理模块测试
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import database
+from data.database import DatabaseManager
+
+
+def make_bars(start: str, periods: int, base: float = 10.0) -> pd.DataFrame:
+    """构造日线数据"""
+    index = pd.bdate_range(start, periods=periods, name='date')
+    close = base + np.arange(periods) * 0.01
+    return pd.DataFrame({
+        'open': close - 0.05,
+        'high': close + 0.1,
+        'low': close - 0.1,
+        'close': close,
+        'volume': np.arange(1, periods + 1) * 1000,
+        'amount': close * np.arange(1, periods + 1) * 1000,
+    }, index=index)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'trading.db')
+
+
+@pytest.mark.skipif(not database.PYARROW_AVAILABLE, reason="需要pyarrow")
+def test_parquet_store_keeps_sqlite_history(db_path):
+    """SQLite中的历史数据在首次写入Parquet时并入，保存新数据后仍能读到完整历史"""
+    history = make_bars('2024-01-01', 20)
+    sqlite_db = DatabaseManager(db_path)
+    sqlite_db.use_parquet = False
+    sqlite_db.save_stock_data('000001', history)
+
+    new_bar = make_bars('2024-01-29', 1, base=11.0)
+    parquet_db = DatabaseManager(db_path)
+    parquet_db.save_stock_data('000001', new_bar)
+
+    assert os.path.exists(parquet_db._bars_path('000001'))
+    result = parquet_db.get_stock_data('000001')
+    assert len(result) == 21
+    assert result.index.equals(history.index.append(new_bar.index))
+    np.testing.assert_allclose(result['close'].to_numpy(),
+                               np.concatenate([history['close'], new_bar['close']]))
+
+    # 区间和条数查询同样覆盖迁移过来的数据
+    assert len(parquet_db.get_stock_data('000001', start_date='2024-01-15')) == 11
+    assert len(parquet_db.get_stock_data('000001', limit=5)) == 5
+
+
+@pytest.mark.skipif(not database.PYARROW_AVAILABLE, reason="需要pyarrow")
+def test_parquet_store_overwrites_same_date(db_path):
+    """同一日期再次保存时以新数据为准"""
+    db = DatabaseManager(db_path)
+    db.save_stock_data('000002', make_bars('2024-01-01', 5))
+    db.save_stock_data('000002', make_bars('2024-01-05', 3, base=20.0))
+
+    result = db.get_stock_data('000002')
+    assert len(result) == 7
+    assert result.loc['2024-01-05', 'close'] == pytest.approx(20.0)
+
+
+def test_sqlite_store_round_trip(db_path):
+    """未使用Parquet时数据写入stock_daily表并按条件读取"""
+    db = DatabaseManager(db_path)
+    db.use_parquet = False
+    bars = make_bars('2024-01-01', 10)
+    db.save_stock_data('000003', bars)
+    db.save_stock_data('000003', make_bars('2024-01-12', 1, base=30.0))
+
+    result = db.get_stock_data('000003')
+    assert len(result) == 10
+    assert result['close'].iloc[-1] == pytest.approx(30.0)
+    assert len(db.get_stock_data('000003', end_date='2024-01-05')) == 5
+    assert db.get_stock_data('000003', limit=3).index[0] == pd.Timestamp('2024-01-10')
+
+
+def test_migrate_legacy_stock_daily(db_path):
+    """旧版stock_daily表（自增id + UNIQUE约束）迁移为WITHOUT ROWID表，数据保持不变"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE stock_daily (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT,
+            date TEXT,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume INTEGER,
+            amount REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(symbol, date)
+        )
+    """)
+    conn.execute("CREATE INDEX idx_stock_daily_symbol_date ON stock_daily(symbol, date)")
+    conn.executemany(
+        "INSERT INTO stock_daily (symbol, date, open, high, low, close, volume, amount) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [('000001', '2024-01-02', 10.0, 10.5, 9.5, 10.2, 1000, 10200.0),
+         ('000001', '2024-01-03', 10.2, 10.8, 10.0, 10.6, 2000, 21200.0),
+         ('000002', '2024-01-02', 20.0, 20.5, 19.5, 20.1, 3000, 60300.0),
+         (None, '2024-01-02', 1.0, 1.0, 1.0, 1.0, 1, 1.0)]
+    )
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(db_path)
+    db.use_parquet = False
+    conn = db._connect()
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(stock_daily)")]
+    assert columns == ['symbol', 'date', 'open', 'high', 'low', 'close', 'volume', 'amount']
+    table_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'stock_daily'").fetchone()[0]
+    assert 'WITHOUT ROWID' in table_sql
+    assert conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_stock_daily_symbol_date'").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM stock_daily").fetchone()[0] == 3
+
+    result = db.get_stock_data('000001')
+    assert result['close'].tolist() == pytest.approx([10.2, 10.6])
+    assert result['volume'].tolist() == [1000, 2000]
+
+    # 再次初始化不重复迁移
+    DatabaseManager(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM stock_daily").fetchone()[0] == 3
+
+
+@pytest.mark.parametrize('use_parquet', [False, True])
+def test_prices_round_trip_exactly(db_path, use_parquet):
+    """价格以float64保存和读取，读回值与写入值完全相同"""
+    if use_parquet and not database.PYARROW_AVAILABLE:
+        pytest.skip("需要pyarrow")
+
+    db = DatabaseManager(db_path)
+    db.use_parquet = use_parquet
+    bars = make_bars('2024-01-01', 3)
+    bars['close'] = [10.23, 8.17, 123.45]
+    db.save_stock_data('000004', bars)
+
+    result = db.get_stock_data('000004')
+    assert result['close'].dtype == np.float64
+    assert result['close'].tolist() == [10.23, 8.17, 123.45]
+    assert result['volume'].dtype == np.int64
+
+
+def count_rows(db_path: str, table: str) -> int:
+    """用独立连接统计表行数，只能看到已提交的数据"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_buffered_writes_flush_at_threshold(db_path, monkeypatch):
+    """信号、交易和快照先进入缓冲，达到行数阈值时一次写入"""
+    monkeypatch.setattr(database, 'WRITE_BUFFER_SIZE', 5)
+    monkeypatch.setattr(database, 'WRITE_FLUSH_INTERVAL', 60.0)
+    db = DatabaseManager(db_path)
+
+    for i in range(4):
+        db.save_signal('000001', 'BUY', 0.8, 10.0 + i, 'test', 'reason')
+    assert count_rows(db_path, 'trading_signals') == 0
+
+    db.save_trade('000001', 'BUY', 100, 10.0, 1000.0, 0.3, 'test')
+    assert count_rows(db_path, 'trading_signals') == 4
+    assert count_rows(db_path, 'trades') == 1
+
+    # 查询前先落库，能读到刚保存的快照
+    db.save_portfolio_snapshot(1000000.0, 900000.0, 100000.0, 0.0, 0.0, 1)
+    assert len(db.get_portfolio_history()) == 1
+    db.close()
+
+
+def test_timer_flush_writes_and_closes_connection(db_path, monkeypatch):
+    """未达到阈值的数据由定时器落库，定时器线程的连接在写入后关闭"""
+    monkeypatch.setattr(database, 'WRITE_FLUSH_INTERVAL', 0.2)
+    closed_in = []
+    close_connection = DatabaseManager._close_thread_connection
+
+    def record_close(self):
+        closed_in.append(threading.current_thread())
+        close_connection(self)
+
+    monkeypatch.setattr(DatabaseManager, '_close_thread_connection', record_close)
+    db = DatabaseManager(db_path)
+    db.save_signal('000001', 'SELL', 0.6, 10.0, 'test', 'reason')
+
+    deadline = time.monotonic() + 5
+    while count_rows(db_path, 'trading_signals') == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert count_rows(db_path, 'trading_signals') == 1
+    deadline = time.monotonic() + 5
+    while not closed_in and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert closed_in and closed_in[0] is not threading.main_thread()
+
+
+def test_failed_flush_keeps_rows(db_path, monkeypatch):
+    """批量写入失败时数据保留在缓冲中，下次落库时写入"""
+    monkeypatch.setattr(database, 'WRITE_FLUSH_INTERVAL', 60.0)
+    db = DatabaseManager(db_path)
+    db._connect().execute("ALTER TABLE trades RENAME TO trades_moved")
+
+    db.save_signal('000001', 'BUY', 0.8, 10.0, 'test', 'reason')
+    db.save_trade('000001', 'BUY', 100, 10.0, 1000.0, 0.3, 'test')
+    db.flush()
+    assert count_rows(db_path, 'trading_signals') == 0
+    assert len(db._signal_buffer) == 1 and len(db._trade_buffer) == 1
+
+    db._connect().execute("ALTER TABLE trades_moved RENAME TO trades")
+    db.flush()
+    assert count_rows(db_path, 'trading_signals') == 1
+    assert count_rows(db_path, 'trades') == 1
+    db.close()
+
+
+def test_exit_flush_writes_pending_rows(db_path, monkeypatch):
+    """进程退出时的回调写入所有实例的剩余缓冲"""
+    monkeypatch.setattr(database, 'WRITE_FLUSH_INTERVAL', 60.0)
+    db = DatabaseManager(db_path)
+    db.save_trade('000001', 'SELL', 100, 11.0, 1100.0, 0.33, 'test')
+    assert count_rows(db_path, 'trades') == 0
+
+    database._flush_all_buffers()
+    assert count_rows(db_path, 'trades') == 1
+    db.close()
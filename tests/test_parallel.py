@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+多策略并行回测测试
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest.parallel import run_strategies
+from strategies.double_ma_strategy import DoubleMaStrategy
+from strategies.rsi_strategy import RSIStrategy
+from strategies.macd_strategy import MACDStrategy
+
+ENGINE_KWARGS = {'initial_capital': 1000000, 'commission_rate': 0.0003,
+                 'stamp_tax_rate': 0.001, 'min_trade_unit': 100}
+
+
+def make_stock_data():
+    """构造多只股票的随机行情"""
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range('2024-01-01', periods=150)
+    stock_data = {}
+    for k in range(4):
+        close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+        stock_data[f'00000{k}'] = pd.DataFrame({
+            'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+            'volume': rng.integers(100000, 1000000, len(index)).astype(float)
+        }, index=index)
+    return stock_data
+
+
+def make_strategies():
+    return {
+        '双均线': DoubleMaStrategy({'short_window': 5, 'long_window': 20}),
+        'RSI': RSIStrategy({'rsi_period': 14, 'oversold': 30, 'overbought': 70}),
+        'MACD': MACDStrategy({'fast': 12, 'slow': 26, 'signal': 9}),
+    }
+
+
+def test_processes_match_serial():
+    """分进程回测与单进程回测结果一致，且按策略定义顺序返回"""
+    stock_data = make_stock_data()
+    symbols = list(stock_data)
+    args = (symbols, '2024-01-01', '2024-08-01', ENGINE_KWARGS)
+
+    serial = run_strategies(make_strategies(), stock_data, *args, processes=1)
+    parallel = run_strategies(make_strategies(), stock_data, *args, processes=2)
+
+    assert list(serial) == list(parallel) == list(make_strategies())
+    for name in serial:
+        assert serial[name]['performance_metrics'] == parallel[name]['performance_metrics']
+        assert len(serial[name]['trades']) == len(parallel[name]['trades'])
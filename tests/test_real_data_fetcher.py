@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+数据获取器测试：令牌桶限速
+"""
+
+import threading
+import time
+
+import pytest
+
+from utils import real_data_fetcher
+from utils.real_data_fetcher import RateLimiter
+
+
+class FakeClock:
+    """可控时钟，sleep直接推进时间并记录每次请求的发起时刻"""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        assert seconds > 0
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(real_data_fetcher, 'time', fake)
+    return fake
+
+
+def request_times(limiter: RateLimiter, clock: FakeClock, count: int):
+    """依次发起count个请求，返回各请求放行的时刻"""
+    times = []
+    for _ in range(count):
+        limiter.wait()
+        times.append(clock.now)
+    return times
+
+
+def test_burst_then_steady_rate(clock):
+    """空闲后可立即连续发起burst个请求，之后按min_interval放行"""
+    limiter = RateLimiter(min_interval=0.5, burst=3)
+    clock.now += 10  # 空闲足够久，桶已装满
+
+    start = clock.now
+    times = request_times(limiter, clock, 7)
+    assert times[:3] == [start] * 3
+    assert times[3:] == pytest.approx([start + 0.5, start + 1.0, start + 1.5, start + 2.0])
+
+
+def test_long_run_average_rate(clock):
+    """长期平均频率不超过1/min_interval"""
+    limiter = RateLimiter(min_interval=0.2, burst=4)
+    start = clock.now
+    times = request_times(limiter, clock, 50)
+    assert times[-1] - start >= (50 - 4) * 0.2 - 1e-9
+
+
+def test_request_duration_counts_towards_interval(clock):
+    """请求自身耗时计入间隔，慢请求之后不再额外等待"""
+    limiter = RateLimiter(min_interval=0.5, burst=1)
+    limiter.wait()
+    clock.now += 0.8  # 请求耗时超过间隔
+    before = clock.now
+    limiter.wait()
+    assert clock.now == before
+
+
+def test_burst_capacity_is_capped(clock):
+    """长时间空闲积攒的令牌不超过桶容量"""
+    limiter = RateLimiter(min_interval=1.0, burst=2)
+    clock.now += 100
+    start = clock.now
+    times = request_times(limiter, clock, 4)
+    assert times == pytest.approx([start, start, start + 1.0, start + 2.0])
+
+
+def test_shared_between_threads():
+    """多个线程共享同一限速器时总频率受限"""
+    limiter = RateLimiter(min_interval=0.02, burst=1)
+    released = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            limiter.wait()
+            with lock:
+                released.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(released) == 20
+    # 第一个请求立即放行，其余19个至少间隔min_interval
+    assert max(released) - start >= 19 * 0.02 * 0.9
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+实时交易系统测试
+"""
+
+import sqlite3
+
+import pytest
+
+from data import database
+from data.database import DatabaseManager
+
+pytest.importorskip('schedule')
+from examples.real_time import real_time_trading  # noqa: E402
+
+
+def count_rows(db_path: str, table: str) -> int:
+    """用独立连接统计表行数，只能看到已提交的数据"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_run_once_standalone_writes_before_returning(tmp_path, monkeypatch):
+    """进程池中执行一次任务，返回时本次的信号、交易和快照已落库"""
+    db_path = str(tmp_path / 'trading.db')
+    # 阈值和定时器都不会触发落库
+    monkeypatch.setattr(database, 'WRITE_BUFFER_SIZE', 1000)
+    monkeypatch.setattr(database, 'WRITE_FLUSH_INTERVAL', 60.0)
+    monkeypatch.setattr(real_time_trading, 'DatabaseManager', lambda: DatabaseManager(db_path))
+
+    def run_daily_task(self):
+        self.db_manager.save_signal('000001', 'BUY', 0.8, 10.0, 'test', 'reason')
+        self.db_manager.save_trade('000001', 'BUY', 100, 10.0, 1000.0, 0.3, 'test')
+        self.db_manager.save_portfolio_snapshot(1000000.0, 999000.0, 1000.0, 0.0, 0.0, 1)
+
+    monkeypatch.setattr(real_time_trading.RealTimeTradingSystem, 'run_daily_task', run_daily_task)
+
+    real_time_trading.run_once_standalone()
+
+    assert count_rows(db_path, 'trading_signals') == 1
+    assert count_rows(db_path, 'trades') == 1
+    assert count_rows(db_path, 'portfolio_history') == 1
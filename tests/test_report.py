@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+回测结果汇总测试
+"""
+
+import numpy as np
+
+from backtest.report import comparison_frame, metrics_frame, COMPARISON_COLUMNS, COMPARISON_FORMATTERS
+
+
+def make_results():
+    results = {}
+    for k, name in enumerate(['策略A', '策略B', '策略C']):
+        results[name] = {'performance_metrics': {
+            'total_return': 0.1 * k - 0.05, 'annualized_return': 0.2 * k, 'volatility': 0.15,
+            'sharpe_ratio': 1.5 - k, 'max_drawdown': -0.1 * k, 'win_rate': 0.5,
+            'profit_loss_ratio': 1.2, 'total_trades': 10 * k, 'final_value': 1000000.0 + k,
+        }}
+    return results
+
+
+def test_metrics_frame_indexed_by_strategy():
+    metrics = metrics_frame(make_results())
+    assert metrics.index.tolist() == ['策略A', '策略B', '策略C']
+    np.testing.assert_allclose(metrics['total_return'], [-0.05, 0.05, 0.15])
+
+
+def test_comparison_frame_keeps_numbers():
+    table = comparison_frame(make_results())
+    assert table.columns.tolist() == ['策略名称'] + [label for _, label in COMPARISON_COLUMNS]
+    assert table['总收益率'].dtype == np.float64
+    assert table['交易次数'].tolist() == [0, 10, 20]
+
+    text = table.to_string(index=False, formatters=COMPARISON_FORMATTERS)
+    assert '15.00%' in text
+    assert '1,000,002元' in text
+
+
+def test_comparison_frame_column_subset():
+    table = comparison_frame(make_results(), name_column='策略', columns=('总收益率', '交易次数'))
+    assert table.columns.tolist() == ['策略', '总收益率', '交易次数']
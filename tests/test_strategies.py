@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+策略参数标识测试
+"""
+
+from strategies.double_ma_strategy import DoubleMaStrategy
+from strategies.macd_strategy import MACDStrategy
+from strategies.rsi_strategy import RSIStrategy
+from strategies.multi_strategy import MultiStrategy
+
+
+def test_params_key_ignores_runtime_state():
+    strategy = RSIStrategy({'rsi_period': 6})
+    key = strategy.params_key()
+
+    strategy.positions['000001'] = {'quantity': 100}
+    strategy.signals.append(object())
+    strategy.performance_metrics['total_return'] = 0.1
+    strategy.last_signal_time = {'000001': None}
+    strategy._scratch = object()
+
+    assert strategy.params_key() == key
+
+
+def test_params_key_equal_for_equal_params():
+    assert DoubleMaStrategy({'short_window': 3}).params_key() == \
+        DoubleMaStrategy({'short_window': 3}).params_key()
+    assert MACDStrategy({}).params_key() != DoubleMaStrategy({}).params_key()
+
+
+def test_params_key_tracks_declared_params():
+    strategy = MACDStrategy({})
+    key = strategy.params_key()
+    assert MACDStrategy({'fast': 10}).params_key() != key
+
+    # 参数优化直接修改参数属性
+    strategy.fast_period = 10
+    assert strategy.params_key() != key
+    strategy.fast_period = 12
+    assert strategy.params_key() == key
+
+
+def test_multi_strategy_params_key():
+    def build(threshold, short_window):
+        return MultiStrategy({
+            DoubleMaStrategy({'short_window': short_window}): 0.5,
+            RSIStrategy({}): 0.5,
+        }, {'signal_threshold': threshold})
+
+    key = build(0.6, 3).params_key()
+    assert build(0.6, 3).params_key() == key
+    assert build(0.7, 3).params_key() != key
+    assert build(0.6, 4).params_key() != key
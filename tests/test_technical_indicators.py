@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+技术指标内核测试：与pandas实现的结果一致
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.technical_indicators import (
+    rolling_mean, moving_averages, bollinger, kdj, ema, rsi, macd, MA_WINDOWS,
+    add_basic_indicators
+)
+
+
+def random_walk(n: int = 200, seed: int = 0) -> np.ndarray:
+    """构造价格序列"""
+    rng = np.random.default_rng(seed)
+    return 10.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def with_gaps(prices: np.ndarray) -> np.ndarray:
+    """在价格序列中插入单个和连续的缺失值"""
+    prices = prices.copy()
+    prices[5] = np.nan
+    prices[40:43] = np.nan
+    prices[120] = np.nan
+    return prices
+
+
+@pytest.mark.parametrize('window', [1, 5, 20, 60])
+@pytest.mark.parametrize('gaps', [False, True])
+def test_rolling_mean_matches_pandas(window, gaps):
+    prices = random_walk()
+    if gaps:
+        prices = with_gaps(prices)
+    expected = pd.Series(prices).rolling(window).mean().to_numpy()
+    np.testing.assert_allclose(rolling_mean(prices, window), expected, rtol=1e-10)
+
+
+def test_rolling_mean_recovers_after_nan():
+    prices = np.arange(30, dtype=np.float64) + 10
+    prices[5] = np.nan
+    result = rolling_mean(prices, 5)
+    assert np.isnan(result[5:10]).all()
+    np.testing.assert_allclose(result[10:], pd.Series(prices).rolling(5).mean().to_numpy()[10:])
+
+
+@pytest.mark.parametrize('gaps', [False, True])
+def test_moving_averages_match_pandas(gaps):
+    prices = random_walk(300)
+    if gaps:
+        prices = with_gaps(prices)
+    result = moving_averages(prices, MA_WINDOWS)
+    for k, window in enumerate(MA_WINDOWS):
+        expected = pd.Series(prices).rolling(int(window)).mean().to_numpy()
+        np.testing.assert_allclose(result[:, k], expected, rtol=1e-10)
+
+
+def test_basic_indicator_moving_averages_with_gap():
+    """含缺失值的行情，ma列在缺失值移出窗口后恢复"""
+    prices = with_gaps(random_walk(300))
+    data = add_basic_indicators(pd.DataFrame({'close': prices}))
+    for window in MA_WINDOWS:
+        expected = pd.Series(prices).rolling(int(window)).mean()
+        np.testing.assert_allclose(data[f'ma{window}'].to_numpy(), expected.to_numpy(), rtol=1e-10)
+    assert not np.isnan(data['ma60'].iloc[-1])
+
+
+def pandas_rsi(prices: np.ndarray, period: int) -> np.ndarray:
+    """策略原pandas实现的RSI"""
+    delta = pd.Series(prices).diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return (100 - (100 / (1 + rs))).to_numpy()
+
+
+@pytest.mark.parametrize('period', [6, 14])
+@pytest.mark.parametrize('gaps', [False, True])
+def test_rsi_matches_pandas(period, gaps):
+    prices = random_walk()
+    if gaps:
+        prices = with_gaps(prices)
+    result = rsi(prices, period)
+    np.testing.assert_allclose(result, pandas_rsi(prices, period), rtol=1e-8)
+    assert not np.isnan(result[-1])
+
+
+@pytest.mark.parametrize('gaps', [False, True])
+def test_ema_matches_pandas(gaps):
+    prices = random_walk()
+    if gaps:
+        prices = with_gaps(prices)
+    expected = pd.Series(prices).ewm(span=12).mean().to_numpy()
+    np.testing.assert_allclose(ema(prices, 12), expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize('gaps', [False, True])
+def test_macd_matches_pandas(gaps):
+    prices = random_walk()
+    if gaps:
+        prices = with_gaps(prices)
+    series = pd.Series(prices)
+    expected_macd = series.ewm(span=12).mean() - series.ewm(span=26).mean()
+    expected_signal = expected_macd.ewm(span=9).mean()
+
+    macd_line, signal_line, histogram = macd(prices, 12, 26, 9)
+    np.testing.assert_allclose(macd_line, expected_macd.to_numpy(), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(signal_line, expected_signal.to_numpy(), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(histogram, (expected_macd - expected_signal).to_numpy(),
+                               rtol=1e-9, atol=1e-12)
+
+
+def test_bollinger_matches_pandas():
+    prices = random_walk()
+    middle, upper, lower = bollinger(prices, 20, 2.0)
+    series = pd.Series(prices)
+    mean = series.rolling(20).mean()
+    std = series.rolling(20).std()
+    np.testing.assert_allclose(middle, mean.to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(upper, (mean + 2 * std).to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(lower, (mean - 2 * std).to_numpy(), rtol=1e-10)
+
+
+def test_kdj_matches_pandas():
+    close = random_walk()
+    high = close * 1.01
+    low = close * 0.99
+    k, d, j = kdj(high, low, close, 9, 2.0)
+
+    low_min = pd.Series(low).rolling(9).min()
+    high_max = pd.Series(high).rolling(9).max()
+    rsv = (pd.Series(close) - low_min) / (high_max - low_min) * 100
+    expected_k = rsv.ewm(com=2).mean()
+    expected_d = expected_k.ewm(com=2).mean()
+    np.testing.assert_allclose(k, expected_k.to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(d, expected_d.to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(j, (3 * expected_k - 2 * expected_d).to_numpy(), rtol=1e-10)
@@ -13,6 +13,7 @@ from loguru import logger
 import time
 import threading
 from data.database import DatabaseManager
+from utils.real_data_fetcher import RateLimiter
 
 class RealDataFetcher:
     """实时数据获取器"""
@@ -178,12 +179,14 @@ class RealDataFetcher:
         
         logger.info("开始更新实时价格...")
         
+        # 避免请求过于频繁：平均每0.5秒一次，请求耗时计入间隔，最后一次请求后不再等待
+        limiter = RateLimiter(0.5)
         for symbol in self.stock_pool:
             try:
+                limiter.wait()
                 price = self.get_real_time_price(symbol)
                 if price > 0:
                     logger.debug(f"{symbol}: ¥{price:.2f}")
-                time.sleep(0.5)  # 避免请求过于频繁
                 
             except Exception as e:
                 logger.error(f"更新 {symbol} 价格失败: {e}")
@@ -247,16 +250,17 @@ class RealDataFetcher:
         """
         logger.info(f"开始刷新历史数据，获取最近 {days} 天数据...")
         
+        # 避免请求过于频繁：平均每秒一次，请求耗时计入间隔
+        limiter = RateLimiter(1.0)
         for symbol in self.stock_pool:
             try:
+                limiter.wait()
                 data = self.get_stock_basic_data(symbol, count=days)
                 if not data.empty:
                     logger.info(f"刷新 {symbol} 历史数据: {len(data)} 条")
                 else:
                     logger.warning(f"刷新 {symbol} 历史数据失败")
                 
-                time.sleep(1)  # 避免请求过于频繁
-                
             except Exception as e:
                 logger.error(f"刷新 {symbol} 历史数据异常: {e}")
         
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+numba JIT编译支持
+安装numba时使用numba.njit编译数值计算热点，未安装时退化为普通Python函数
+"""
+
+from loguru import logger
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.warning("numba未安装，数值计算内核将以纯Python方式执行")
+
+    def njit(*args, **kwargs):
+        """numba不可用时的占位装饰器，原样返回函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
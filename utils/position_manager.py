@@ -227,6 +227,7 @@ class PositionManager:
     def update_positions(self, current_prices: Dict[str, float]):
         """更新持仓价格"""
         try:
+            now = datetime.now()
             for symbol, position in self.positions.items():
                 if symbol in current_prices:
                     current_price = current_prices[symbol]
@@ -243,7 +244,7 @@ class PositionManager:
                         unrealized_pnl=unrealized_pnl,
                         unrealized_pnl_pct=unrealized_pnl_pct,
                         entry_date=position.entry_date,
-                        last_update=datetime.now()
+                        last_update=now
                     )
         except Exception as e:
             logger.error(f"更新持仓价格失败: {e}")
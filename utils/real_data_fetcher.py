@@ -6,11 +6,17 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+import os
 import time
+import hashlib
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from loguru import logger
 
+from data.database import normalize_stock_data
+from utils.technical_indicators import add_technical_indicators
+
 try:
     import akshare as ak
 
@@ -19,6 +25,76 @@ except ImportError:
     AKSHARE_AVAILABLE = False
     logger.warning("AKShare未安装，将使用模拟数据")
 
+try:
+    import pyarrow  # noqa: F401  pandas读写Parquet所需
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# 并发下载的线程数、平均每次请求的间隔（秒）以及允许的突发请求数，避免请求过于频繁
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_MIN_INTERVAL = 0.1
+DOWNLOAD_BURST = 4
+
+# 含技术指标的行情按(股票, 日期区间)缓存为Parquet文件，有效期内重复运行直接读取（秒）
+INDICATOR_CACHE_DIR = "data/cache"
+INDICATOR_CACHE_TTL = 6 * 3600
+
+# AKShare历史行情中文列名到内部列名的映射
+AKSHARE_COLUMN_MAPPING = {
+    '日期': 'date',
+    '开盘': 'open',
+    '最高': 'high',
+    '最低': 'low',
+    '收盘': 'close',
+    '成交量': 'volume'
+}
+
+
+def _symbol_seed(symbol: str) -> int:
+    """
+    由股票代码得到固定的随机种子（内置hash()在每次运行时随机化，不能用于复现）
+
+    Args:
+        symbol: 股票代码
+
+    Returns:
+        32位无符号整数种子
+    """
+    return int.from_bytes(hashlib.blake2s(symbol.encode(), digest_size=4).digest(), 'little')
+
+
+class RateLimiter:
+    """
+    令牌桶请求限速器，多个线程共享
+    令牌按每min_interval秒一个的速度补充，最多积攒burst个：空闲后可立即连续发起burst个请求，
+    长期平均频率不超过1/min_interval，请求自身耗时也计入间隔
+    """
+
+    def __init__(self, min_interval: float = DOWNLOAD_MIN_INTERVAL, burst: int = DOWNLOAD_BURST):
+        """
+        初始化限速器
+
+        Args:
+            min_interval: 平均每次请求的间隔（秒）
+            burst: 桶容量，即允许连续发起的请求数
+        """
+        self.min_interval = min_interval
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        """取一个令牌，桶空时阻塞到下一个令牌补充"""
+        with self._lock:
+            now = time.monotonic()
+            # 空闲期间积攒的令牌不超过桶容量
+            start_at = max(self._next_slot, now - (self.burst - 1) * self.min_interval)
+            self._next_slot = start_at + self.min_interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
 
 class RealDataFetcher:
     """真实数据获取器"""
@@ -44,29 +120,41 @@ class RealDataFetcher:
         logger.info(f"设置股票池: {stock_pool}")
 
     def refresh_historical_data(self, days: int = 100):
-        """刷新历史数据"""
+        """
+        刷新历史数据
+        各股票在线程池中并发获取（请求频率由限速器控制），获取完成的数据在当前线程依次写入数据库
+
+        Args:
+            days: 刷新天数
+        """
         logger.info(f"开始刷新 {days} 天历史数据...")
 
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
+        limiter = RateLimiter()
+
+        def fetch(symbol):
+            if AKSHARE_AVAILABLE:
+                # 使用AKShare获取真实数据
+                limiter.wait()
+                return self._fetch_real_data(symbol, start_date, end_date)
+            # 生成模拟数据
+            return self._generate_mock_data(symbol, start_date, end_date)
 
-        for symbol in self.stock_pool:
-            try:
-                if AKSHARE_AVAILABLE:
-                    # 使用AKShare获取真实数据
-                    data = self._fetch_real_data(symbol, start_date, end_date)
-                else:
-                    # 生成模拟数据
-                    data = self._generate_mock_data(symbol, start_date, end_date)
-
-                if not data.empty:
-                    # 保存到数据库
-
-                    self.db_manager.save_stock_data(symbol, data)
-                    logger.info(f"已更新 {symbol} 的 {len(data)} 条历史数据")
+        workers = max(1, min(DOWNLOAD_WORKERS, len(self.stock_pool)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch, symbol): symbol for symbol in self.stock_pool}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    data = future.result()
+                    if not data.empty:
+                        # 保存到数据库
+                        self.db_manager.save_stock_data(symbol, data)
+                        logger.info(f"已更新 {symbol} 的 {len(data)} 条历史数据")
 
-            except Exception as e:
-                logger.error(f"更新 {symbol} 历史数据失败: {e}")
+                except Exception as e:
+                    logger.error(f"更新 {symbol} 历史数据失败: {e}")
 
         logger.info("历史数据刷新完成")
 
@@ -94,14 +182,7 @@ class RealDataFetcher:
                 return pd.DataFrame()
 
             # 重命名列
-            data = data.rename(columns={
-                '日期': 'date',
-                '开盘': 'open',
-                '最高': 'high',
-                '最低': 'low',
-                '收盘': 'close',
-                '成交量': 'volume'
-            })
+            data.rename(columns=AKSHARE_COLUMN_MAPPING, inplace=True)
 
             # 确保数据类型正确
             data['date'] = pd.to_datetime(data['date'])
@@ -112,7 +193,7 @@ class RealDataFetcher:
             # 设置日期为索引
             data.set_index('date', inplace=True)
 
-            return data[['open', 'high', 'low', 'close', 'volume']]
+            return normalize_stock_data(data[['open', 'high', 'low', 'close', 'volume']])
 
         except Exception as e:
             logger.error(f"获取 {symbol} 真实数据失败: {e}")
@@ -120,30 +201,29 @@ class RealDataFetcher:
 
     def _generate_mock_data(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """生成模拟数据"""
-        date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-        # 过滤掉周末
-        date_range = [d for d in date_range if d.weekday() < 5]
+        # 工作日序列（不含周末）
+        date_range = pd.bdate_range(start=start_date, end=end_date)
+        n = len(date_range)
         
         # 生成模拟价格数据
-        np.random.seed(hash(symbol) % 2**32)  # 基于股票代码生成固定随机种子
-        base_price = 10 + (hash(symbol) % 100)  # 基础价格
+        # 基于股票代码生成固定随机种子，使用独立的随机数生成器以便多线程并发生成
+        seed = _symbol_seed(symbol)
+        rng = np.random.default_rng(seed)
+        base_price = 10 + (seed % 100)  # 基础价格
         
-        prices = []
-        current_price = base_price
-        
-        for _ in date_range:
-            # 模拟价格波动
-            change = np.random.normal(0, 0.02)  # 2%的日波动
-            current_price *= (1 + change)
-            prices.append(current_price)
+        # 模拟价格波动（2%的日波动），按日累乘得到价格序列
+        changes = rng.normal(0, 0.02, n)
+        prices = np.cumprod(np.concatenate(([base_price], 1 + changes)))[1:]
         
         data = pd.DataFrame({
-            'open': [p * (1 + np.random.normal(0, 0.005)) for p in prices],
-            'high': [p * (1 + abs(np.random.normal(0, 0.01))) for p in prices],
-            'low': [p * (1 - abs(np.random.normal(0, 0.01))) for p in prices],
+            'open': prices * (1 + rng.normal(0, 0.005, n)),
+            'high': prices * (1 + np.abs(rng.normal(0, 0.01, n))),
+            'low': prices * (1 - np.abs(rng.normal(0, 0.01, n))),
             'close': prices,
-            'volume': [np.random.randint(1000000, 10000000) for _ in prices]
+            'volume': rng.integers(1000000, 10000000, n)
         }, index=date_range)
+        # 标记为模拟数据，不写入指标缓存
+        data.attrs['mock'] = True
         
         return data
 
@@ -176,11 +256,16 @@ class RealDataFetcher:
 
     def _update_current_prices(self):
         """更新当前价格"""
+        if AKSHARE_AVAILABLE:
+            # 全市场实时行情一次获取，所有股票共用
+            prices = self._fetch_current_prices(self.stock_pool)
+        else:
+            prices = {}
+
         for symbol in self.stock_pool:
             try:
                 if AKSHARE_AVAILABLE:
-                    # 获取实时价格
-                    price = self._fetch_current_price(symbol)
+                    price = prices.get(symbol, 0.0)
                 else:
                     # 生成模拟价格
                     price = self._generate_mock_price(symbol)
@@ -191,21 +276,31 @@ class RealDataFetcher:
             except Exception as e:
                 logger.error(f"更新 {symbol} 当前价格失败: {e}")
 
-    def _fetch_current_price(self, symbol: str) -> float:
-        """获取当前价格"""
+    def _fetch_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        批量获取当前价格
+        stock_zh_a_spot_em每次返回全市场行情，只请求一次再按代码查找
+
+        Args:
+            symbols: 股票代码列表
+
+        Returns:
+            {股票代码: 最新价}，未找到的股票不包含在内
+        """
         try:
             # 获取实时行情
             data = ak.stock_zh_a_spot_em()
-            stock_data = data[data['代码'] == symbol]
-
-            if not stock_data.empty:
-                return float(stock_data.iloc[0]['最新价'])
-
-            return 0.0
+            latest = data.drop_duplicates('代码').set_index('代码')['最新价']
+            latest = pd.to_numeric(latest.reindex(symbols), errors='coerce').dropna()
+            return {symbol: float(price) for symbol, price in latest.items()}
 
         except Exception as e:
-            logger.error(f"获取 {symbol} 实时价格失败: {e}")
-            return 0.0
+            logger.error(f"获取实时价格失败: {e}")
+            return {}
+
+    def _fetch_current_price(self, symbol: str) -> float:
+        """获取当前价格"""
+        return self._fetch_current_prices([symbol]).get(symbol, 0.0)
 
     def _generate_mock_price(self, symbol: str) -> float:
         """生成模拟当前价格"""
@@ -213,13 +308,13 @@ class RealDataFetcher:
         historical_data = self.db_manager.get_stock_data(symbol, limit=1)
 
         if not historical_data.empty:
-            last_price = historical_data.iloc[-1]['close']
+            last_price = float(historical_data['close'].iloc[-1])
             # 添加随机波动
             change = np.random.normal(0, 0.005)
             return round(last_price * (1 + change), 2)
 
         # 如果没有历史数据，返回随机价格
-        return round(10 + (hash(symbol) % 50), 2)
+        return round(10 + (_symbol_seed(symbol) % 50), 2)
 
     def get_current_prices(self) -> Dict[str, float]:
         """获取当前价格字典"""
@@ -275,14 +370,7 @@ class RealDataFetcher:
                     
                     if data is not None and len(data) > 0:
                         # 数据预处理
-                        data = data.rename(columns={
-                            '日期': 'date',
-                            '开盘': 'open', 
-                            '收盘': 'close',
-                            '最高': 'high',
-                            '最低': 'low',
-                            '成交量': 'volume'
-                        })
+                        data.rename(columns=AKSHARE_COLUMN_MAPPING, inplace=True)
                         data['date'] = pd.to_datetime(data['date'])
                         data = data.set_index('date')
                         return data
@@ -300,6 +388,141 @@ class RealDataFetcher:
             logger.error(f"获取{symbol}数据时发生错误: {e}")
             return self._generate_mock_data(symbol, start_date, end_date)
     
+    def get_multiple_stock_data(self, symbols: List[str], start_date, end_date,
+                                max_workers: int = DOWNLOAD_WORKERS,
+                                min_interval: float = DOWNLOAD_MIN_INTERVAL,
+                                postprocess: Optional[Callable[[str, pd.DataFrame], pd.DataFrame]] = None
+                                ) -> Dict[str, pd.DataFrame]:
+        """
+        并发获取多只股票数据
+        网络请求在线程池中并发执行，请求发起时间按min_interval错开以限制频率
+
+        Args:
+            symbols: 股票代码列表
+            start_date: 开始日期
+            end_date: 结束日期
+            max_workers: 线程数
+            min_interval: 相邻两次请求的最小间隔（秒）
+            postprocess: 下载完成后在同一工作线程中对数据的处理函数(symbol, data) -> data，
+                与其他股票的网络等待重叠执行
+
+        Returns:
+            {股票代码: 数据DataFrame}，按symbols顺序排列，获取失败的股票不包含在内
+        """
+        limiter = RateLimiter(min_interval)
+
+        def fetch(symbol):
+            limiter.wait()
+            data = self.get_stock_data(symbol, start_date, end_date)
+            return postprocess(symbol, data) if postprocess is not None else data
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as executor:
+            futures = {executor.submit(fetch, symbol): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    logger.error(f"获取{symbol}数据失败: {e}")
+
+        return {symbol: results[symbol] for symbol in symbols if symbol in results}
+
+    def get_multiple_indicator_data(self, symbols: List[str], start_date: str,
+                                    end_date: str, min_bars: int = 0) -> Dict[str, pd.DataFrame]:
+        """
+        获取多只股票数据并计算技术指标
+        缓存有效的股票直接读取Parquet缓存，其余并发下载后计算指标并写入缓存
+
+        Args:
+            symbols: 股票代码列表
+            start_date: 开始日期
+            end_date: 结束日期
+            min_bars: 最少交易日数，不足的股票不计算指标、不写缓存，返回空DataFrame
+
+        Returns:
+            {股票代码: 含技术指标的DataFrame}，按symbols顺序排列，获取失败的股票不包含在内
+        """
+        results = {}
+        missing = []
+        for symbol in symbols:
+            cached = self._load_indicator_cache(symbol, start_date, end_date)
+            if cached is not None:
+                results[symbol] = cached if len(cached) >= min_bars else pd.DataFrame()
+            else:
+                missing.append(symbol)
+
+        if len(missing) < len(symbols):
+            logger.info(f"{len(symbols) - len(missing)}只股票使用指标缓存")
+
+        def add_indicators(symbol, data):
+            if len(data) < min_bars:
+                return pd.DataFrame()
+
+            # 在下载线程中计算指标并写缓存，指标内核释放GIL，与其他股票的下载并行
+            data = self.calculate_technical_indicators(data)
+            self._save_indicator_cache(symbol, start_date, end_date, data)
+            return data
+
+        if missing:
+            results.update(self.get_multiple_stock_data(missing, start_date, end_date,
+                                                        postprocess=add_indicators))
+
+        return {symbol: results[symbol] for symbol in symbols if symbol in results}
+
+    def _indicator_cache_path(self, symbol: str, start_date: str, end_date: str) -> str:
+        """获取指标缓存文件路径"""
+        return os.path.join(INDICATOR_CACHE_DIR, f"{symbol}_{start_date}_{end_date}.parquet")
+
+    def _load_indicator_cache(self, symbol: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """
+        读取有效期内的指标缓存
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            缓存的DataFrame，无缓存、已过期或读取失败时返回None
+        """
+        if not PYARROW_AVAILABLE:
+            return None
+
+        path = self._indicator_cache_path(symbol, start_date, end_date)
+        try:
+            if time.time() - os.path.getmtime(path) > INDICATOR_CACHE_TTL:
+                return None
+            return pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取{symbol}指标缓存失败: {e}")
+            return None
+
+    def _save_indicator_cache(self, symbol: str, start_date: str, end_date: str, data: pd.DataFrame):
+        """
+        写入指标缓存（空数据和模拟数据不缓存）
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            data: 含技术指标的DataFrame
+        """
+        if not PYARROW_AVAILABLE or data.empty or data.attrs.get('mock'):
+            return
+
+        path = self._indicator_cache_path(symbol, start_date, end_date)
+        try:
+            os.makedirs(INDICATOR_CACHE_DIR, exist_ok=True)
+            # 先写临时文件再替换，避免并发读取到写了一半的文件
+            tmp_path = f"{path}.tmp"
+            data.to_parquet(tmp_path, compression='zstd')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"写入{symbol}指标缓存失败: {e}")
+
     def calculate_technical_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         计算技术指标
@@ -316,39 +539,8 @@ class RealDataFetcher:
             
             data = data.copy()
             
-            # 移动平均线
-            data['ma5'] = data['close'].rolling(window=5).mean()
-            data['ma10'] = data['close'].rolling(window=10).mean()
-            data['ma20'] = data['close'].rolling(window=20).mean()
-            data['ma60'] = data['close'].rolling(window=60).mean()
-            
-            # RSI
-            delta = data['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            data['rsi'] = 100 - (100 / (1 + rs))
-            
-            # MACD
-            exp1 = data['close'].ewm(span=12).mean()
-            exp2 = data['close'].ewm(span=26).mean()
-            data['macd'] = exp1 - exp2
-            data['macd_signal'] = data['macd'].ewm(span=9).mean()
-            data['macd_hist'] = data['macd'] - data['macd_signal']
-            
-            # 布林带
-            data['bb_middle'] = data['close'].rolling(window=20).mean()
-            bb_std = data['close'].rolling(window=20).std()
-            data['bb_upper'] = data['bb_middle'] + (bb_std * 2)
-            data['bb_lower'] = data['bb_middle'] - (bb_std * 2)
-            
-            # KDJ
-            low_min = data['low'].rolling(window=9).min()
-            high_max = data['high'].rolling(window=9).max()
-            rsv = (data['close'] - low_min) / (high_max - low_min) * 100
-            data['k'] = rsv.ewm(com=2).mean()
-            data['d'] = data['k'].ewm(com=2).mean()
-            data['j'] = 3 * data['k'] - 2 * data['d']
+            # 均线、RSI、MACD、布林带、KDJ
+            add_technical_indicators(data)
             
             return data
             
@@ -381,16 +573,7 @@ class RealDataFetcher:
             if data.empty:
                 return pd.DataFrame()
             
-            # 重命名列
-            data = data.rename(columns={
-                'date': 'date',
-                'open': 'open',
-                'high': 'high',
-                'low': 'low',
-                'close': 'close',
-                'volume': 'volume'
-            })
-            
+            # 指数数据列名已是英文，无需重命名
             # 确保数据类型正确
             data['date'] = pd.to_datetime(data['date'])
             data.set_index('date', inplace=True)
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+技术指标计算内核
+策略逐日计算中的热点循环（均线交叉、RSI、MACD），
+安装numba时JIT编译为机器码（释放GIL，可在多线程中并行执行），未安装时按普通Python函数执行
+"""
+
+import numpy as np
+from loguru import logger
+
+from utils.jit import njit, NUMBA_AVAILABLE
+
+
+@njit(cache=True, nogil=True)
+def rolling_mean(prices, window):
+    """
+    简单移动平均，前window-1个值为NaN，窗口内含NaN时为NaN（与pandas rolling(window).mean()一致）
+    滚动和只累加有效值并单独统计窗口内的NaN个数，缺失值移出窗口后即恢复
+
+    Args:
+        prices: 价格序列(float64)
+        window: 窗口长度
+
+    Returns:
+        移动平均序列
+    """
+    n = prices.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    missing = 0
+    for i in range(n):
+        x = prices[i]
+        if np.isfinite(x):
+            total += x
+        else:
+            missing += 1
+        if i >= window:
+            old = prices[i - window]
+            if np.isfinite(old):
+                total -= old
+            else:
+                missing -= 1
+        if i >= window - 1 and missing == 0:
+            out[i] = total / window
+    return out
+
+
+@njit(cache=True, nogil=True)
+def moving_averages(prices, windows):
+    """
+    一次遍历同时计算多个周期的简单移动平均，NaN的处理与rolling_mean一致
+
+    Args:
+        prices: 价格序列(float64)
+        windows: 窗口长度数组(int64)
+
+    Returns:
+        二维数组，第k列为windows[k]周期的移动平均
+    """
+    n = prices.shape[0]
+    m = windows.shape[0]
+    out = np.full((n, m), np.nan)
+    totals = np.zeros(m)
+    missing = np.zeros(m, dtype=np.int64)
+    for i in range(n):
+        x = prices[i]
+        valid = np.isfinite(x)
+        for k in range(m):
+            window = windows[k]
+            if valid:
+                totals[k] += x
+            else:
+                missing[k] += 1
+            if i >= window:
+                old = prices[i - window]
+                if np.isfinite(old):
+                    totals[k] -= old
+                else:
+                    missing[k] -= 1
+            if i >= window - 1 and missing[k] == 0:
+                out[i, k] = totals[k] / window
+    return out
+
+
+@njit(cache=True, nogil=True)
+def bollinger(prices, window, num_std):
+    """
+    布林带，中轨为简单移动平均，标准差为样本标准差（与pandas rolling(window).std()一致）
+
+    Args:
+        prices: 价格序列(float64)
+        window: 窗口长度
+        num_std: 上下轨的标准差倍数
+
+    Returns:
+        (中轨, 上轨, 下轨)
+    """
+    n = prices.shape[0]
+    middle = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        # 两遍法计算窗口方差，避免累计平方和的精度损失
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += prices[j]
+        mean = total / window
+        sq = 0.0
+        for j in range(i - window + 1, i + 1):
+            sq += (prices[j] - mean) ** 2
+        std = np.sqrt(sq / (window - 1))
+        middle[i] = mean
+        upper[i] = mean + std * num_std
+        lower[i] = mean - std * num_std
+    return middle, upper, lower
+
+
+@njit(cache=True, nogil=True)
+def ema(prices, span):
+    """
+    指数移动平均（与pandas ewm(span=span).mean()即adjust=True一致）
+    NaN不参与计算但计入衰减，首个有效值之前输出NaN，之后保持上一个均值
+
+    Args:
+        prices: 价格序列(float64)
+        span: 平滑周期
+
+    Returns:
+        EMA序列
+    """
+    n = prices.shape[0]
+    out = np.empty(n)
+    decay = 1.0 - 2.0 / (span + 1.0)
+    num = 0.0
+    den = 0.0
+    for i in range(n):
+        x = prices[i]
+        if np.isnan(x):
+            num = decay * num
+            den = decay * den
+        else:
+            num = x + decay * num
+            den = 1.0 + decay * den
+        out[i] = num / den if den > 0.0 else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def kdj(high, low, close, window, com):
+    """
+    KDJ指标，RSV取window日最高/最低价，K、D为com平滑（与pandas ewm(com=com).mean()一致）
+
+    Args:
+        high: 最高价序列(float64)
+        low: 最低价序列(float64)
+        close: 收盘价序列(float64)
+        window: RSV周期
+        com: 平滑系数
+
+    Returns:
+        (K, D, J)，窗口内最高价等于最低价时RSV为NaN（与pandas的0/0一致）
+    """
+    n = close.shape[0]
+    rsv = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        low_min = low[i]
+        high_max = high[i]
+        for j in range(i - window + 1, i):
+            if low[j] < low_min:
+                low_min = low[j]
+            if high[j] > high_max:
+                high_max = high[j]
+        if high_max > low_min:
+            rsv[i] = (close[i] - low_min) / (high_max - low_min) * 100
+    span = 2.0 * com + 1.0
+    k = ema(rsv, span)
+    d = ema(k, span)
+    return k, d, 3 * k - 2 * d
+
+
+@njit(cache=True, nogil=True)
+def double_ma_signal(prices, short_window, long_window):
+    """
+    双均线交叉信号
+
+    Args:
+        prices: 收盘价序列(float64)
+        short_window: 短期均线周期
+        long_window: 长期均线周期
+
+    Returns:
+        (短期均线, 长期均线, 信号)，信号1为金叉、-1为死叉、0为无信号
+    """
+    ma_short = rolling_mean(prices, short_window)
+    ma_long = rolling_mean(prices, long_window)
+    n = prices.shape[0]
+    signals = np.zeros(n, dtype=np.int8)
+    for i in range(long_window, n):
+        prev_short = ma_short[i - 1]
+        prev_long = ma_long[i - 1]
+        cur_short = ma_short[i]
+        cur_long = ma_long[i]
+        if prev_short <= prev_long and cur_short > cur_long:
+            signals[i] = 1
+        elif prev_short >= prev_long and cur_short < cur_long:
+            signals[i] = -1
+    return ma_short, ma_long, signals
+
+
+# MACD信号类型：0为无信号，其余依次为金叉、死叉、顶背离、底背离、上穿零轴、下穿零轴
+MACD_GOLDEN_CROSS = 1
+MACD_DEAD_CROSS = 2
+MACD_TOP_DIVERGENCE = 3
+MACD_BOTTOM_DIVERGENCE = 4
+MACD_ZERO_CROSS_UP = 5
+MACD_ZERO_CROSS_DOWN = 6
+
+
+@njit(cache=True, nogil=True)
+def macd_signal(prices, macd_line, signal_line, histogram):
+    """
+    MACD交易信号：零轴下方金叉/零轴上方死叉、近5日价格与柱状图背离、零轴穿越，依次判断
+
+    Args:
+        prices: 收盘价序列(float64)
+        macd_line: MACD线
+        signal_line: 信号线
+        histogram: 柱状图
+
+    Returns:
+        (信号类型(int8，见MACD_*常量), 信号强度)
+    """
+    n = prices.shape[0]
+    kinds = np.zeros(n, dtype=np.int8)
+    strength = np.zeros(n)
+    for i in range(1, n):
+        cur_macd = macd_line[i]
+        cur_signal = signal_line[i]
+        cur_hist = histogram[i]
+        prev_macd = macd_line[i - 1]
+        prev_signal = signal_line[i - 1]
+
+        kind = 0
+        value = 0.0
+        # 零轴下方的金叉、零轴上方的死叉更可靠
+        if prev_macd <= prev_signal and cur_macd > cur_signal and cur_macd < 0:
+            kind = MACD_GOLDEN_CROSS
+            value = min(abs(cur_macd - cur_signal) / abs(cur_macd) * 2, 1.0)
+        elif prev_macd >= prev_signal and cur_macd < cur_signal and cur_macd > 0:
+            kind = MACD_DEAD_CROSS
+            value = min(abs(cur_macd - cur_signal) / abs(cur_macd) * 2, 1.0)
+        elif i >= 5:
+            recent_prices = prices[i - 4:i + 1]
+            recent_hist = histogram[i - 4:i + 1]
+            # 价格创近期新高但柱状图未创新高为顶背离，反之为底背离
+            if (prices[i] == np.nanmax(recent_prices) and
+                    cur_hist < np.nanmax(recent_hist) and cur_hist < 0):
+                kind = MACD_TOP_DIVERGENCE
+                value = 0.6
+            elif (prices[i] == np.nanmin(recent_prices) and
+                  cur_hist > np.nanmin(recent_hist) and cur_hist > 0):
+                kind = MACD_BOTTOM_DIVERGENCE
+                value = 0.6
+
+        if kind == 0:
+            if prev_macd <= 0 and cur_macd > 0:
+                kind = MACD_ZERO_CROSS_UP
+                value = 0.5
+            elif prev_macd >= 0 and cur_macd < 0:
+                kind = MACD_ZERO_CROSS_DOWN
+                value = 0.5
+
+        if kind != 0 and value > 0:
+            kinds[i] = kind
+            strength[i] = value
+    return kinds, strength
+
+
+@njit(cache=True, nogil=True)
+def rsi(prices, period):
+    """
+    RSI指标，涨跌幅取period日简单平均（与策略原pandas实现一致）
+    与价格缺失相邻的涨跌幅按0计（即pandas中delta.where(delta > 0, 0)的结果），不影响之后的窗口
+
+    Args:
+        prices: 收盘价序列(float64)
+        period: RSI周期
+
+    Returns:
+        RSI序列，前period-1个值为NaN
+    """
+    n = prices.shape[0]
+    out = np.full(n, np.nan)
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for i in range(1, n):
+        delta = prices[i] - prices[i - 1]
+        if delta > 0:
+            gain_sum += delta
+        elif delta < 0:
+            loss_sum -= delta
+        if i > period:
+            old = prices[i - period] - prices[i - period - 1]
+            if old > 0:
+                gain_sum -= old
+            elif old < 0:
+                loss_sum += old
+        if i >= period - 1:
+            if loss_sum == 0.0:
+                out[i] = 100.0 if gain_sum > 0.0 else np.nan
+            else:
+                out[i] = 100.0 - 100.0 / (1.0 + gain_sum / loss_sum)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def macd(prices, fast, slow, signal):
+    """
+    MACD指标
+
+    Args:
+        prices: 收盘价序列(float64)
+        fast: 快线周期
+        slow: 慢线周期
+        signal: 信号线周期
+
+    Returns:
+        (MACD线, 信号线, 柱状图)
+    """
+    macd_line = ema(prices, fast) - ema(prices, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+# 基础指标的均线周期
+MA_WINDOWS = np.array([5, 10, 20, 60], dtype=np.int64)
+
+# 指标列名，顺序与basic_indicators/all_indicators输出的列一致
+BASIC_INDICATOR_COLUMNS = ('ma5', 'ma10', 'ma20', 'ma60', 'rsi', 'macd', 'macd_signal', 'macd_hist')
+TECHNICAL_INDICATOR_COLUMNS = BASIC_INDICATOR_COLUMNS + (
+    'bb_middle', 'bb_upper', 'bb_lower', 'k', 'd', 'j'
+)
+
+
+# 每只股票的行情列布局固定，指标内核按float64一维数组显式声明签名，
+# 导入时即编译（cache=True时直接加载磁盘缓存），一次调用算出全部指标列
+@njit('float64[:, :](float64[:])', cache=True, nogil=True)
+def basic_indicators(close):
+    """
+    计算基础指标：ma5/ma10/ma20/ma60、rsi(14)、macd(12,26,9)
+
+    Args:
+        close: 收盘价序列(float64)
+
+    Returns:
+        二维数组，各列依次对应BASIC_INDICATOR_COLUMNS
+    """
+    n = close.shape[0]
+    out = np.empty((n, 8))
+    out[:, 0:4] = moving_averages(close, MA_WINDOWS)
+    out[:, 4] = rsi(close, 14)
+    macd_line, signal_line, histogram = macd(close, 12, 26, 9)
+    out[:, 5] = macd_line
+    out[:, 6] = signal_line
+    out[:, 7] = histogram
+    return out
+
+
+@njit('float64[:, :](float64[:], float64[:], float64[:])', cache=True, nogil=True)
+def all_indicators(high, low, close):
+    """
+    计算基础指标及布林带(20, 2)、KDJ(9, 2)
+
+    Args:
+        high: 最高价序列(float64)
+        low: 最低价序列(float64)
+        close: 收盘价序列(float64)
+
+    Returns:
+        二维数组，各列依次对应TECHNICAL_INDICATOR_COLUMNS
+    """
+    n = close.shape[0]
+    out = np.empty((n, 14))
+    out[:, 0:8] = basic_indicators(close)
+    middle, upper, lower = bollinger(close, 20, 2.0)
+    out[:, 8] = middle
+    out[:, 9] = upper
+    out[:, 10] = lower
+    k, d, j = kdj(high, low, close, 9, 2.0)
+    out[:, 11] = k
+    out[:, 12] = d
+    out[:, 13] = j
+    return out
+
+
+def add_basic_indicators(data):
+    """
+    为行情数据添加基础技术指标列：ma5/ma10/ma20/ma60、rsi(14)、macd(12,26,9)
+    回测引擎与数据获取器共用此实现
+
+    Args:
+        data: 含close列的股票数据DataFrame（原地添加列）
+
+    Returns:
+        添加指标列后的DataFrame
+    """
+    values = basic_indicators(data['close'].to_numpy(dtype=np.float64))
+    for k, column in enumerate(BASIC_INDICATOR_COLUMNS):
+        data[column] = values[:, k]
+    return data
+
+
+def add_technical_indicators(data):
+    """
+    在基础指标之外再添加布林带(bb_middle/bb_upper/bb_lower)和KDJ(k/d/j)列
+
+    Args:
+        data: 含high、low、close列的股票数据DataFrame（原地添加列）
+
+    Returns:
+        添加指标列后的DataFrame
+    """
+    values = all_indicators(
+        data['high'].to_numpy(dtype=np.float64),
+        data['low'].to_numpy(dtype=np.float64),
+        data['close'].to_numpy(dtype=np.float64)
+    )
+    for k, column in enumerate(TECHNICAL_INDICATOR_COLUMNS):
+        data[column] = values[:, k]
+    return data
+
+
+def warm_up():
+    """
+    预先编译各指标内核，避免首次调用时的编译延迟
+    （cache=True时编译结果写入磁盘缓存，后续进程直接加载）
+    """
+    if not NUMBA_AVAILABLE:
+        return
+
+    dummy = np.zeros(30, dtype=np.float64)
+    double_ma_signal(dummy, 5, 20)
+    rsi(dummy, 14)
+    macd(dummy, 12, 26, 9)
+    macd_signal(dummy, dummy, dummy, dummy)
+    moving_averages(dummy, MA_WINDOWS)
+    bollinger(dummy, 20, 2.0)
+    kdj(dummy, dummy, dummy, 9, 2.0)
+    logger.info("技术指标内核预编译完成")
@@ -7,55 +7,143 @@ Stone量化交易系统 - Web界面
 import os
 import sys
 import json
-import pandas as pd
+import hashlib
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import threading
-import time
-from flask import Flask, render_template, jsonify, request, send_file
+from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from flask import Flask, Response, render_template, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO, emit
-import plotly.graph_objs as go
+from flask_caching import Cache
 import plotly.utils
 from loguru import logger
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson未安装，将使用标准库json序列化接口数据")
+
 # 添加项目根目录到Python路径
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-# 导入项目模块
-from data.database import DatabaseManager
-from utils.real_data_fetcher import RealDataFetcher
+# 项目模块（交易系统、数据库、技术指标内核等）均在首次使用时再导入，见WebTradingSystem
 
-# 修复导入问题 - 使用相对导入
-try:
-    from examples.real_time.real_time_trading import RealTimeTradingSystem
-except ImportError:
-    # 如果导入失败，创建一个简化版本
-    class RealTimeTradingSystem:
-        def __init__(self):
-            self.config = {
-                'stock_pool': [
-                    "002415", "300059", "300124", "002230", "002594", "300750",
-                    "002475", "300274", "300496", "300433", "002252", "300144",
-                    "000063", "000568", "002352", "000725", "300015", "300142",
-                    "002241", "000538", "000001", "600036", "600000", "601318"
-                ],
-                'strategies': {
-                    "布林带策略": {"enabled": True, "weight": 0.25},
-                    "优化双均线策略": {"enabled": True, "weight": 0.25},
-                    "快速MACD策略": {"enabled": True, "weight": 0.25},
-                    "KDJ策略": {"enabled": True, "weight": 0.25}
-                }
+
+def _warm_up_indicators():
+    """在后台任务中导入并预编译技术指标内核，Web服务导入时不加载numba"""
+    from utils.technical_indicators import warm_up
+    warm_up()
+
+
+class SimpleTradingSystem:
+    """实时交易系统无法导入时使用的简化版本"""
+    
+    def __init__(self):
+        self.config = {
+            'stock_pool': [
+                "002415", "300059", "300124", "002230", "002594", "300750",
+                "002475", "300274", "300496", "300433", "002252", "300144",
+                "000063", "000568", "002352", "000725", "300015", "300142",
+                "002241", "000538", "000001", "600036", "600000", "601318"
+            ],
+            'strategies': {
+                "布林带策略": {"enabled": True, "weight": 0.25},
+                "优化双均线策略": {"enabled": True, "weight": 0.25},
+                "快速MACD策略": {"enabled": True, "weight": 0.25},
+                "KDJ策略": {"enabled": True, "weight": 0.25}
             }
+        }
+    
+    def run_once(self):
+        pass
+
+
+def _load_trading_system():
+    """
+    导入并创建实时交易系统（会加载策略、回测引擎等模块，耗时较长）
+    
+    Returns:
+        (交易系统实例, 子进程执行函数)，导入失败时返回简化版本和None
+    """
+    try:
+        from examples.real_time.real_time_trading import RealTimeTradingSystem, run_once_standalone
+    except ImportError:
+        return SimpleTradingSystem(), None
+    return RealTimeTradingSystem(), run_once_standalone
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    将数据序列化为UTF-8编码的JSON字节，优先使用orjson
+    
+    Args:
+        obj: 待序列化数据
+        sort_keys: 是否按键排序（用于内容摘要比较）
         
-        def run_once(self):
-            pass
+    Returns:
+        JSON字节串
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, sort_keys=sort_keys, default=str).encode('utf-8')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """基于orjson的Flask JSON序列化，jsonify等接口响应均经由此处"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(
+            obj, default=self.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'stone_trading_system_2024'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# 接口缓存，TTL与监控循环的更新周期一致；多进程部署时可切换为RedisCache
+cache = Cache(app, config={
+    'CACHE_TYPE': os.environ.get('STONE_CACHE_TYPE', 'SimpleCache'),
+    'CACHE_REDIS_URL': os.environ.get('STONE_CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+    'CACHE_DEFAULT_TIMEOUT': 30
+})
+
+# 页面展示用的静态内容，模块加载时构建一次
+STRATEGY_NAMES = ('布林带策略', '优化双均线策略', '快速MACD策略', 'KDJ策略')
+STRATEGY_COLORS = ('#ff7f0e', '#2ca02c', '#d62728', '#9467bd')
+
+PORTFOLIO_CHART_LAYOUT = {
+    'title': '资产价值曲线',
+    'xaxis': {'title': '日期'},
+    'yaxis': {'title': '资产价值 (元)'},
+    'height': 400
+}
+SIGNAL_CHART_LAYOUT = {
+    'title': '策略信号分布',
+    'xaxis': {'title': '策略'},
+    'yaxis': {'title': '信号数量'},
+    'height': 400
+}
+POSITION_CHART_LAYOUT = {
+    'title': '持仓分布',
+    'height': 400
+}
+EMPTY_POSITION_CHART = {'data': [], 'layout': {'title': '暂无持仓'}}
+
 # 全局变量
 trading_system = None
 current_data = {
@@ -76,11 +164,23 @@ class WebTradingSystem:
     
     def __init__(self):
         """初始化"""
-        self.trading_system = RealTimeTradingSystem()
-        self.db_manager = DatabaseManager()
-        self.data_fetcher = RealDataFetcher(self.db_manager)
+        # 交易系统、数据库和数据获取器在首次使用时创建，Web服务可以立即启动
+        self._trading_system = None
+        self._run_once_standalone = None
+        self._db_manager = None
+        self._data_fetcher = None
         self.is_running = False
         self.update_thread = None
+        self._loop_generation = 0
+        self._strategy_pool = None
+        self.last_update_time = None
+        self.strategy_running = False
+        
+        # 各数据分区最近一次推送的内容摘要，用于增量推送
+        self._section_hashes = {}
+        
+        # 每次更新后预先编码的接口JSON快照，查询接口直接返回，无需逐请求序列化
+        self._snapshot = {}
         
         # 模拟持仓数据
         self.portfolio = {
@@ -94,29 +194,101 @@ class WebTradingSystem:
             }
         }
         
+        # 在后台预编译技术指标内核，避免首次执行策略时的编译延迟
+        socketio.start_background_task(_warm_up_indicators)
+        
         logger.info("Web交易系统初始化完成")
     
+    @property
+    def trading_system(self):
+        """实时交易系统（首次访问时导入并创建）"""
+        if self._trading_system is None:
+            self._trading_system, self._run_once_standalone = _load_trading_system()
+        return self._trading_system
+    
+    @property
+    def db_manager(self):
+        """数据库管理器（首次访问时创建）"""
+        if self._db_manager is None:
+            from data.database import DatabaseManager
+            self._db_manager = DatabaseManager()
+        return self._db_manager
+    
+    @property
+    def data_fetcher(self):
+        """数据获取器（首次访问时创建）"""
+        if self._data_fetcher is None:
+            from utils.real_data_fetcher import RealDataFetcher
+            self._data_fetcher = RealDataFetcher(self.db_manager)
+        return self._data_fetcher
+    
     def start_monitoring(self):
         """开始监控"""
         if self.is_running:
             return
         
         self.is_running = True
-        self.update_thread = threading.Thread(target=self._update_loop)
-        self.update_thread.daemon = True
-        self.update_thread.start()
+        self._loop_generation += 1
+        # 使用Socket.IO后台任务，在gevent/eventlet下为协程，休眠时让出事件循环
+        self.update_thread = socketio.start_background_task(self._update_loop, self._loop_generation)
         logger.info("开始实时监控")
     
     def stop_monitoring(self):
         """停止监控"""
+        # 不等待更新循环退出，循环在下次唤醒时检查状态自行结束
         self.is_running = False
-        if self.update_thread:
-            self.update_thread.join()
+        self.update_thread = None
         logger.info("停止实时监控")
     
-    def _update_loop(self):
-        """更新循环"""
-        while self.is_running:
+    def run_strategy_async(self) -> bool:
+        """
+        在后台任务中执行一次策略，请求线程立即返回
+        
+        Returns:
+            是否成功提交（已有策略在执行时返回False）
+        """
+        if self.strategy_running:
+            return False
+        
+        self.strategy_running = True
+        socketio.start_background_task(self._run_strategy_task)
+        return True
+    
+    def _run_strategy_task(self):
+        """后台策略任务，完成后通过Socket.IO通知前端"""
+        try:
+            trading_system = self.trading_system
+            if self._run_once_standalone is not None:
+                # 策略计算为CPU密集型，放到子进程执行，不占用Web进程的GIL
+                future = self._get_strategy_pool().submit(self._run_once_standalone, trading_system.config_file)
+                while not future.done():
+                    socketio.sleep(0.5)
+                future.result()
+            else:
+                trading_system.run_once()
+            # 策略执行会生成新的表现报表
+            cache.delete_memoized(_cached_strategy_performance)
+            socketio.emit('strategy_finished', {'status': 'success', 'message': '策略执行完成'})
+        except Exception as e:
+            logger.error(f"执行策略失败: {e}")
+            socketio.emit('strategy_finished', {'status': 'error', 'message': str(e)})
+        finally:
+            self.strategy_running = False
+    
+    def _get_strategy_pool(self) -> ProcessPoolExecutor:
+        """获取策略执行进程池（首次使用时创建）"""
+        if self._strategy_pool is None:
+            self._strategy_pool = ProcessPoolExecutor(max_workers=1)
+        return self._strategy_pool
+    
+    def _update_loop(self, generation: int):
+        """
+        更新循环
+        
+        Args:
+            generation: 启动时的循环代号，监控重启后旧循环据此退出
+        """
+        while self.is_running and generation == self._loop_generation:
             try:
                 # 更新股票价格
                 self._update_stock_prices()
@@ -126,61 +298,129 @@ class WebTradingSystem:
                 
                 # 更新持仓信息
                 self._update_portfolio()
+                self.last_update_time = datetime.now()
+                self._publish_snapshot()
                 
-                # 发送数据到前端
-                socketio.emit('data_update', {
+                # 只向前端推送内容有变化的分区
+                sections = self._changed_sections({
                     'portfolio': self.portfolio,
                     'stocks': current_data['stocks'],
-                    'signals': current_data['signals'][-20:],  # 最近20个信号
-                    'timestamp': datetime.now().isoformat()
+                    'signals': current_data['signals'][-20:]  # 最近20个信号
                 })
+                if sections:
+                    sections['timestamp'] = datetime.now().isoformat()
+                    socketio.emit('data_update', sections)
                 
-                time.sleep(30)  # 30秒更新一次
+                socketio.sleep(30)  # 30秒更新一次
                 
             except Exception as e:
                 logger.error(f"更新数据失败: {e}")
-                time.sleep(60)
+                socketio.sleep(60)
+    
+    def _publish_snapshot(self):
+        """将持仓、股票、信号数据编码为JSON字节，供查询接口直接返回"""
+        self._snapshot = {
+            'portfolio': dumps_bytes(self.portfolio),
+            'stocks': dumps_bytes(current_data['stocks']),
+            'signals': dumps_bytes(current_data['signals'][-50:])
+        }
+    
+    def snapshot_response(self, name: str, payload: Any) -> Response:
+        """
+        返回数据分区的JSON响应，优先使用本轮更新已编码的快照
+        
+        Args:
+            name: 分区名称
+            payload: 尚无快照时需即时序列化的数据
+            
+        Returns:
+            JSON响应
+        """
+        encoded = self._snapshot.get(name)
+        if encoded is None:
+            return jsonify(payload)
+        return Response(encoded, mimetype='application/json')
+    
+    def dashboard_response(self) -> Response:
+        """
+        一次返回持仓、股票、信号三个分区，替代前端的三次请求
+        已有快照时直接拼接各分区的JSON字节，不再重新序列化
+        
+        Returns:
+            JSON响应
+        """
+        snapshot = self._snapshot
+        if not snapshot:
+            return jsonify({
+                'portfolio': self.portfolio,
+                'stocks': current_data['stocks'],
+                'signals': current_data['signals'][-50:]
+            })
+        body = b''.join([
+            b'{"portfolio":', snapshot['portfolio'],
+            b',"stocks":', snapshot['stocks'],
+            b',"signals":', snapshot['signals'], b'}'
+        ])
+        return Response(body, mimetype='application/json')
+    
+    def _changed_sections(self, sections: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        筛选出内容有变化的数据分区
+        
+        Args:
+            sections: 分区名称到分区数据的映射
+            
+        Returns:
+            自上次推送以来内容发生变化的分区
+        """
+        changed = {}
+        for name, payload in sections.items():
+            encoded = dumps_bytes(payload, sort_keys=True)
+            digest = hashlib.blake2b(encoded, digest_size=8).hexdigest()
+            if self._section_hashes.get(name) != digest:
+                self._section_hashes[name] = digest
+                changed[name] = payload
+        return changed
     
     def _update_stock_prices(self):
         """更新股票价格"""
         stock_pool = self.trading_system.config['stock_pool'][:20]  # 取前20只股票
         
-        for symbol in stock_pool:
-            try:
-                # 模拟实时价格（实际应该从API获取）
-                if symbol not in current_data['stocks']:
-                    current_data['stocks'][symbol] = {
-                        'price': np.random.uniform(20, 200),
-                        'change': 0,
-                        'change_pct': 0,
-                        'volume': np.random.randint(1000000, 10000000),
-                        'turnover_rate': np.random.uniform(1, 8)
-                    }
-                else:
-                    # 模拟价格变动
-                    old_price = current_data['stocks'][symbol]['price']
-                    change_pct = np.random.uniform(-0.03, 0.03)  # ±3%变动
-                    new_price = old_price * (1 + change_pct)
-                    
-                    current_data['stocks'][symbol].update({
-                        'price': round(new_price, 2),
-                        'change': round(new_price - old_price, 2),
-                        'change_pct': round(change_pct * 100, 2),
-                        'volume': np.random.randint(1000000, 10000000),
-                        'turnover_rate': np.random.uniform(1, 8)
-                    })
-                    
-            except Exception as e:
-                logger.error(f"更新股票{symbol}价格失败: {e}")
+        try:
+            # 模拟实时价格（实际应该从API获取），整个股票池按列一次性生成
+            n = len(stock_pool)
+            stocks = current_data['stocks']
+            old_prices = np.array([stocks[s]['price'] if s in stocks else np.nan for s in stock_pool])
+            is_new = np.isnan(old_prices)
+            
+            change_pcts = np.random.uniform(-0.03, 0.03, n)  # ±3%变动
+            raw_prices = np.where(is_new, np.random.uniform(20, 200, n), old_prices * (1 + change_pcts))
+            prices = np.where(is_new, raw_prices, np.round(raw_prices, 2))
+            changes = np.where(is_new, 0, np.round(raw_prices - old_prices, 2))
+            change_pcts = np.where(is_new, 0, np.round(change_pcts * 100, 2))
+            volumes = np.random.randint(1000000, 10000000, n)
+            turnover_rates = np.random.uniform(1, 8, n)
+            
+            for symbol, price, change, change_pct, volume, turnover_rate in zip(
+                    stock_pool, prices.tolist(), changes.tolist(), change_pcts.tolist(),
+                    volumes.tolist(), turnover_rates.tolist()):
+                stocks[symbol] = {
+                    'price': price,
+                    'change': change,
+                    'change_pct': change_pct,
+                    'volume': volume,
+                    'turnover_rate': turnover_rate
+                }
+                
+        except Exception as e:
+            logger.error(f"更新股票价格失败: {e}")
     
     def _update_strategy_signals(self):
         """更新策略信号"""
         try:
             # 模拟策略信号生成
-            strategies = ['布林带策略', '优化双均线策略', '快速MACD策略', 'KDJ策略']
-            
             if np.random.random() < 0.3:  # 30%概率生成新信号
-                strategy = np.random.choice(strategies)
+                strategy = np.random.choice(STRATEGY_NAMES)
                 symbol = np.random.choice(list(current_data['stocks'].keys()))
                 signal_type = np.random.choice(['BUY', 'SELL'])
                 
@@ -256,43 +496,33 @@ class WebTradingSystem:
         """生成图表数据"""
         try:
             # 1. 资产价值曲线
-            dates = [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(30, 0, -1)]
+            now = datetime.now()
+            dates = [(now - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(30, 0, -1)]
             portfolio_values = [1000000 + np.random.randint(-50000, 100000) + i * 1000 for i in range(30)]
             
             portfolio_chart = {
                 'data': [{
                     'x': dates,
                     'y': portfolio_values,
-                    'type': 'scatter',
+                    'type': 'scattergl',  # WebGL渲染，数据点多时比SVG流畅
                     'mode': 'lines+markers',
                     'name': '资产价值',
                     'line': {'color': '#1f77b4', 'width': 3}
                 }],
-                'layout': {
-                    'title': '资产价值曲线',
-                    'xaxis': {'title': '日期'},
-                    'yaxis': {'title': '资产价值 (元)'},
-                    'height': 400
-                }
+                'layout': PORTFOLIO_CHART_LAYOUT
             }
             
             # 2. 策略信号分布
-            strategies = ['布林带策略', '优化双均线策略', '快速MACD策略', 'KDJ策略']
-            signal_counts = [np.random.randint(5, 25) for _ in strategies]
+            signal_counts = [np.random.randint(5, 25) for _ in STRATEGY_NAMES]
             
             signal_chart = {
                 'data': [{
-                    'x': strategies,
+                    'x': STRATEGY_NAMES,
                     'y': signal_counts,
                     'type': 'bar',
-                    'marker': {'color': ['#ff7f0e', '#2ca02c', '#d62728', '#9467bd']}
+                    'marker': {'color': STRATEGY_COLORS}
                 }],
-                'layout': {
-                    'title': '策略信号分布',
-                    'xaxis': {'title': '策略'},
-                    'yaxis': {'title': '信号数量'},
-                    'height': 400
-                }
+                'layout': SIGNAL_CHART_LAYOUT
             }
             
             # 3. 持仓分布
@@ -307,13 +537,10 @@ class WebTradingSystem:
                         'type': 'pie',
                         'hole': 0.4
                     }],
-                    'layout': {
-                        'title': '持仓分布',
-                        'height': 400
-                    }
+                    'layout': POSITION_CHART_LAYOUT
                 }
             else:
-                position_chart = {'data': [], 'layout': {'title': '暂无持仓'}}
+                position_chart = EMPTY_POSITION_CHART
             
             return {
                 'portfolio_chart': portfolio_chart,
@@ -336,31 +563,46 @@ def index():
 @app.route('/api/portfolio')
 def get_portfolio():
     """获取持仓信息"""
-    return jsonify(web_trading_system.portfolio)
+    return web_trading_system.snapshot_response('portfolio', web_trading_system.portfolio)
 
 @app.route('/api/stocks')
 def get_stocks():
     """获取股票信息"""
-    return jsonify(current_data['stocks'])
+    return web_trading_system.snapshot_response('stocks', current_data['stocks'])
+
+@app.route('/api/dashboard')
+def get_dashboard():
+    """批量获取持仓、股票和信号信息"""
+    return web_trading_system.dashboard_response()
 
 @app.route('/api/signals')
 def get_signals():
     """获取交易信号"""
-    return jsonify(current_data['signals'][-50:])  # 最近50个信号
+    return web_trading_system.snapshot_response('signals', current_data['signals'][-50:])  # 最近50个信号
 
-@app.route('/api/charts')
-def get_charts():
-    """获取图表数据"""
+@cache.memoize()
+def _cached_charts(last_update_time):
+    """按监控循环的更新时间缓存图表数据，多个页面共享同一份结果"""
     charts = web_trading_system.generate_charts()
     # 转换为JSON格式
     for chart_name, chart_data in charts.items():
         charts[chart_name] = json.loads(plotly.utils.PlotlyJSONEncoder().encode(chart_data))
-    return jsonify(charts)
+    return charts
+
+@cache.memoize()
+def _cached_strategy_performance():
+    """缓存策略表现报表，避免每次请求都扫描报表目录"""
+    return web_trading_system.get_strategy_performance()
+
+@app.route('/api/charts')
+def get_charts():
+    """获取图表数据"""
+    return jsonify(_cached_charts(web_trading_system.last_update_time))
 
 @app.route('/api/strategy_performance')
 def get_strategy_performance():
     """获取策略表现"""
-    return jsonify(web_trading_system.get_strategy_performance())
+    return jsonify(_cached_strategy_performance())
 
 @app.route('/api/start_monitoring', methods=['POST'])
 def start_monitoring():
@@ -376,12 +618,10 @@ def stop_monitoring():
 
 @app.route('/api/run_strategy', methods=['POST'])
 def run_strategy():
-    """手动执行策略"""
-    try:
-        web_trading_system.trading_system.run_once()
-        return jsonify({'status': 'success', 'message': '策略执行完成'})
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)})
+    """手动执行策略（后台执行，完成后推送strategy_finished事件）"""
+    if web_trading_system.run_strategy_async():
+        return jsonify({'status': 'accepted', 'message': '策略已在后台执行'})
+    return jsonify({'status': 'busy', 'message': '策略正在执行中'})
 
 @socketio.on('connect')
 def handle_connect():
@@ -395,5 +635,7 @@ def handle_disconnect():
     logger.info("客户端已断开连接")
 
 if __name__ == '__main__':
+    # 开发服务器仅用于本地调试，生产环境请使用 wsgi.py + gunicorn
+    debug = os.environ.get('STONE_WEB_DEBUG', '0') == '1'
     logger.info("启动Stone量化交易Web系统...")
-    socketio.run(app, host='0.0.0.0', port=8081, debug=True, allow_unsafe_werkzeug=True) 
\ No newline at end of file
+    socketio.run(app, host='0.0.0.0', port=8081, debug=debug, allow_unsafe_werkzeug=True) 
\ No newline at end of file
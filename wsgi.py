@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Stone量化交易系统 - WSGI入口
+
+生产环境使用gunicorn + gevent启动，替代Flask开发服务器:
+    gunicorn -k geventwebsocket.gunicorn.workers.GeventWebSocketWorker \
+        -w 1 --worker-connections 1000 -b 0.0.0.0:8081 wsgi:app
+
+注意: 交易系统状态保存在进程内，且Socket.IO需要会话粘滞，
+因此只启动1个worker，并发由gevent协程承担。
+"""
+
+from web_app import app, socketio
+
+__all__ = ['app', 'socketio']